@@ -1,24 +1,34 @@
 import os
-import logging
+import time
 from flask import Flask
-from .extensions import mongo, bcrypt, cors, jwt
-from pymongo import MongoClient
+from .extensions import bcrypt, cors
+from .json_provider import MindBuddyJSONProvider
+from .logging_config import configure_logging
+from . import database, instrumentation, query_profiler, sampling_profiler
 
 
 def create_app(config_class="backend.config.Config"):
+    # Per-phase boot timings, exposed as app.extensions["startup_timings"]
+    timings = {}
+    phase_start = time.perf_counter()
+
+    def mark(phase):
+        nonlocal phase_start
+        now = time.perf_counter()
+        timings[phase] = now - phase_start
+        phase_start = now
+
     app = Flask(__name__)
     # Load configuration from config object
     app.config.from_object(config_class)
+    app.json = MindBuddyJSONProvider(app)
 
-    # Configure logging
-    logging.basicConfig(
-        level=getattr(logging, app.config["LOGGING_LEVEL"]),
-        format=app.config["LOGGING_FORMAT"]
-    )
+    # Configure logging (queue-based, see backend/logging_config.py)
+    configure_logging(app.config)
+    mark("config")
 
     # Initialize extensions
     bcrypt.init_app(app)
-    jwt.init_app(app)
     cors.init_app(
     app,
     resources={
@@ -28,24 +38,48 @@ def create_app(config_class="backend.config.Config"):
     },
     supports_credentials=True
 )
+    mark("extensions")
 
-    # Initialize MongoDB
-    global mongo
-    mongo = MongoClient(app.config["MONGO_URI"])
-    db = mongo.mindbuddy
+    # Initialize MongoDB (single shared client, see backend/database.py)
+    database.init_app(app)
+
+    # Per-request phase timings, Server-Timing header and /metrics
+    instrumentation.init_app(app)
+    query_profiler.init_app(app)
+    sampling_profiler.init_app(app)
 
     # Validate database connection on startup
     with app.app_context():
         try:
             # Ping the database
-            mongo.admin.command('ping')
+            database.get_client().admin.command('ping')
             app.logger.info("MongoDB connection established successfully")
         except Exception as e:
             app.logger.error("Failed to connect to MongoDB: %s", e)
             raise
+    mark("mongo_ping")
 
     # This will execute backend/models/__init__.py and register all models
     from . import models
+    models.ensure_indexes()
+
+    from .services.mongo import get_mongo_service
+    from .services.entitlement_service import entitlements
+    from .services.webhook_processor import processor as webhook_processor
+    with app.app_context():
+        get_mongo_service().ensure_indexes()
+    entitlements.configure(app.config)
+    webhook_processor.configure(app.config)
+    from .services import login_service, token_service
+    login_service.configure(app.config)
+    token_service.configure(app.config)
+    from .services.context_service import context_service
+    from .services.summary_service import summarizer
+    from .services.write_buffer import write_buffer
+    context_service.configure(app.config)
+    summarizer.configure(app.config)
+    write_buffer.configure(app.config)
+    mark("models")
 
     # Import and register blueprints
     from backend.routes.journal import journal_bp
@@ -58,6 +92,7 @@ def create_app(config_class="backend.config.Config"):
     from backend.routes.chat import chat_bp
     from backend.routes.ai_chat import chat_bp as ai_chat_bp
     from backend.routes.ai_insights import insights_bp
+    from backend.routes.admin import admin_bp
 
     app.register_blueprint(journal_bp, url_prefix="/api/journal")
     app.register_blueprint(user_bp, url_prefix="/api/user")
@@ -69,6 +104,11 @@ def create_app(config_class="backend.config.Config"):
     app.register_blueprint(chat_bp)
     app.register_blueprint(ai_chat_bp, url_prefix="/api/chat")
     app.register_blueprint(insights_bp, url_prefix="/api/ai_insights")
+    app.register_blueprint(admin_bp, url_prefix="/api/admin")
+
+    from .commands import register_commands
+    register_commands(app)
+    mark("blueprints")
 
     # LLM service will be initialized lazily on first use
     app.logger.info("LLM service will be initialized on first use")
@@ -83,4 +123,7 @@ def create_app(config_class="backend.config.Config"):
     def home():
         return "Hello, Mind Buddy!"
 
+    app.extensions["startup_timings"] = timings
+    app.logger.info("App created in %.1f ms", sum(timings.values()) * 1000)
+
     return app
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Import-time profile for the modules create_app() loads.
+
+Runs a fresh interpreter with `-X importtime`, imports the app package, the
+models and every blueprint module, and summarises the output: total
+cumulative import time, the slowest top-level imports, and whether any
+heavyweight ML module (torch, transformers) was pulled in.
+
+Exits non-zero when a forbidden module is imported or the total exceeds
+--budget-ms, so it can guard regressions in CI.
+
+Usage:
+    python backend/benchmarks/import_time.py [--top 15] [--budget-ms 1500] [--json]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+APP_MODULES = [
+    "backend",
+    "backend.models",
+    "backend.decorators",
+    "backend.routes.journal",
+    "backend.routes.user",
+    "backend.routes.auth",
+    "backend.routes.mood",
+    "backend.routes.subscribe",
+    "backend.routes.payments",
+    "backend.routes.webhook",
+    "backend.routes.chat",
+    "backend.routes.ai_chat",
+    "backend.routes.ai_insights",
+    "backend.routes.ai_sentiment",
+    "backend.routes.admin",
+]
+
+FORBIDDEN = ["torch", "transformers"]
+
+
+def profile():
+    code = "; ".join(f"import {name}" for name in APP_MODULES)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr)
+        raise SystemExit(proc.returncode)
+    return proc.stderr
+
+
+def parse(output):
+    """Return [(module, self_us, cumulative_us, depth)] from -X importtime output."""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def summarise(rows, top):
+    top_level = [r for r in rows if r[3] == 0]
+    imported = {r[0] for r in rows}
+    forbidden = sorted(
+        name for name in imported
+        if any(name == f or name.startswith(f + ".") for f in FORBIDDEN)
+    )
+    return {
+        "total_ms": round(sum(r[2] for r in top_level) / 1000, 1),
+        "modules_imported": len(rows),
+        "slowest": [
+            {"module": name, "cumulative_ms": round(cum / 1000, 1)}
+            for name, _, cum, _ in sorted(top_level, key=lambda r: r[2], reverse=True)[:top]
+        ],
+        "forbidden_imported": forbidden,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=15, help="number of slowest imports to list")
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail if total import time exceeds this")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args()
+
+    summary = summarise(parse(profile()), args.top)
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(f"total import time: {summary['total_ms']} ms ({summary['modules_imported']} modules)")
+        for row in summary["slowest"]:
+            print(f"  {row['cumulative_ms']:>8.1f} ms  {row['module']}")
+        if summary["forbidden_imported"]:
+            print(f"forbidden modules imported: {', '.join(summary['forbidden_imported'][:10])}")
+
+    failed = bool(summary["forbidden_imported"])
+    if args.budget_ms is not None and summary["total_ms"] > args.budget_ms:
+        failed = True
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Login hashing benchmark.
+
+"throughput" measures bcrypt verifications per second through
+login_service.PasswordHasher for each cost in --rounds and each pool size
+up to --max-workers, and divides by the cores actually usable, giving
+logins/sec per core.
+
+"storm" fires --storm concurrent logins at once. "before" checks every
+password inline in its own request thread, as the old login view did, so
+all of them share the CPU and every request gets slow. "after" goes through
+the capped pool: up to LOGIN_MAX_PENDING are served at normal latency and
+the rest are turned away immediately (503) instead of queueing.
+
+No database is needed.
+
+Usage:
+    python backend/benchmarks/login_bench.py [--rounds 10,12] [--checks 40] [--storm 64] [--json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from backend import bcrypt
+from backend.services.login_service import HasherBusy, PasswordHasher
+
+PASSWORD = "Bench-Passw0rd!"
+
+
+def run_concurrently(fn, n):
+    """Call fn(i) from n threads released together; returns per-call (ok, seconds)."""
+    results = [None] * n
+    barrier = threading.Barrier(n)
+
+    def worker(i):
+        barrier.wait()
+        started = time.perf_counter()
+        try:
+            ok = fn(i)
+        except HasherBusy:
+            ok = None
+        results[i] = (ok, time.perf_counter() - started)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def throughput(pw_hash, workers, checks):
+    hasher = PasswordHasher(workers=workers, max_pending=checks, timeout=600)
+    started = time.perf_counter()
+    results = run_concurrently(lambda i: hasher.check(pw_hash, PASSWORD), checks)
+    elapsed = time.perf_counter() - started
+    assert all(ok for ok, _ in results), "verification failed"
+    cores = min(workers, os.cpu_count() or 1)
+    return {
+        "workers": workers,
+        "logins_per_s": round(checks / elapsed, 1),
+        "logins_per_s_per_core": round(checks / elapsed / cores, 1),
+    }
+
+
+def summarise(results):
+    served = [secs * 1000 for ok, secs in results if ok is not None]
+    rejected = [secs * 1000 for ok, secs in results if ok is None]
+    quantiles = statistics.quantiles(served, n=100) if len(served) > 1 else served * 99
+    return {
+        "served": len(served),
+        "rejected": len(rejected),
+        "served_p50_ms": round(quantiles[49], 1) if served else None,
+        "served_p99_ms": round(quantiles[98], 1) if served else None,
+        "rejected_max_ms": round(max(rejected), 2) if rejected else None,
+    }
+
+
+def storm(pw_hash, n, workers, max_pending):
+    before = run_concurrently(lambda i: bcrypt.check_password_hash(pw_hash, PASSWORD), n)
+    hasher = PasswordHasher(workers=workers, max_pending=max_pending, timeout=600)
+    after = run_concurrently(lambda i: hasher.check(pw_hash, PASSWORD), n)
+    return {"before": summarise(before), "after": summarise(after)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", default="10,12", help="Comma-separated bcrypt costs.")
+    parser.add_argument("--checks", type=int, default=40, help="Verifications per throughput run.")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--storm", type=int, default=64, help="Concurrent logins in the storm run.")
+    parser.add_argument("--max-pending", type=int, default=16, help="LOGIN_MAX_PENDING for the storm run.")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    worker_counts = sorted({1, args.max_workers} | {w for w in (2, 4, 8, 16) if w < args.max_workers})
+    report = {"cpu_count": os.cpu_count(), "rounds": {}}
+    for rounds in (int(r) for r in args.rounds.split(",")):
+        pw_hash = bcrypt.generate_password_hash(PASSWORD, rounds).decode("utf-8")
+        report["rounds"][rounds] = {
+            "throughput": [throughput(pw_hash, w, args.checks) for w in worker_counts],
+            "storm": storm(pw_hash, args.storm, args.max_workers, args.max_pending),
+        }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"cpu_count={report['cpu_count']}")
+    for rounds, result in report["rounds"].items():
+        print(f"\nbcrypt cost {rounds}")
+        for row in result["throughput"]:
+            print(f"  workers={row['workers']:<3} {row['logins_per_s']:>8} logins/s"
+                  f"  {row['logins_per_s_per_core']:>8} logins/s/core")
+        for name, row in result["storm"].items():
+            print(f"  storm {name:<6} served={row['served']:<4} rejected={row['rejected']:<4}"
+                  f" p50={row['served_p50_ms']}ms p99={row['served_p99_ms']}ms"
+                  + (f" rejected_max={row['rejected_max_ms']}ms" if row["rejected"] else ""))
+
+
+if __name__ == "__main__":
+    main()
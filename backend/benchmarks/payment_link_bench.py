@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Payment-link benchmark and check against a local Flutterwave stub.
+
+"before" reproduces the previous subscribe path: a new event loop and a new
+httpx.AsyncClient (fresh TCP connection) per request. "after" uses
+FlutterwaveService's pooled sync client, and "async" its shared AsyncClient
+with concurrent calls. The stub counts TCP connections, so reuse is visible.
+A final check makes the stub fail twice with 503 and expects the retry to
+succeed.
+
+Usage:
+    python backend/benchmarks/payment_link_bench.py [--calls 200] [--latency-ms 5] [--json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import httpx
+
+from backend.loadtest.stub_flutterwave import StubFlutterwaveServer
+from backend.services.flutterwave import FlutterwaveService
+
+ARGS = dict(amount=5000, currency="NGN", email="bench@example.com", name="Bench", redirect_url="http://localhost/cb")
+
+
+def legacy_create_payment_link(base_url, secret_key, tx_ref):
+    """The removed per-request path: new loop + new AsyncClient every call."""
+    async def create():
+        payload = FlutterwaveService._payment_payload(tx_ref=tx_ref, **ARGS)
+        headers = {"Authorization": f"Bearer {secret_key}", "Content-Type": "application/json"}
+        async with httpx.AsyncClient() as client:
+            response = await client.post(f"{base_url}/payments", json=payload, headers=headers)
+            response.raise_for_status()
+            return response.json().get("data", {}).get("link")
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(create())
+    finally:
+        loop.close()
+
+
+def measure(stub, fn, calls):
+    stub.connections = stub.requests = 0
+    started = time.perf_counter()
+    links = fn()
+    elapsed = time.perf_counter() - started
+    assert all(links) and len(links) == calls, "stub returned no link"
+    return {
+        "total_s": round(elapsed, 3),
+        "per_call_ms": round(elapsed / calls * 1000, 2),
+        "connections": stub.connections,
+        "requests": stub.requests,
+    }
+
+
+def run(calls, latency_ms, concurrency):
+    stub = StubFlutterwaveServer(latency_ms=latency_ms).start()
+    service = FlutterwaveService("FLWSECK_TEST-bench", base_url=stub.api_url, backoff=0.01)
+    try:
+        results = {"calls": calls, "latency_ms": latency_ms}
+        results["before"] = measure(stub, lambda: [
+            legacy_create_payment_link(stub.api_url, "FLWSECK_TEST-bench", f"before-{i}") for i in range(calls)
+        ], calls)
+        results["after"] = measure(stub, lambda: [
+            service.create_payment_link(tx_ref=f"after-{i}", **ARGS) for i in range(calls)
+        ], calls)
+
+        async def gather():
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def one(i):
+                async with semaphore:
+                    return await service.acreate_payment_link(tx_ref=f"async-{i}", **ARGS)
+
+            try:
+                return await asyncio.gather(*(one(i) for i in range(calls)))
+            finally:
+                await service.aclose()
+
+        results["async"] = measure(stub, lambda: asyncio.run(gather()), calls)
+        results["async"]["concurrency"] = concurrency
+
+        stub.requests = 0
+        stub.fail_next = 2
+        link = service.create_payment_link(tx_ref="retry-check", **ARGS)
+        results["retry_check"] = {"ok": bool(link) and stub.requests == 3, "requests": stub.requests}
+        return results
+    finally:
+        service.close()
+        stub.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200, help="payment links per variant")
+    parser.add_argument("--latency-ms", type=int, default=5, help="stub response latency")
+    parser.add_argument("--concurrency", type=int, default=10, help="in-flight calls for the async variant")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args()
+
+    results = run(args.calls, args.latency_ms, args.concurrency)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for name in ("before", "after", "async"):
+            r = results[name]
+            print(f"{name:<7} {r['per_call_ms']:>8.2f} ms/call  {r['total_s']:>7.3f} s total  "
+                  f"{r['connections']:>4} connections for {r['requests']} requests")
+        print(f"retry on 503 x2: {'ok' if results['retry_check']['ok'] else 'FAILED'} "
+              f"({results['retry_check']['requests']} requests)")
+    raise SystemExit(0 if results["retry_check"]["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
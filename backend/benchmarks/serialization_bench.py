@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Serialization benchmark for the two heaviest list responses:
+
+    GET /api/mood/entries?limit=100
+    GET /api/chat/history?limit=200
+
+"before" reproduces the previous path (from_dict -> dual-shaped to_dict with
+per-field isoformat()/str() calls -> Flask's default stdlib encoder).
+"after" is the current path (to_api()/raw documents -> MindBuddyJSONProvider).
+
+No database is needed; documents are synthesised in the stored shape.
+
+Usage:
+    python backend/benchmarks/serialization_bench.py [--repeat 200] [--json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from bson import ObjectId
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from backend.models import MoodEntry
+from backend.json_provider import MindBuddyJSONProvider, ORJSON_AVAILABLE
+
+
+def make_mood_docs(n):
+    user_id = ObjectId()
+    now = datetime.utcnow()
+    return [{
+        "_id": ObjectId(),
+        "user_id": user_id,
+        "mood_level": (i % 5) + 1,
+        "emoji": "🙂",
+        "note": "Felt okay after a walk in the park" if i % 3 else None,
+        "triggers": ["work", "sleep"][: i % 3],
+        "created_at": now - timedelta(hours=i),
+        "updated_at": now - timedelta(hours=i),
+    } for i in range(n)]
+
+
+def make_chat_docs(n):
+    user_id = ObjectId()
+    conversation_id = str(ObjectId())
+    now = datetime.utcnow()
+    return [{
+        "_id": ObjectId(),
+        "user_id": user_id,
+        "conversation_id": conversation_id,
+        "message": "I have been feeling a bit anxious about work lately. " * 2,
+        "role": "user",
+        "ai_response": "That sounds stressful. Would you like to talk through what is weighing on you? " * 2,
+        "context_summary": None,
+        "sentiment": "negative",
+        "tokens_used": 0,
+        "created_at": now - timedelta(minutes=i),
+        "updated_at": now - timedelta(minutes=i),
+    } for i in range(n)]
+
+
+def legacy_mood_to_dict(entry):
+    """MoodEntry.to_dict as it was before the storage/API split."""
+    return {
+        "_id": str(entry._id),
+        "id": str(entry._id),
+        "user_id": str(entry.user_id),
+        "userId": str(entry.user_id),
+        "mood_level": entry.mood_level,
+        "moodLevel": entry.mood_level,
+        "emoji": entry.emoji,
+        "note": entry.note,
+        "triggers": entry.triggers,
+        "created_at": entry.created_at.isoformat() + "Z",
+        "createdAt": entry.created_at.isoformat() + "Z",
+        "updated_at": entry.updated_at.isoformat() + "Z",
+        "updatedAt": entry.updated_at.isoformat() + "Z",
+    }
+
+
+def legacy_chat_to_dict(doc):
+    """ChatLog.from_dict(doc).to_dict() as it was before the storage/API split."""
+    return {
+        "_id": str(doc["_id"]),
+        "user_id": str(doc["user_id"]),
+        "conversation_id": doc["conversation_id"],
+        "message": doc["message"],
+        "role": doc["role"],
+        "ai_response": doc["ai_response"],
+        "context_summary": doc["context_summary"],
+        "sentiment": doc["sentiment"],
+        "tokens_used": doc["tokens_used"],
+        "created_at": doc["created_at"].isoformat(),
+        "updated_at": doc["updated_at"].isoformat(),
+    }
+
+
+def run(repeat):
+    app = Flask(__name__)
+    before_provider = DefaultJSONProvider(app)
+    after_provider = MindBuddyJSONProvider(app)
+
+    mood_docs = make_mood_docs(100)
+    chat_docs = make_chat_docs(200)
+
+    def mood_before():
+        entries = [MoodEntry.from_dict(d) for d in mood_docs]
+        body = {"entries": [legacy_mood_to_dict(e) for e in entries], "total": 100, "limit": 100, "offset": 0}
+        return before_provider.dumps(body).encode("utf-8")
+
+    def mood_after():
+        entries = [MoodEntry.from_dict(d) for d in mood_docs]
+        body = {"entries": [e.to_api() for e in entries], "total": 100, "limit": 100, "offset": 0}
+        return after_provider.dumps_bytes(body)
+
+    def chat_before():
+        body = {"history": [legacy_chat_to_dict(d) for d in chat_docs], "count": 200}
+        return before_provider.dumps(body).encode("utf-8")
+
+    def chat_after():
+        body = {"history": chat_docs, "count": 200}
+        return after_provider.dumps_bytes(body)
+
+    cases = {
+        "/api/mood/entries?limit=100": (mood_before, mood_after),
+        "/api/chat/history?limit=200": (chat_before, chat_after),
+    }
+
+    results = {"orjson": ORJSON_AVAILABLE, "repeat": repeat, "endpoints": {}}
+    with app.app_context():
+        for name, (before, after) in cases.items():
+            before_s = min(timeit.repeat(before, number=repeat, repeat=5)) / repeat
+            after_s = min(timeit.repeat(after, number=repeat, repeat=5)) / repeat
+            results["endpoints"][name] = {
+                "before_us": round(before_s * 1e6, 1),
+                "after_us": round(after_s * 1e6, 1),
+                "speedup": round(before_s / after_s, 2),
+                "before_bytes": len(before()),
+                "after_bytes": len(after()),
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200, help="calls per timing sample")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"orjson available: {results['orjson']}")
+    for name, r in results["endpoints"].items():
+        print(f"{name}")
+        print(f"  before: {r['before_us']:>10.1f} us  {r['before_bytes']:>7} bytes")
+        print(f"  after:  {r['after_us']:>10.1f} us  {r['after_bytes']:>7} bytes  ({r['speedup']}x)")
+
+
+if __name__ == "__main__":
+    main()
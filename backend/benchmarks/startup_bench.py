@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Startup time and memory benchmark for backend.create_app().
+
+Each run boots the app in a fresh interpreter against a local Mongo stand-in
+and reports wall-clock time per phase (as recorded by create_app in
+app.extensions["startup_timings"]), plus package import and the first
+request to /api/health, and peak RSS. One extra run is made under
+tracemalloc to list the top allocating source lines.
+
+Mongo stand-ins:
+    --mongo mongomock   in-process mongomock client (default, no server needed)
+    --mongo mongod      spawn a throwaway mongod on a free port
+    --mongo-uri URI     use an already running server
+
+Usage:
+    python backend/benchmarks/startup_bench.py [--runs 5] [--json] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+def child(use_mongomock, trace):
+    """Boot the app once in this process and print a JSON result line."""
+    import resource
+
+    if trace:
+        import tracemalloc
+        tracemalloc.start(10)
+
+    sys.path.insert(0, ROOT)
+    started = time.perf_counter()
+    import backend
+    from backend import database
+    import_s = time.perf_counter() - started
+
+    if use_mongomock:
+        import mongomock
+        database.MongoClient = mongomock.MongoClient
+
+    app = backend.create_app()
+    phases = {"import": import_s}
+    phases.update(app.extensions["startup_timings"])
+
+    started = time.perf_counter()
+    response = app.test_client().get("/api/health")
+    phases["first_request"] = time.perf_counter() - started
+    assert response.status_code == 200, response.status_code
+
+    result = {
+        "phases_ms": {name: round(seconds * 1000, 2) for name, seconds in phases.items()},
+        "total_ms": round(sum(phases.values()) * 1000, 2),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+    if trace:
+        snapshot = tracemalloc.take_snapshot()
+        result["top_allocators"] = [
+            {"location": str(stat.traceback[0]), "size_kb": round(stat.size / 1024, 1), "count": stat.count}
+            for stat in snapshot.statistics("lineno")[:15]
+        ]
+        result["traced_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 1)
+
+    print(json.dumps(result))
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def spawn_mongod():
+    if not shutil.which("mongod"):
+        raise SystemExit("mongod not found on PATH; use --mongo mongomock or --mongo-uri")
+    dbpath = tempfile.mkdtemp(prefix="mindbuddy-bench-")
+    port = _free_port()
+    proc = subprocess.Popen(
+        ["mongod", "--dbpath", dbpath, "--port", str(port), "--bind_ip", "127.0.0.1", "--quiet"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 20
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            break
+        except OSError:
+            time.sleep(0.2)
+    else:
+        proc.kill()
+        raise SystemExit("mongod did not start")
+    return proc, dbpath, f"mongodb://127.0.0.1:{port}/mindbuddy_bench"
+
+
+def run_child(env, use_mongomock, trace):
+    args = [sys.executable, os.path.abspath(__file__), "--child"]
+    if use_mongomock:
+        args.append("--child-mongomock")
+    if trace:
+        args.append("--child-trace")
+    proc = subprocess.run(args, cwd=ROOT, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr)
+        raise SystemExit(proc.returncode)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def aggregate(runs):
+    phases = runs[0]["phases_ms"].keys()
+    return {
+        "runs": len(runs),
+        "phases_ms": {p: round(statistics.median(r["phases_ms"][p] for r in runs), 2) for p in phases},
+        "total_ms": round(statistics.median(r["total_ms"] for r in runs), 2),
+        "peak_rss_mb": round(statistics.median(r["peak_rss_mb"] for r in runs), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh-process boots to take the median of")
+    parser.add_argument("--mongo", choices=["mongomock", "mongod"], default="mongomock")
+    parser.add_argument("--mongo-uri", help="use an existing MongoDB instead of a stand-in")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    parser.add_argument("--output", help="also write the JSON result to this file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--child-mongomock", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--child-trace", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child_mongomock, args.child_trace)
+        return
+
+    env = dict(os.environ, LOGGING_LEVEL="WARNING")
+    mongod = None
+    use_mongomock = False
+    if args.mongo_uri:
+        env["MONGO_URI"] = args.mongo_uri
+    elif args.mongo == "mongod":
+        mongod = spawn_mongod()
+        env["MONGO_URI"] = mongod[2]
+    else:
+        use_mongomock = True
+
+    try:
+        runs = [run_child(env, use_mongomock, trace=False) for _ in range(args.runs)]
+        traced = run_child(env, use_mongomock, trace=True)
+    finally:
+        if mongod:
+            mongod[0].terminate()
+            mongod[0].wait()
+            shutil.rmtree(mongod[1], ignore_errors=True)
+
+    result = aggregate(runs)
+    result["mongo"] = "uri" if args.mongo_uri else args.mongo
+    result["traced_peak_mb"] = traced["traced_peak_mb"]
+    result["top_allocators"] = traced["top_allocators"]
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print(f"create_app startup (median of {result['runs']} runs, mongo={result['mongo']})")
+    for phase, ms in result["phases_ms"].items():
+        print(f"  {phase:<15} {ms:>9.2f} ms")
+    print(f"  {'total':<15} {result['total_ms']:>9.2f} ms")
+    print(f"peak RSS: {result['peak_rss_mb']} MB  (tracemalloc peak: {result['traced_peak_mb']} MB)")
+    print("top allocators:")
+    for alloc in result["top_allocators"][:10]:
+        print(f"  {alloc['size_kb']:>9.1f} KB  {alloc['location']}")
+
+
+if __name__ == "__main__":
+    main()
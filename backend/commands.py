@@ -0,0 +1,72 @@
+import json
+import click
+
+
+def register_commands(app):
+    """Register maintenance commands on the Flask CLI (`flask <command>`)."""
+
+    @app.cli.command("migrate-dates")
+    @click.option("--batch-size", default=500, show_default=True, help="Documents per bulk write.")
+    def migrate_dates(batch_size):
+        """Convert ISO string timestamps to native BSON dates (resumable)."""
+        from backend.services.date_migration import migrate_all, verify
+
+        results = migrate_all(batch_size=batch_size)
+        click.echo(json.dumps({"migration": results, "verification": verify()}, indent=2, default=str))
+
+    @app.cli.command("verify-dates")
+    def verify_dates():
+        """Report documents that still store timestamps as strings."""
+        from backend.services.date_migration import verify
+
+        report = verify()
+        click.echo(json.dumps(report, indent=2))
+        if not all(entry["ok"] for entry in report.values()):
+            raise SystemExit(1)
+
+    @app.cli.command("compact-documents")
+    @click.option("--batch-size", default=500, show_default=True, help="Documents per bulk write.")
+    def compact_documents(batch_size):
+        """Rewrite legacy documents into the compact to_document() shape."""
+        from backend.services.document_migration import compact_all, verify
+
+        results = compact_all(batch_size=batch_size)
+        click.echo(json.dumps({"compaction": results, "remaining": verify()}, indent=2))
+
+    @app.cli.command("rebuild-sentiment-rollups")
+    @click.option("--user-id", default=None, help="Only rebuild this user's rollups.")
+    def rebuild_sentiment_rollups(user_id):
+        """Backfill the per-day sentiment rollups that /api/ai_sentiment/trends reads."""
+        from backend.models import SentimentRollup
+
+        if user_id:
+            result = {"users": 1, "entries": SentimentRollup.rebuild_for_user(user_id)}
+        else:
+            result = SentimentRollup.rebuild_all()
+        click.echo(json.dumps(result, indent=2))
+
+    @app.cli.command("process-webhooks")
+    @click.option("--limit", default=None, type=int, help="Stop after this many events.")
+    def process_webhooks(limit):
+        """Apply due events from the webhook inbox and report inbox status."""
+        from backend.models import WebhookEvent
+        from backend.services.webhook_processor import processor
+
+        processed = processor.drain(limit=limit)
+        click.echo(json.dumps({"processed": processed, "inbox": WebhookEvent.count_by_status()}, indent=2))
+
+    @app.cli.command("expire-subscriptions")
+    @click.option("--batch-size", default=500, show_default=True, help="Documents per bulk write.")
+    def expire_subscriptions(batch_size):
+        """Downgrade users whose subscription renewal_date has passed (run on a schedule)."""
+        from backend.services.entitlement_service import sweep_lapsed
+
+        click.echo(json.dumps(sweep_lapsed(batch_size=batch_size), indent=2))
+
+    @app.cli.command("rebuild-conversations")
+    @click.option("--user-id", default=None, help="Only rebuild this user's conversations.")
+    def rebuild_conversations(user_id):
+        """Backfill the conversations index from chat_logs."""
+        from backend.models import Conversation
+
+        click.echo(json.dumps({"conversations": Conversation.rebuild(user_id)}, indent=2))
@@ -10,10 +10,49 @@ class Config:
     """Base configuration settings."""
     SECRET_KEY = os.getenv("SECRET_KEY", "a-very-secret-key-for-dev")
     MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/mindbuddy")
-    MONGODB_DB_NAME = os.getenv("MONGODB_DB_NAME", "mind_buddy")
+    MONGODB_DB_NAME = os.getenv("MONGODB_DB_NAME", "mindbuddy")
+
+    # MongoDB client pool (one client per process, see backend/database.py)
+    MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+    MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+    MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000"))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "2000"))
+    MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+    MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "20000"))
+    MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "zlib")
     FLW_SECRET_KEY = os.getenv("FLW_SECRET_KEY")
     FLW_SIGNATURE_KEY = os.getenv("FLW_SIGNATURE_KEY")
     FLW_PLAN_ID = os.getenv("FLW_PLAN_ID")
+    FLW_BASE_URL = os.getenv("FLW_BASE_URL", "https://api.flutterwave.com/v3")
+    FLW_TIMEOUT_S = float(os.getenv("FLW_TIMEOUT_S", "10"))
+    FLW_CONNECT_TIMEOUT_S = float(os.getenv("FLW_CONNECT_TIMEOUT_S", "3"))
+    FLW_MAX_RETRIES = int(os.getenv("FLW_MAX_RETRIES", "2"))
+    FLW_POOL_SIZE = int(os.getenv("FLW_POOL_SIZE", "20"))
+
+    # Webhook inbox processing (see backend/services/webhook_processor.py)
+    WEBHOOK_POLL_INTERVAL_S = float(os.getenv("WEBHOOK_POLL_INTERVAL_S", "5"))
+    WEBHOOK_MAX_ATTEMPTS = int(os.getenv("WEBHOOK_MAX_ATTEMPTS", "5"))
+    WEBHOOK_RETRY_BASE_S = float(os.getenv("WEBHOOK_RETRY_BASE_S", "30"))
+    # Off: events stay in the inbox until `flask process-webhooks` runs
+    WEBHOOK_PROCESSOR_ENABLED = os.getenv("WEBHOOK_PROCESSOR_ENABLED", "true").lower() == "true"
+
+    # Per-worker premium entitlement cache (see backend/services/entitlement_service.py)
+    ENTITLEMENT_CACHE_TTL_S = int(os.getenv("ENTITLEMENT_CACHE_TTL_S", "300"))
+    ENTITLEMENT_NEGATIVE_TTL_S = int(os.getenv("ENTITLEMENT_NEGATIVE_TTL_S", "30"))
+    ENTITLEMENT_CACHE_SIZE = int(os.getenv("ENTITLEMENT_CACHE_SIZE", "10000"))
+
+    # Login throughput protection (see backend/services/login_service.py)
+    BCRYPT_LOG_ROUNDS = int(os.getenv("BCRYPT_LOG_ROUNDS", "12"))
+    LOGIN_HASH_WORKERS = int(os.getenv("LOGIN_HASH_WORKERS", str(os.cpu_count() or 1)))
+    LOGIN_MAX_PENDING = int(os.getenv("LOGIN_MAX_PENDING", "16"))  # running + queued checks
+    LOGIN_HASH_TIMEOUT_S = float(os.getenv("LOGIN_HASH_TIMEOUT_S", "5"))
+    LOGIN_IP_PER_MINUTE = float(os.getenv("LOGIN_IP_PER_MINUTE", "20"))
+    LOGIN_IP_BURST = int(os.getenv("LOGIN_IP_BURST", "20"))
+    LOGIN_ACCOUNT_PER_MINUTE = float(os.getenv("LOGIN_ACCOUNT_PER_MINUTE", "5"))
+    LOGIN_ACCOUNT_BURST = int(os.getenv("LOGIN_ACCOUNT_BURST", "5"))
+    LOGIN_PROXY_HOPS = int(os.getenv("LOGIN_PROXY_HOPS", "0"))  # 1 behind the Heroku router
+
     REDIRECT_URL = os.getenv("REDIRECT_URL")
     # Allow CORS from your Vercel frontend and local dev
     # The string is split by commas in __init__.py
@@ -22,15 +61,51 @@ class Config:
         "http://mb-frontend-rho.vercel.app,http://localhost:8080"
     )
 
-    # JWT configuration
-    JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-jwt-secret-key")
-    JWT_TOKEN_LOCATION = ['headers']
-    JWT_HEADER_NAME = 'Authorization'
-    JWT_HEADER_TYPE = 'Bearer'
+    # Chat prompt context (see backend/services/context_service.py)
+    CHAT_CONTEXT_MAX_TURNS = int(os.getenv("CHAT_CONTEXT_MAX_TURNS", "10"))
+    CHAT_CONTEXT_TOKEN_BUDGET = int(os.getenv("CHAT_CONTEXT_TOKEN_BUDGET", "1500"))
+    CHAT_CONTEXT_CACHE_SIZE = int(os.getenv("CHAT_CONTEXT_CACHE_SIZE", "1000"))
+    # Rolling conversation summaries (see backend/services/summary_service.py)
+    CHAT_SUMMARY_TRIGGER_TOKENS = int(os.getenv("CHAT_SUMMARY_TRIGGER_TOKENS", "1000"))
+    CHAT_SUMMARY_KEEP_TURNS = int(os.getenv("CHAT_SUMMARY_KEEP_TURNS", "4"))  # always sent verbatim
+    CHAT_SUMMARY_BATCH_TURNS = int(os.getenv("CHAT_SUMMARY_BATCH_TURNS", "20"))
+    CHAT_SUMMARY_MAX_TOKENS = int(os.getenv("CHAT_SUMMARY_MAX_TOKENS", "300"))
+    CHAT_SUMMARY_ENABLED = os.getenv("CHAT_SUMMARY_ENABLED", "true").lower() == "true"
+    # Write-behind batching of chat turns (see backend/services/write_buffer.py)
+    WRITE_BUFFER_FLUSH_MS = int(os.getenv("WRITE_BUFFER_FLUSH_MS", "20"))
+    WRITE_BUFFER_MAX_OPS = int(os.getenv("WRITE_BUFFER_MAX_OPS", "500"))
+    WRITE_BUFFER_MAX_PENDING = int(os.getenv("WRITE_BUFFER_MAX_PENDING", "10000"))
+    # Off: every turn is written before the response is sent
+    WRITE_BUFFER_ENABLED = os.getenv("WRITE_BUFFER_ENABLED", "true").lower() == "true"
+
+    # Access/refresh tokens (see backend/services/token_service.py)
+    ACCESS_TOKEN_TTL_S = int(os.getenv("ACCESS_TOKEN_TTL_S", "900"))
+    REFRESH_TOKEN_TTL_DAYS = int(os.getenv("REFRESH_TOKEN_TTL_DAYS", "30"))
+    TOKEN_REVOCATION_SYNC_S = float(os.getenv("TOKEN_REVOCATION_SYNC_S", "30"))
 
     # Logging configuration
-    LOGGING_LEVEL = os.getenv("LOGGING_LEVEL", "DEBUG")
+    LOGGING_LEVEL = os.getenv("LOGGING_LEVEL", "INFO")
     LOGGING_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text")  # "text" or "json"
+    LOG_LEVELS = os.getenv("LOG_LEVELS", "werkzeug=WARNING,pymongo=WARNING,backend.timing=WARNING")
+    LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "backend.decorators=0.1")
+
+    # /metrics is 404 unless a bearer token is set or the scraper connects
+    # from an allowed address (comma-separated IPs or CIDRs, e.g. "127.0.0.1,10.0.0.0/8")
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+    METRICS_ALLOW_IPS = os.getenv("METRICS_ALLOW_IPS", "")
+    # Bearer token for /api/admin/*; the endpoints are disabled when unset
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+    # Slow-query profiler (see backend/query_profiler.py)
+    QUERY_PROFILER_ENABLED = os.getenv("QUERY_PROFILER_ENABLED", "true").lower() == "true"
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+
+    # Sampling CPU profiler (see backend/sampling_profiler.py); off unless started
+    PROFILER_SIGNAL = os.getenv("PROFILER_SIGNAL", "")  # e.g. "SIGPROF"
+    PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", "10"))
+    PROFILER_MAX_SECONDS = int(os.getenv("PROFILER_MAX_SECONDS", "60"))
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "/tmp")
 
     # LLM configuration
     HF_MODEL_NAME = os.getenv("HF_MODEL_NAME", "facebook/blenderbot-400M-distill")
@@ -0,0 +1,130 @@
+"""
+Process-wide MongoDB client registry.
+
+Every component (create_app, models, payment services) resolves its
+collections through get_client()/get_db() so the process holds exactly one
+connection pool. The client is created on first use and re-created in a
+forked child (e.g. a gunicorn worker), since PyMongo clients are not fork-safe.
+"""
+
+import logging
+import os
+import threading
+from pymongo import MongoClient
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_client = None
+_client_pid = None
+_uri = "mongodb://localhost:27017/mindbuddy"
+_db_name = "mindbuddy"
+_options = {}
+_listeners = []
+
+
+def client_options(config):
+    """Translate app config into MongoClient keyword arguments."""
+    options = {
+        "maxPoolSize": config["MONGO_MAX_POOL_SIZE"],
+        "minPoolSize": config["MONGO_MIN_POOL_SIZE"],
+        "maxIdleTimeMS": config["MONGO_MAX_IDLE_TIME_MS"],
+        "waitQueueTimeoutMS": config["MONGO_WAIT_QUEUE_TIMEOUT_MS"],
+        "connectTimeoutMS": config["MONGO_CONNECT_TIMEOUT_MS"],
+        "serverSelectionTimeoutMS": config["MONGO_SERVER_SELECTION_TIMEOUT_MS"],
+        "socketTimeoutMS": config["MONGO_SOCKET_TIMEOUT_MS"],
+        "retryWrites": True,
+        "appname": "mind-buddy",
+    }
+    if config.get("MONGO_COMPRESSORS"):
+        options["compressors"] = config["MONGO_COMPRESSORS"]
+    return options
+
+
+def init_app(app):
+    """Configure the registry from a Flask app's config."""
+    configure(app.config["MONGO_URI"], app.config["MONGODB_DB_NAME"], **client_options(app.config))
+
+
+def configure(uri, db_name, **options):
+    """Set connection settings; the client is (re)built lazily on next use."""
+    global _uri, _db_name, _options
+    with _lock:
+        _uri = uri
+        _db_name = db_name
+        _options = options
+    close()
+
+
+def add_event_listener(listener):
+    """Attach a PyMongo event listener to clients built from now on."""
+    with _lock:
+        if listener not in _listeners:
+            _listeners.append(listener)
+    close()
+
+
+def get_client():
+    """Return this process's MongoClient, creating it on first use or after a fork."""
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _lock:
+            if _client is None or _client_pid != pid:
+                # A client inherited across fork must not be used or closed
+                # in the child; just build a fresh one.
+                _client = MongoClient(_uri, event_listeners=list(_listeners), **_options)
+                _client_pid = pid
+                logger.info("Created MongoClient for pid %s (maxPoolSize=%s)", pid, _options.get("maxPoolSize"))
+    return _client
+
+
+def get_db(name=None):
+    return get_client()[name or _db_name]
+
+
+def get_collection(name, db_name=None):
+    return get_db(db_name)[name]
+
+
+class LazyCollection:
+    """
+    Class attribute that resolves to a collection on first access per process.
+
+    Importing a model therefore needs no live client, and after a fork the
+    next access binds to the child's own client. The database name comes
+    from MONGODB_DB_NAME via init_app().
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._client = None
+        self._collection = None
+
+    def __get__(self, obj, owner=None):
+        client = get_client()
+        if self._client is not client:
+            self._collection = client[_db_name][self.name]
+            self._client = client
+        return self._collection
+
+
+def close():
+    """Close this process's client, if it owns one."""
+    global _client, _client_pid
+    with _lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+        _client_pid = None
+
+
+def _reset_after_fork():
+    global _client, _client_pid, _lock
+    _lock = threading.Lock()
+    _client = None
+    _client_pid = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
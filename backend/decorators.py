@@ -1,41 +1,142 @@
+import hmac
 import logging
 from functools import wraps
 from flask import request, jsonify, g, current_app
 import jwt
 from backend.models import User
-from .config import Config
+from backend.services import token_service
+from .instrumentation import timed_block
 
 logger = logging.getLogger(__name__)
 
-def token_required(f):
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = None
-        if 'Authorization' in request.headers:
-            token = request.headers['Authorization'].split(" ")[1]
+# Why authentication failed -> response message
+AUTH_ERRORS = {
+    "missing": 'Token is missing!',
+    "expired": 'Token has expired!',
+    "invalid": 'Token is invalid!',
+    "user_not_found": 'User not found!',
+}
+
+
+def _bearer_token():
+    parts = request.headers.get('Authorization', '').split()
+    if len(parts) == 2 and parts[0].lower() == 'bearer':
+        return parts[1]
+    return None
 
+
+def current_claims():
+    """
+    Verified access-token claims for this request, or None.
+
+    The Authorization header is parsed and verified once per request and the
+    outcome is cached on g, so every decorator and helper below shares it.
+    The failure reason, if any, is left in g.auth_error.
+    """
+    if 'auth_claims' not in g:
+        g.auth_claims, g.auth_error = None, None
+        token = _bearer_token()
         if not token:
-            logger.warning("Token missing for request: %s %s", request.method, request.path)
-            return jsonify({'message': 'Token is missing!'}), 401
-
-        try:
-            data = jwt.decode(token, Config.SECRET_KEY, algorithms=["HS256"])
-            user_id = data.get('user_id')
-            logger.info("Token decoded for user_id: %s, request: %s %s", user_id, request.method, request.path)
-            user_data = User.find_by_id(user_id)
-            if not user_data:
-                logger.warning("User not found for user_id: %s, request: %s %s", user_id, request.method, request.path)
-                logger.info("Available user data: %s", user_data)
-                return jsonify({'message': 'User not found!'}), 401
-            current_user = User.from_dict(user_data)
-            logger.info("Token validation successful for user_id: %s (%s %s)", user_id, current_user.email, request.method, request.path)
-        except jwt.ExpiredSignatureError:
-            logger.warning("Token expired for request: %s %s", request.method, request.path)
-            return jsonify({'message': 'Token has expired!'}), 401
-        except jwt.InvalidTokenError:
-            logger.warning("Invalid token for request: %s %s", request.method, request.path)
-            return jsonify({'message': 'Token is invalid!'}), 401
+            g.auth_error = "missing"
+        else:
+            try:
+                with timed_block("jwt"):
+                    g.auth_claims = token_service.decode(token, expected_type=token_service.ACCESS)
+            except jwt.ExpiredSignatureError:
+                g.auth_error = "expired"
+            except jwt.InvalidTokenError:
+                g.auth_error = "invalid"
+        if g.auth_error:
+            logger.warning("Authentication failed (%s) for request: %s %s", g.auth_error, request.method, request.path)
+    return g.auth_claims
+
 
+def current_user_for_request(load_user=False):
+    """
+    User for this request, built from the claims or (for load_user, and for
+    old tokens without claims) read from the database once and cached on g.
+    Returns None and sets g.auth_error on failure.
+    """
+    claims = current_claims()
+    if claims is None:
+        return None
+    if not load_user and 'email' in claims:
+        return User.from_claims(claims)
+    if 'current_user' not in g:
+        with timed_block("user_lookup"):
+            user_data = User.find_by_id(claims.get('user_id'))
+        if not user_data:
+            logger.warning("User not found for user_id: %s, request: %s %s", claims.get('user_id'), request.method, request.path)
+            g.auth_error = "user_not_found"
+            return None
+        g.current_user = User.from_dict(user_data)
+        g.current_user.claims = claims
+    return g.current_user
+
+
+def _unauthorized():
+    return jsonify({'message': AUTH_ERRORS[g.auth_error]}), 401
+
+
+def token_required(f=None, *, load_user=False):
+    """
+    Authenticate the request and pass current_user to the view.
+
+    Access tokens carry the claims most routes need, so current_user is
+    built from them (User.from_claims) without a database read. Views that
+    need the full record (profile, password, account deletion) use
+    @token_required(load_user=True). Old 24-hour tokens that only carry
+    user_id always load the user.
+    """
+    if f is None:
+        return lambda view: token_required(view, load_user=load_user)
+
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        current_user = current_user_for_request(load_user)
+        if current_user is None:
+            return _unauthorized()
+        logger.debug("Authenticated user_id: %s (%s %s)", current_user._id, request.method, request.path)
         return f(current_user, *args, **kwargs)
 
     return decorated
+
+
+def jwt_required():
+    """
+    Drop-in for flask_jwt_extended.jwt_required(): the view keeps its own
+    signature and reads the caller with get_jwt_identity().
+    """
+    def wrapper(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if current_claims() is None:
+                return _unauthorized()
+            return f(*args, **kwargs)
+
+        return decorated
+
+    return wrapper
+
+
+def get_jwt_identity():
+    """User id (string) of the authenticated caller, or None."""
+    claims = current_claims()
+    return claims.get('user_id') if claims else None
+
+
+def admin_token_required(f):
+    """Guard operational endpoints with the ADMIN_TOKEN bearer token; 404 when unset."""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        admin_token = current_app.config.get("ADMIN_TOKEN")
+        if not admin_token:
+            return jsonify({'message': 'Not found'}), 404
+        # Constant-time comparison; bytes, since compare_digest rejects non-ASCII str
+        supplied = request.headers.get('Authorization', '').encode()
+        if not hmac.compare_digest(supplied, f"Bearer {admin_token}".encode()):
+            logger.warning("Rejected admin request: %s %s", request.method, request.path)
+            return jsonify({'message': 'Unauthorized'}), 401
+        return f(*args, **kwargs)
+
+    return decorated
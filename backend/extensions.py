@@ -1,10 +1,7 @@
 from flask_bcrypt import Bcrypt
 from flask_cors import CORS
-from flask_jwt_extended import JWTManager
 
 bcrypt = Bcrypt()
 cors = CORS()
-jwt = JWTManager()
 
-# MongoDB client will be initialized in __init__.py
-mongo = None
+# MongoDB collections are resolved lazily through backend/database.py
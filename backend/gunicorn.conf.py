@@ -0,0 +1,29 @@
+# Gunicorn picks this file up automatically from the working directory.
+# Load the app once in the master so workers fork with it already imported.
+preload_app = True
+
+
+def when_ready(server):
+    # The master only needs MongoDB to validate the connection at boot.
+    # Release its pool so no sockets or monitor threads are inherited by
+    # workers; each worker builds its own client on first use.
+    from backend import database
+    database.close()
+
+
+def post_worker_init(worker):
+    # Workers reset signal handlers after fork; re-install the profiler toggle.
+    from backend.config import Config
+    if Config.PROFILER_SIGNAL:
+        from backend.sampling_profiler import install_signal_handler
+        install_signal_handler(Config.PROFILER_SIGNAL)
+
+    # Apply any webhook events left in the inbox by a previous worker
+    from backend.services.webhook_processor import processor
+    processor.ensure_started(worker.wsgi)
+
+
+def worker_exit(server, worker):
+    # Write chat turns still queued in this worker's write buffer before it exits
+    from backend.services.write_buffer import write_buffer
+    write_buffer.close()
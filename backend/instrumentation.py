@@ -0,0 +1,231 @@
+"""
+Per-request timing instrumentation.
+
+Time spent in each phase of a request (JWT decode, user lookup, MongoDB
+commands, sentiment inference, LLM calls, serialisation) is accumulated on
+flask.g, returned in a Server-Timing header, logged as one JSON line per
+request on the "backend.timing" logger, and observed into in-process
+Prometheus histograms exposed at /metrics.
+
+Metrics are per process: with several gunicorn workers, scrape each worker
+or aggregate downstream.
+"""
+
+import hmac
+import ipaddress
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from flask import g, request, has_request_context, Response
+from pymongo import monitoring
+from . import database
+
+logger = logging.getLogger("backend.timing")
+
+# Seconds; tuned for web requests and their dependencies
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Minimal thread-safe Prometheus histogram with labels."""
+
+    def __init__(self, name, documentation, labelnames, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, value, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted(self._series.items())
+            for labels, (counts, total, count) in items:
+                base = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labelnames, labels))
+                sep = "," if base else ""
+                for bound, bucket_count in zip(self.buckets, counts):
+                    lines.append(f'{self.name}_bucket{{{base}{sep}le="{bound}"}} {bucket_count}')
+                lines.append(f'{self.name}_bucket{{{base}{sep}le="+Inf"}} {count}')
+                lines.append(f"{self.name}_sum{{{base}}} {total}")
+                lines.append(f"{self.name}_count{{{base}}} {count}")
+        return "\n".join(lines)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_DURATION = Histogram(
+    "mindbuddy_http_request_duration_seconds",
+    "Time spent handling a request, by route.",
+    ["method", "route", "status"],
+)
+PHASE_DURATION = Histogram(
+    "mindbuddy_dependency_duration_seconds",
+    "Time spent in a dependency or request phase.",
+    ["dependency", "route"],
+)
+MONGO_DURATION = Histogram(
+    "mindbuddy_mongo_command_duration_seconds",
+    "MongoDB command latency, by command and collection.",
+    ["command", "collection"],
+)
+METRICS = [REQUEST_DURATION, PHASE_DURATION, MONGO_DURATION]
+
+
+def _route():
+    rule = request.url_rule
+    return rule.rule if rule is not None else "<unmatched>"
+
+
+def record(phase, seconds):
+    """Add `seconds` to `phase` for the current request, if there is one."""
+    if not has_request_context():
+        return
+    timings = g.setdefault("timings", {})
+    entry = timings.get(phase)
+    if entry is None:
+        timings[phase] = [seconds, 1]
+    else:
+        entry[0] += seconds
+        entry[1] += 1
+    PHASE_DURATION.observe(seconds, phase, _route())
+
+
+@contextmanager
+def timed_block(phase):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(phase, time.perf_counter() - started)
+
+
+def timed(phase):
+    """Decorator recording a function's wall-clock time under `phase`."""
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            with timed_block(phase):
+                return f(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class MongoTimingListener(monitoring.CommandListener):
+    """Attribute every MongoDB command to the request that issued it."""
+
+    def __init__(self):
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = ""
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = collection
+
+    def _finished(self, event):
+        with self._lock:
+            collection = self._pending.pop((event.connection_id, event.request_id), "")
+        seconds = event.duration_micros / 1e6
+        MONGO_DURATION.observe(seconds, event.command_name, collection)
+        record("mongo", seconds)
+
+    def succeeded(self, event):
+        self._finished(event)
+
+    def failed(self, event):
+        self._finished(event)
+
+
+mongo_listener = MongoTimingListener()
+
+
+def server_timing(timings, total):
+    parts = []
+    for phase, (seconds, count) in timings.items():
+        part = f"{phase};dur={seconds * 1000:.1f}"
+        if count > 1:
+            part += f';desc="{count} calls"'
+        parts.append(part)
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+def render_metrics():
+    return "\n\n".join(metric.render() for metric in METRICS) + "\n"
+
+
+def init_app(app):
+    """Register request hooks, the Mongo listener and the /metrics endpoint."""
+    database.add_event_listener(mongo_listener)
+
+    @app.before_request
+    def start_timer():
+        g.request_started = time.perf_counter()
+        g.timings = {}
+
+    @app.after_request
+    def emit_timings(response):
+        started = g.get("request_started")
+        if started is None:
+            return response
+        total = time.perf_counter() - started
+        timings = g.get("timings", {})
+        route = _route()
+
+        response.headers["Server-Timing"] = server_timing(timings, total)
+        REQUEST_DURATION.observe(total, request.method, route, str(response.status_code))
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("%s", json.dumps({
+                "method": request.method,
+                "route": route,
+                "status": response.status_code,
+                "total_ms": round(total * 1000, 2),
+                "phases_ms": {phase: round(seconds * 1000, 2) for phase, (seconds, _) in timings.items()},
+                "mongo_ops": timings.get("mongo", (0, 0))[1],
+            }))
+        return response
+
+    allowed = [ipaddress.ip_network(net.strip(), strict=False)
+               for net in app.config.get("METRICS_ALLOW_IPS", "").split(",") if net.strip()]
+
+    def from_allowed():
+        # The socket peer, not X-Forwarded-For, which the client controls
+        try:
+            addr = ipaddress.ip_address(request.remote_addr or "")
+        except ValueError:
+            return False
+        return any(addr in net for net in allowed)
+
+    @app.route("/metrics")
+    def metrics():
+        # Disabled like the admin endpoints unless a token or allow-list is configured
+        token = app.config.get("METRICS_TOKEN")
+        authorized = token and hmac.compare_digest(
+            request.headers.get("Authorization", "").encode(), f"Bearer {token}".encode()
+        )
+        if not authorized and not from_allowed():
+            if not token:
+                return {"message": "Not found"}, 404
+            return {"message": "Unauthorized"}, 401
+        return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
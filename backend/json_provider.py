@@ -0,0 +1,65 @@
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from bson import ObjectId
+from flask.json.provider import JSONProvider
+from .instrumentation import timed_block
+
+# Optional fast path; falls back to the standard library encoder
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _default(obj):
+    """Encode the non-JSON types models hand over as-is."""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, datetime):
+        # Stored datetimes are naive UTC; match the orjson output below
+        if obj.tzinfo is not None:
+            obj = obj.astimezone(timezone.utc).replace(tzinfo=None)
+        return obj.isoformat() + "Z"
+    if isinstance(obj, date):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if ORJSON_AVAILABLE:
+    _ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+class MindBuddyJSONProvider(JSONProvider):
+    """
+    JSON provider that understands ObjectId, datetime and Decimal natively,
+    so models can return raw document values from to_api().
+    Uses orjson when installed and writes its bytes straight into the response.
+    Datetimes are emitted as ISO 8601 UTC with a trailing "Z".
+    """
+    mimetype = "application/json"
+
+    def dumps_bytes(self, obj):
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+        return json.dumps(obj, default=_default, separators=(",", ":")).encode("utf-8")
+
+    def dumps(self, obj, **kwargs):
+        if ORJSON_AVAILABLE and not kwargs:
+            return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS).decode("utf-8")
+        kwargs.setdefault("default", _default)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if ORJSON_AVAILABLE and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        with timed_block("serialize"):
+            body = self.dumps_bytes(obj)
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -0,0 +1,13 @@
+"""
+End-to-end load tests for the Mind Buddy API.
+
+Boots the real Flask app in a separate process against a throwaway MongoDB
+(or mongomock), points the Groq client at a local stub, seeds users with
+small/medium/heavy histories, then drives weighted user journeys from
+concurrent virtual users and reports throughput, latency percentiles and
+error rates per endpoint.
+
+    python -m backend.loadtest --users 20 --duration 60 --mongo mongod
+
+See `python -m backend.loadtest --help` for all options.
+"""
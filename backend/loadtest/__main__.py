@@ -0,0 +1,212 @@
+"""
+Run the end-to-end load test from a single command.
+
+    python -m backend.loadtest [--users 20] [--duration 60] [--mongo mongod]
+                               [--fixtures small=10,medium=8,heavy=2] [--json]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from .journeys import Recorder, virtual_user
+from .stub_groq import StubGroqServer
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for_port(port, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def spawn_mongod():
+    if not shutil.which("mongod"):
+        raise SystemExit("mongod not found on PATH; use --mongo mongomock or --mongo-uri")
+    dbpath = tempfile.mkdtemp(prefix="mindbuddy-load-")
+    port = _free_port()
+    proc = subprocess.Popen(
+        ["mongod", "--dbpath", dbpath, "--port", str(port), "--bind_ip", "127.0.0.1", "--quiet"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    if not _wait_for_port(port, 20):
+        proc.kill()
+        raise SystemExit("mongod did not start")
+    return proc, dbpath, f"mongodb://127.0.0.1:{port}/mindbuddy_loadtest"
+
+
+def start_app(args, groq_url, mongo_uri, users_file):
+    port = _free_port()
+    cmd = [
+        sys.executable, "-m", "backend.loadtest.server",
+        "--port", str(port),
+        "--groq-url", groq_url,
+        "--seed", json.dumps(parse_fixtures(args.fixtures)),
+        "--users-file", users_file,
+    ]
+    if mongo_uri:
+        cmd += ["--mongo-uri", mongo_uri]
+    else:
+        cmd.append("--mongomock")
+    if args.real_sentiment:
+        cmd.append("--real-sentiment")
+
+    proc = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline()
+    if not line.startswith("READY"):
+        proc.kill()
+        raise SystemExit("app server failed to start")
+    return proc, f"http://127.0.0.1:{port}"
+
+
+def parse_fixtures(spec):
+    counts = {}
+    for part in spec.split(","):
+        profile, _, n = part.partition("=")
+        counts[profile.strip()] = int(n or 1)
+    return counts
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(p / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[rank]
+
+
+def summarise(samples, elapsed):
+    endpoints = {}
+    total = errors = 0
+    for endpoint, rows in sorted(samples.items()):
+        latencies = sorted(seconds for seconds, _ in rows)
+        failed = sum(1 for _, ok in rows if not ok)
+        total += len(rows)
+        errors += failed
+        endpoints[endpoint] = {
+            "requests": len(rows),
+            "rps": round(len(rows) / elapsed, 2),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+            "error_rate": round(failed / len(rows), 4),
+        }
+    return {
+        "elapsed_s": round(elapsed, 1),
+        "requests": total,
+        "rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "endpoints": endpoints,
+    }
+
+
+def print_report(result):
+    print(f"{result['requests']} requests in {result['elapsed_s']} s "
+          f"({result['rps']} req/s, error rate {result['error_rate']:.2%})")
+    print(f"{'endpoint':<36} {'reqs':>7} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>8}")
+    for endpoint, row in result["endpoints"].items():
+        print(f"{endpoint:<36} {row['requests']:>7} {row['rps']:>8.2f} {row['p50_ms']:>9.1f} "
+              f"{row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['error_rate']:>8.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60, help="seconds of load after ramp-up")
+    parser.add_argument("--ramp-up", type=float, default=5, help="seconds over which virtual users start")
+    parser.add_argument("--think-time", type=float, default=0.0, help="max random pause between journeys (s)")
+    parser.add_argument("--fixtures", default="small=10,medium=8,heavy=2",
+                        help="seeded users per history profile (small, medium, heavy)")
+    parser.add_argument("--mongo", choices=["mongod", "mongomock"], default="mongod")
+    parser.add_argument("--mongo-uri", help="use an existing MongoDB (database mindbuddy_loadtest is dropped)")
+    parser.add_argument("--llm-latency-ms", type=int, default=300, help="stub Groq response latency")
+    parser.add_argument("--real-sentiment", action="store_true", help="use the transformer sentiment model")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for journey selection")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    parser.add_argument("--output", help="also write the JSON result to this file")
+    args = parser.parse_args()
+
+    groq = StubGroqServer(latency_ms=args.llm_latency_ms).start()
+    mongod = None
+    mongo_uri = args.mongo_uri
+    if not mongo_uri and args.mongo == "mongod":
+        mongod = spawn_mongod()
+        mongo_uri = mongod[2]
+
+    users_file = tempfile.NamedTemporaryFile(suffix=".json", delete=False).name
+    app_proc = None
+    try:
+        app_proc, base_url = start_app(args, groq.base_url, mongo_uri, users_file)
+        with open(users_file) as f:
+            users = json.load(f)
+        if not users:
+            raise SystemExit("no fixture users were seeded")
+
+        recorder = Recorder()
+        started = time.monotonic()
+        deadline = started + args.ramp_up + args.duration
+        threads = []
+        for i in range(args.users):
+            thread = threading.Thread(
+                target=virtual_user,
+                args=(base_url, users[i % len(users)], recorder, deadline, args.think_time, args.seed + i),
+                daemon=True,
+            )
+            thread.start()
+            threads.append(thread)
+            time.sleep(args.ramp_up / max(args.users, 1))
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+    finally:
+        if app_proc:
+            app_proc.terminate()
+            app_proc.wait()
+        groq.stop()
+        if mongod:
+            mongod[0].terminate()
+            mongod[0].wait()
+            shutil.rmtree(mongod[1], ignore_errors=True)
+        os.unlink(users_file)
+
+    result = summarise(recorder.samples, elapsed)
+    result["config"] = {
+        "users": args.users,
+        "duration_s": args.duration,
+        "fixtures": parse_fixtures(args.fixtures),
+        "mongo": "uri" if args.mongo_uri else args.mongo,
+        "llm_latency_ms": args.llm_latency_ms,
+        "stub_llm_requests": groq.requests,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_report(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Seed users with realistic amounts of history.
+
+Documents are built with the model classes so they match the storage shape
+the routes read, back-dated across the profile's window, and written with
+insert_many, conversation index entries included. Sentiment rollups are
+rebuilt afterwards so dashboard queries see the same state a long-lived
+account would have.
+"""
+
+import random
+from datetime import datetime, timedelta
+from bson import ObjectId
+from backend.models import (
+    User, MoodEntry, JournalEntry, ChatLog, Conversation, SentimentHistory, SentimentRollup
+)
+from backend.models.conversation import TITLE_LENGTH
+
+# days of history, mood entries, journal entries, conversations, chat messages, sentiment rows
+PROFILES = {
+    "small": {"days": 7, "moods": 7, "journals": 3, "conversations": 2, "chats": 10, "sentiments": 3},
+    "medium": {"days": 90, "moods": 90, "journals": 30, "conversations": 20, "chats": 200, "sentiments": 30},
+    "heavy": {"days": 730, "moods": 730, "journals": 400, "conversations": 150, "chats": 3000, "sentiments": 400},
+}
+
+PASSWORD = "LoadTest-Passw0rd!"
+EMOJIS = ["😢", "😕", "😐", "🙂", "😄"]
+LABELS = ["negative", "neutral", "positive"]
+
+
+def _spread(n, days, now):
+    """n timestamps spread evenly over the last `days` days, oldest first."""
+    step = timedelta(days=days) / max(n, 1)
+    return [now - timedelta(days=days) + step * i for i in range(n)]
+
+
+def _stamp(obj, created_at):
+    obj.created_at = created_at
+    obj.updated_at = created_at
+    return obj.to_document()
+
+
+def _conversations(chats):
+    """Conversation entries for chat documents sorted oldest first, as Conversation.rebuild writes them."""
+    conversations = {}
+    for chat in chats:
+        entry = conversations.get(chat["conversation_id"])
+        if entry is None:
+            entry = conversations[chat["conversation_id"]] = {
+                "_id": chat["conversation_id"],
+                "user_id": chat["user_id"],
+                "title": (chat["message"] or "")[:TITLE_LENGTH],
+                "created_at": chat["created_at"],
+                "message_count": 0,
+                "summary": None,
+                "summarized_count": 0,
+            }
+        entry["last_message"] = chat["message"]
+        entry["last_updated"] = chat["created_at"]
+        entry["message_count"] += 1
+    return list(conversations.values())
+
+
+def seed_user(profile, index, rng):
+    spec = PROFILES[profile]
+    now = datetime.utcnow()
+
+    user = User(
+        email=f"load-{profile}-{index}@example.com",
+        first_name="Load",
+        last_name=f"{profile.title()}{index}",
+        password=PASSWORD,
+    )
+    user.created_at = now - timedelta(days=spec["days"])
+    User.collection.insert_one(user.to_document())
+
+    moods = [
+        _stamp(MoodEntry(user._id, level, EMOJIS[level - 1], note="seeded"), ts)
+        for ts, level in ((ts, rng.randint(1, 5)) for ts in _spread(spec["moods"], spec["days"], now))
+    ]
+    journals = [
+        _stamp(JournalEntry(user._id, f"Entry {i}", "Today I noticed how I was feeling. " * 8), ts)
+        for i, ts in enumerate(_spread(spec["journals"], spec["days"], now))
+    ]
+    conversation_ids = [str(ObjectId()) for _ in range(spec["conversations"])]
+    chats = [
+        _stamp(ChatLog(user._id, "I have been thinking about work a lot.", ai_response="Tell me more.",
+                       conversation_id=conversation_ids[i % len(conversation_ids)]), ts)
+        for i, ts in enumerate(_spread(spec["chats"], spec["days"], now))
+    ]
+    sentiments = []
+    for ts in _spread(spec["sentiments"], spec["days"], now):
+        label = rng.choice(LABELS)
+        scores = {name: 0.1 for name in LABELS}
+        scores[label] = 0.8
+        sentiments.append(_stamp(SentimentHistory(user._id, sentiment_label=label, sentiment_scores=scores), ts))
+
+    written = (
+        (MoodEntry, moods), (JournalEntry, journals), (ChatLog, chats),
+        (Conversation, _conversations(chats)), (SentimentHistory, sentiments),
+    )
+    for model, docs in written:
+        if docs:
+            model.collection.insert_many(docs, ordered=False)
+    SentimentRollup.rebuild_for_user(user._id)
+
+    return {"email": user.email, "password": PASSWORD, "profile": profile, "user_id": str(user._id)}
+
+
+def seed(counts, seed_value=42):
+    """Seed {profile: n} users; return their credentials."""
+    rng = random.Random(seed_value)
+    users = []
+    for profile, n in counts.items():
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown fixture profile: {profile}")
+        users.extend(seed_user(profile, i, rng) for i in range(n))
+    return users
@@ -0,0 +1,134 @@
+"""
+User journeys driven by each virtual user.
+
+A journey is a short sequence of requests a real client makes together.
+Each request is recorded under its endpoint template (e.g.
+"POST /api/mood/entries") so results aggregate across users.
+"""
+
+import random
+import threading
+import time
+import uuid
+
+import httpx
+
+
+class Recorder:
+    """Thread-safe collection of (endpoint, latency, ok) samples."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+
+    def add(self, endpoint, seconds, ok):
+        with self._lock:
+            self.samples.setdefault(endpoint, []).append((seconds, ok))
+
+
+class Session:
+    """An authenticated HTTP client for one virtual user."""
+
+    def __init__(self, base_url, recorder, timeout=30.0):
+        self.client = httpx.Client(base_url=base_url, timeout=timeout)
+        self.recorder = recorder
+        self.token = None
+
+    def request(self, method, path, endpoint=None, expect=(200, 201), **kwargs):
+        headers = kwargs.pop("headers", {})
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        endpoint = endpoint or f"{method} {path.split('?')[0]}"
+        started = time.perf_counter()
+        try:
+            response = self.client.request(method, path, headers=headers, **kwargs)
+        except httpx.HTTPError:
+            self.recorder.add(endpoint, time.perf_counter() - started, False)
+            return None
+        self.recorder.add(endpoint, time.perf_counter() - started, response.status_code in expect)
+        return response
+
+    def login(self, email, password):
+        response = self.request("POST", "/api/auth/login", json={"email": email, "password": password})
+        if response is not None and response.status_code == 200:
+            self.token = response.json()["token"]
+        return self.token is not None
+
+    def close(self):
+        self.client.close()
+
+
+def register_login(session, user, rng):
+    email = f"load-new-{uuid.uuid4().hex}@example.com"
+    password = "LoadTest-Passw0rd!"
+    session.request("POST", "/api/auth/register", json={
+        "firstName": "New", "lastName": "User", "email": email, "password": password,
+    })
+    fresh = Session(str(session.client.base_url), session.recorder)
+    try:
+        fresh.login(email, password)
+    finally:
+        fresh.close()
+
+
+def log_mood(session, user, rng):
+    level = rng.randint(1, 5)
+    session.request("POST", "/api/mood/entries", json={
+        "moodLevel": level, "emoji": "🙂", "note": "load test", "triggers": ["work"],
+    })
+    session.request("GET", "/api/mood/today")
+
+
+def write_journal(session, user, rng):
+    session.request("POST", "/api/journal/entries", json={
+        "title": "Load test", "content": "I felt calm after a walk but a bit anxious about work. " * 4,
+    })
+    session.request("GET", "/api/journal/entries")
+
+
+def chat(session, user, rng):
+    response = session.request("POST", "/api/chat/message", json={"message": "I feel stressed about my exams"})
+    if response is not None and response.status_code == 200:
+        conversation_id = response.json().get("conversation_id")
+        session.request("POST", "/api/chat/message", json={
+            "message": "What can I do to relax tonight?", "conversation_id": conversation_id,
+        })
+    session.request("GET", "/api/chat/history?limit=50")
+
+
+def dashboard(session, user, rng):
+    session.request("GET", "/api/user/stats")
+    session.request("GET", "/api/mood/stats?days=30")
+    session.request("GET", "/api/mood/entries?limit=20")
+    session.request("GET", "/api/ai_insights/?limit=10")
+    session.request("GET", "/api/ai_insights/daily")
+
+
+# (journey, weight)
+JOURNEYS = [
+    (dashboard, 35),
+    (log_mood, 25),
+    (chat, 20),
+    (write_journal, 15),
+    (register_login, 5),
+]
+
+
+def pick(rng):
+    journeys, weights = zip(*JOURNEYS)
+    return rng.choices(journeys, weights=weights)[0]
+
+
+def virtual_user(base_url, user, recorder, deadline, think_time, seed_value):
+    """Log in as `user` and run weighted journeys until `deadline`."""
+    rng = random.Random(seed_value)
+    session = Session(base_url, recorder)
+    try:
+        if not session.login(user["email"], user["password"]):
+            return
+        while time.monotonic() < deadline:
+            pick(rng)(session, user, rng)
+            if think_time:
+                time.sleep(rng.uniform(0, think_time))
+    finally:
+        session.close()
@@ -0,0 +1,123 @@
+"""
+App process for the load test.
+
+Configures the environment before importing the app, seeds fixtures,
+writes their credentials to --users-file and serves the app with a
+threaded WSGI server. Prints "READY <port>" once it accepts requests.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+
+
+def install_stub_sentiment():
+    """Replace the transformer sentiment model with keyword matching."""
+    from backend.services import sentiment_service
+
+    class KeywordSentimentAnalyzer(sentiment_service.SentimentAnalyzer):
+        NEGATIVE = ("sad", "anxious", "tired", "stressed", "lonely", "angry")
+        POSITIVE = ("happy", "calm", "grateful", "good", "great", "relaxed")
+
+        def load_model(self):
+            pass
+
+        def analyze_sentiment(self, text):
+            lowered = (text or "").lower()
+            negative = sum(word in lowered for word in self.NEGATIVE)
+            positive = sum(word in lowered for word in self.POSITIVE)
+            label = "negative" if negative > positive else "positive" if positive > negative else "neutral"
+            scores = {"negative": 0.1, "neutral": 0.1, "positive": 0.1}
+            scores[label] = 0.8
+            crisis_flag, crisis_keywords = self._detect_crisis(text or "")
+            return {
+                "sentiment_label": label,
+                "sentiment_scores": scores,
+                "detected_emotions": self._detect_emotions(text or ""),
+                "crisis_flag": crisis_flag,
+                "crisis_keywords": crisis_keywords,
+            }
+
+    sentiment_service._sentiment_analyzer = KeywordSentimentAnalyzer()
+
+
+def patch_mongomock_bulk():
+    """
+    pymongo >= 4.11 passes sort= to every bulk update, which mongomock's
+    bulk builder does not accept. The app never sets it, so drop it; without
+    this the write buffer and Conversation.rebuild fail under --mongomock.
+    """
+    from mongomock.collection import BulkOperationBuilder
+
+    add_update = BulkOperationBuilder.add_update
+
+    def add_update_without_sort(self, *args, sort=None, **kwargs):
+        if sort is not None:
+            raise NotImplementedError("mongomock does not support sort on bulk updates")
+        return add_update(self, *args, **kwargs)
+
+    BulkOperationBuilder.add_update = add_update_without_sort
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--mongo-uri")
+    parser.add_argument("--mongomock", action="store_true")
+    parser.add_argument("--db-name", default="mindbuddy_loadtest")
+    parser.add_argument("--groq-url", required=True)
+    parser.add_argument("--seed", default="{}", help="JSON {profile: count}")
+    parser.add_argument("--users-file", required=True)
+    parser.add_argument("--real-sentiment", action="store_true")
+    args = parser.parse_args()
+
+    os.environ["GROQ_BASE_URL"] = args.groq_url
+    os.environ["GROQ_API_KEY"] = "stub"
+    os.environ["MONGODB_DB_NAME"] = args.db_name
+    os.environ.setdefault("LOGGING_LEVEL", "WARNING")
+    # Every virtual user logs in from 127.0.0.1 and fixture accounts are
+    # shared between virtual users; keep the login buckets out of the way
+    for name in ("LOGIN_IP_PER_MINUTE", "LOGIN_IP_BURST", "LOGIN_ACCOUNT_PER_MINUTE", "LOGIN_ACCOUNT_BURST"):
+        os.environ.setdefault(name, "100000")
+    if args.mongo_uri:
+        os.environ["MONGO_URI"] = args.mongo_uri
+
+    from backend import create_app, database
+
+    if args.mongomock:
+        import mongomock
+        database.MongoClient = mongomock.MongoClient
+        patch_mongomock_bulk()
+
+    if not args.real_sentiment:
+        install_stub_sentiment()
+
+    app = create_app()
+
+    # The load-test database is ours; start every run from the same state.
+    database.get_client().drop_database(args.db_name)
+    from backend import models
+    models.ensure_indexes()
+
+    from .fixtures import seed
+    users = seed(json.loads(args.seed))
+    with open(args.users_file, "w") as f:
+        json.dump(users, f)
+
+    from werkzeug.serving import make_server
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server("127.0.0.1", args.port, app, threaded=True)
+    print(f"READY {args.port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        database.close()
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
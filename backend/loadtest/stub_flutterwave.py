@@ -0,0 +1,91 @@
+"""
+Local stand-in for the Flutterwave v3 API.
+
+Serves POST /v3/payments with a hosted-link response. Connections and
+requests are counted so callers can check connection reuse, and
+`fail_next` makes the next N requests answer 503 to exercise retries.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        server = self.server
+
+        with server.lock:
+            server.requests += 1
+            failing = server.fail_next > 0
+            if failing:
+                server.fail_next -= 1
+
+        if server.latency_s:
+            time.sleep(server.latency_s)
+
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            self._send(401, {"status": "error", "message": "Authorization required"})
+        elif failing:
+            self._send(503, {"status": "error", "message": "Service unavailable"})
+        elif self.path != "/v3/payments":
+            self._send(404, {"status": "error", "message": f"unknown path {self.path}"})
+        else:
+            self._send(200, {
+                "status": "success",
+                "message": "Hosted Link",
+                "data": {"link": f"{server.base_url}/pay/{body.get('tx_ref')}"},
+            })
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubFlutterwaveServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=20):
+        super().__init__((host, port), _Handler)
+        self.latency_s = latency_ms / 1000
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+        self.fail_next = 0
+        self._thread = None
+
+    def process_request(self, request, client_address):
+        with self.lock:
+            self.connections += 1
+        super().process_request(request, client_address)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_url(self):
+        return f"{self.base_url}/v3"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="stub-flutterwave", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,93 @@
+"""
+Local stand-in for the Groq chat completions API.
+
+The groq SDK honours GROQ_BASE_URL, so the app under test talks to this
+server instead of api.groq.com. Each request sleeps for a configurable
+latency and returns a canned OpenAI-shaped completion.
+"""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+COMPLETIONS_PATH = "/openai/v1/chat/completions"
+
+REPLIES = [
+    "That sounds like a lot to carry. What feels heaviest right now?",
+    "Thank you for sharing that. Would a short breathing exercise help?",
+    "It makes sense to feel that way. What usually helps you unwind?",
+]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+
+        if self.path != COMPLETIONS_PATH:
+            self._send(404, {"error": {"message": f"unknown path {self.path}"}})
+            return
+
+        latency = self.server.latency_s
+        if self.server.jitter_s:
+            latency += random.uniform(0, self.server.jitter_s)
+        time.sleep(latency)
+
+        with self.server.lock:
+            self.server.requests += 1
+
+        reply = random.choice(REPLIES)
+        self._send(200, {
+            "id": f"chatcmpl-stub-{self.server.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": reply},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 64, "completion_tokens": 24, "total_tokens": 88},
+        })
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubGroqServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=300, jitter_ms=100):
+        super().__init__((host, port), _Handler)
+        self.latency_s = latency_ms / 1000
+        self.jitter_s = jitter_ms / 1000
+        self.lock = threading.Lock()
+        self.requests = 0
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="stub-groq", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,156 @@
+"""
+Application logging setup.
+
+Request threads only enqueue records: a QueueHandler on the root logger
+hands them to a QueueListener thread that does formatting, redaction
+(passwords, tokens, secrets, e-mail local parts) and I/O. High-volume
+loggers can be sampled before enqueueing. Levels can be set per logger, and
+output is either the classic text format or one JSON object per line.
+
+Config:
+    LOGGING_LEVEL       root level (INFO)
+    LOG_LEVELS          per-logger levels, "werkzeug=WARNING,backend.timing=INFO"
+    LOG_SAMPLE_RATES    keep-fraction below ERROR, "backend.timing=0.1"
+    LOG_FORMAT          "text" or "json"
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import re
+from logging.handlers import QueueHandler, QueueListener
+
+# Attributes every LogRecord has; anything else came in via `extra=`
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+SENSITIVE_KEYS = re.compile(r"pass(word)?|pwd|token|secret|authorization|api[_-]?key|hash", re.I)
+_PATTERNS = [
+    (re.compile(r"(Bearer\s+)[A-Za-z0-9._~+/=-]+", re.I), r"\1[REDACTED]"),
+    (re.compile(r"eyJ[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+"), "[REDACTED_JWT]"),
+    (re.compile(r"\$2[aby]\$\d{2}\$[./A-Za-z0-9]{53}"), "[REDACTED_HASH]"),
+    (re.compile(r"(['\"]?(?:password(?:_hash)?|secret|token)['\"]?\s*[:=]\s*)(['\"]?)[^'\",\s}]+\2", re.I),
+     r"\1\2[REDACTED]\2"),
+    (re.compile(r"\b([A-Za-z0-9])[A-Za-z0-9._%+-]*@([A-Za-z0-9.-]+\.[A-Za-z]{2,})\b"), r"\1***@\2"),
+]
+
+
+def redact(value):
+    """Mask secrets in a string, or in the values of a dict/list."""
+    if isinstance(value, str):
+        for pattern, replacement in _PATTERNS:
+            value = pattern.sub(replacement, value)
+        return value
+    if isinstance(value, dict):
+        return {k: "[REDACTED]" if isinstance(k, str) and SENSITIVE_KEYS.search(k) else redact(v)
+                for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(redact(v) for v in value)
+    return value
+
+
+class RedactingFormatter(logging.Formatter):
+    """Text formatter that masks secrets in the final line."""
+
+    def format(self, record):
+        return redact(super().format(record))
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of sub-ERROR records from the configured loggers."""
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record):
+        if record.levelno >= logging.ERROR or not self.rates:
+            return True
+        name = record.name
+        while name:
+            rate = self.rates.get(name)
+            if rate is not None:
+                return rate >= 1 or random.random() < rate
+            name = name.rpartition(".")[0]
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record; fields passed via `extra=` are included."""
+
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update({k: v for k, v in vars(record).items() if k not in _RESERVED})
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(redact(entry), default=str)
+
+
+def parse_mapping(spec, cast):
+    """Parse "a=1,b.c=2" into {"a": cast("1"), "b.c": cast("2")}."""
+    mapping = {}
+    for part in (spec or "").split(","):
+        name, _, value = part.partition("=")
+        if name.strip() and value.strip():
+            mapping[name.strip()] = cast(value.strip())
+    return mapping
+
+
+_listener = None
+_queue_handler = None
+
+
+def configure_logging(config):
+    """Install the queue-based root handler; safe to call more than once."""
+    global _listener, _queue_handler
+
+    stream = logging.StreamHandler()
+    if config["LOG_FORMAT"] == "json":
+        stream.setFormatter(JSONFormatter())
+    else:
+        stream.setFormatter(RedactingFormatter(config["LOGGING_FORMAT"]))
+
+    root = logging.getLogger()
+    if _queue_handler is not None:
+        root.removeHandler(_queue_handler)
+    if _listener is not None:
+        _listener.stop()
+
+    _queue_handler = QueueHandler(queue.SimpleQueue())
+    _queue_handler.addFilter(SamplingFilter(parse_mapping(config["LOG_SAMPLE_RATES"], float)))
+    root.addHandler(_queue_handler)
+    root.setLevel(config["LOGGING_LEVEL"])
+
+    for name, level in parse_mapping(config["LOG_LEVELS"], str.upper).items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = QueueListener(_queue_handler.queue, stream, respect_handler_level=True)
+    _listener.start()
+
+
+def _stop_listener():
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+
+
+def _restart_after_fork():
+    # The listener thread does not survive fork; give the child its own
+    # queue and thread so worker records are not left unconsumed.
+    global _listener
+    if _listener is None:
+        return
+    _queue_handler.queue = queue.SimpleQueue()
+    _listener = QueueListener(_queue_handler.queue, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
+
+
+atexit.register(_stop_listener)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
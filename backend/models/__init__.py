@@ -15,9 +15,13 @@ from .user import User
 from .user_settings import UserSettings
 from .mood_entry import MoodEntry
 from .journal_entry import JournalEntry
+from .sentiment_rollup import SentimentRollup
 from .sentiment_history import SentimentHistory
 from .chat_log import ChatLog
+from .conversation import Conversation
 from .wellness_insight import WellnessInsight
+from .webhook_event import WebhookEvent
+from .revoked_token import RevokedToken
 
 # Export all models
 __all__ = [
@@ -26,11 +30,24 @@ __all__ = [
     "UserSettings",
     "MoodEntry",
     "SentimentHistory",
+    "SentimentRollup",
     "ChatLog",
+    "Conversation",
     "WellnessInsight",
+    "WebhookEvent",
+    "RevokedToken",
     "SubscribeRequest",
     "SubscribeResponse",
     "WebhookResponse",
     "SubscriptionDoc",
     "UserDoc"
 ]
+
+
+def ensure_indexes():
+    """Create the indexes the models rely on (idempotent)"""
+    SentimentRollup.ensure_indexes()
+    WebhookEvent.ensure_indexes()
+    RevokedToken.ensure_indexes()
+    Conversation.ensure_indexes()
+    ChatLog.ensure_indexes()
@@ -1,13 +1,16 @@
-from backend import mongo
+from backend.database import LazyCollection
 from datetime import datetime
 from bson import ObjectId
+from pymongo import InsertOne
+from .serialization import parse_datetime
+from .conversation import Conversation
 
 class ChatLog:
     """
     Model to store chat conversations with the AI assistant (Sereni).
     Maintains conversation context and history.
     """
-    collection = mongo.mindbuddy.chat_logs
+    collection = LazyCollection("chat_logs")
 
     def __init__(self, user_id, message, role='user', ai_response=None, 
                  conversation_id=None, context_summary=None):
@@ -28,6 +31,10 @@ class ChatLog:
         self.created_at = datetime.utcnow()
         self.updated_at = datetime.utcnow()
 
+    @classmethod
+    def ensure_indexes(cls):
+        cls.collection.create_index([("conversation_id", 1), ("created_at", -1)])
+
     @classmethod
     def find_by_user(cls, user_id, limit=50):
         """Find recent chat messages for a user"""
@@ -49,59 +56,90 @@ class ChatLog:
     
     @classmethod
     def get_recent_conversations(cls, user_id, limit=10):
-        """Get recent unique conversations for a user"""
-        user_oid = ObjectId(user_id) if isinstance(user_id, str) else user_id
-        
-        pipeline = [
-            {"$match": {"user_id": user_oid}},
-            {"$sort": {"created_at": -1}},
-            {
-                "$group": {
-                    "_id": "$conversation_id",
-                    "last_message": {"$first": "$message"},
-                    "last_updated": {"$first": "$created_at"},
-                    "message_count": {"$sum": 1}
-                }
-            },
-            {"$sort": {"last_updated": -1}},
-            {"$limit": limit}
-        ]
-        
-        return list(cls.collection.aggregate(pipeline))
+        """Get recent unique conversations for a user (from the conversations index)"""
+        return Conversation.find_recent(user_id, limit=limit)
     
+    @classmethod
+    def find_recent_turns(cls, conversation_id, limit=10):
+        """Last `limit` turns of a conversation, oldest first, with just the fields prompts use"""
+        turns = list(cls.collection.find(
+            {"conversation_id": conversation_id},
+            {"role": 1, "message": 1, "ai_response": 1}
+        ).sort([("created_at", -1), ("_id", -1)]).limit(limit))
+        turns.reverse()
+        return turns
+
+    @classmethod
+    def find_turns_after(cls, conversation_id, after=None, after_id=None, limit=20):
+        """
+        Turns after the (created_at, _id) position (after, after_id), oldest
+        first: the input to the summariser. Turns can share a millisecond,
+        so _id breaks ties.
+        """
+        query = {"conversation_id": conversation_id}
+        if after is not None:
+            if after_id is None:
+                query["created_at"] = {"$gt": after}
+            else:
+                query["$or"] = [
+                    {"created_at": {"$gt": after}},
+                    {"created_at": after, "_id": {"$gt": after_id}},
+                ]
+        return list(cls.collection.find(
+            query, {"role": 1, "message": 1, "ai_response": 1, "created_at": 1}
+        ).sort([("created_at", 1), ("_id", 1)]).limit(limit))
+
+    @classmethod
+    def set_context_summary(cls, chat_id, summary):
+        """Record on a turn the conversation summary that runs through it"""
+        return cls.collection.update_one({"_id": chat_id}, {"$set": {"context_summary": summary}})
+
     @classmethod
     def get_conversation_context(cls, conversation_id, limit=5):
-        """Get recent messages for conversation context (for AI)"""
-        messages = cls.find_by_conversation(conversation_id, limit=limit)
-        
-        # Format for AI context
+        """Get the most recent messages for conversation context (for AI)"""
         context = []
-        for msg in messages:
-            context.append({
-                "role": msg.get("role", "user"),
-                "content": msg.get("message") if msg.get("role") == "user" else msg.get("ai_response")
-            })
-        
+        for msg in cls.find_recent_turns(conversation_id, limit=limit):
+            if msg.get("role", "user") != "user":
+                context.append({"role": "assistant", "content": msg.get("message")})
+                continue
+            context.append({"role": "user", "content": msg.get("message")})
+            if msg.get("ai_response"):
+                context.append({"role": "assistant", "content": msg["ai_response"]})
         return context
 
     def save(self):
         self.updated_at = datetime.utcnow()
-        result = self.collection.insert_one(self.to_dict())
+        result = self.collection.insert_one(self.to_document())
         self._id = result.inserted_id
+        Conversation.record_message(self.conversation_id, self.user_id, self.message, self.created_at)
         return result
 
+    def write_operations(self):
+        """save() as (collection, bulk_write operation) pairs, for services.write_buffer"""
+        self.updated_at = datetime.utcnow()
+        return [
+            (self.collection, InsertOne(self.to_document())),
+            (Conversation.collection, Conversation.record_message_operation(
+                self.conversation_id, self.user_id, self.message, self.created_at
+            )),
+        ]
+
     def update(self, data):
         self.updated_at = datetime.utcnow()
         data["updated_at"] = self.updated_at
         return self.collection.update_one({"_id": self._id}, {"$set": data})
 
     def delete(self):
-        return self.collection.delete_one({"_id": self._id})
+        result = self.collection.delete_one({"_id": self._id})
+        if result.deleted_count:
+            Conversation.remove_message(self.conversation_id, self.user_id)
+        return result
 
-    def to_dict(self):
+    def to_document(self):
+        """Storage form: native ObjectIds and BSON dates"""
         return {
-            "_id": str(self._id),
-            "user_id": str(self.user_id),
+            "_id": self._id,
+            "user_id": self.user_id,
             "conversation_id": self.conversation_id,
             "message": self.message,
             "role": self.role,
@@ -109,10 +147,14 @@ class ChatLog:
             "context_summary": self.context_summary,
             "sentiment": self.sentiment,
             "tokens_used": self.tokens_used,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+            "created_at": self.created_at,
+            "updated_at": self.updated_at
         }
 
+    def to_api(self):
+        """JSON response form; the app JSON provider encodes ObjectIds and dates"""
+        return self.to_document()
+
     @classmethod
     def from_dict(cls, data):
         chat = cls.__new__(cls)
@@ -125,8 +167,8 @@ class ChatLog:
         chat.context_summary = data.get("context_summary")
         chat.sentiment = data.get("sentiment")
         chat.tokens_used = data.get("tokens_used", 0)
-        chat.created_at = data.get("created_at")
-        chat.updated_at = data.get("updated_at")
+        chat.created_at = parse_datetime(data.get("created_at"))
+        chat.updated_at = parse_datetime(data.get("updated_at"))
         return chat
 
     def __repr__(self):
@@ -0,0 +1,173 @@
+from backend.database import LazyCollection
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+import logging
+
+logger = logging.getLogger(__name__)
+
+TITLE_LENGTH = 80
+DUPLICATE_KEY = 11000
+
+
+class Conversation:
+    """
+    Per-conversation index of chat_logs, keyed by conversation_id.
+    Updated incrementally from ChatLog.save so the conversation list reads
+    `limit` small documents from the (user_id, last_updated) index instead
+    of aggregating every message the user has sent.
+
+    title is taken from the first message. summary is a rolling summary of
+    the first summarized_count turns, up to the turn at (summary_through,
+    summary_through_id). It is written by services.summary_service so
+    prompts need not resend old turns.
+    """
+    collection = LazyCollection("conversations")
+
+    @classmethod
+    def ensure_indexes(cls):
+        cls.collection.create_index([("user_id", ASCENDING), ("last_updated", DESCENDING)])
+
+    @classmethod
+    def _message_update(cls, conversation_id, user_id, message, created_at):
+        user_oid = ObjectId(user_id) if isinstance(user_id, str) else user_id
+        return {"_id": conversation_id, "user_id": user_oid}, {
+            "$inc": {"message_count": 1},
+            "$max": {"last_updated": created_at},
+            "$set": {"last_message": message},
+            "$setOnInsert": {
+                "created_at": created_at,
+                "title": (message or "")[:TITLE_LENGTH],
+                "summary": None,
+                "summarized_count": 0,
+            },
+        }
+
+    @classmethod
+    def record_message(cls, conversation_id, user_id, message, created_at):
+        """Count one chat log into its conversation, creating the entry on first use"""
+        query, update = cls._message_update(conversation_id, user_id, message, created_at)
+        try:
+            cls.collection.update_one(query, update, upsert=True)
+        except DuplicateKeyError:
+            # The id belongs to another user's conversation; keep it out of this user's list
+            logger.warning("Conversation %s is owned by another user", conversation_id)
+
+    @classmethod
+    def record_message_operation(cls, conversation_id, user_id, message, created_at):
+        """record_message as a bulk_write operation (see services.write_buffer)"""
+        query, update = cls._message_update(conversation_id, user_id, message, created_at)
+        return UpdateOne(query, update, upsert=True)
+
+    @classmethod
+    def remove_message(cls, conversation_id, user_id):
+        user_oid = ObjectId(user_id) if isinstance(user_id, str) else user_id
+        return cls.collection.update_one(
+            {"_id": conversation_id, "user_id": user_oid}, {"$inc": {"message_count": -1}}
+        )
+
+    @classmethod
+    def find_recent(cls, user_id, limit=10):
+        """Most recently active conversations for a user"""
+        user_oid = ObjectId(user_id) if isinstance(user_id, str) else user_id
+        return list(cls.collection.find({"user_id": user_oid}, {"user_id": 0})
+                    .sort("last_updated", DESCENDING)
+                    .limit(limit))
+
+    @classmethod
+    def get_state(cls, conversation_id):
+        """Owner, message count and summary only: a point read on _id"""
+        return cls.collection.find_one(
+            {"_id": conversation_id},
+            {"user_id": 1, "message_count": 1, "summary": 1, "summarized_count": 1,
+             "summary_through": 1, "summary_through_id": 1}
+        )
+
+    @classmethod
+    def find_owned(cls, conversation_id, user_id):
+        user_oid = ObjectId(user_id) if isinstance(user_id, str) else user_id
+        return cls.collection.find_one({"_id": conversation_id, "user_id": user_oid})
+
+    @classmethod
+    def set_summary(cls, conversation_id, summary, summarized_count, summary_through, summary_through_id=None,
+                    expected_count=0):
+        """
+        Replace the summary, provided nobody else has extended it since it was
+        read (summarized_count still equals expected_count). Returns whether
+        it was written.
+        """
+        # Entries indexed before summaries existed have no summarized_count
+        current = expected_count if expected_count else {"$in": [0, None]}
+        result = cls.collection.update_one(
+            {"_id": conversation_id, "summarized_count": current},
+            {"$set": {
+                "summary": summary,
+                "summarized_count": summarized_count,
+                "summary_through": summary_through,
+                "summary_through_id": summary_through_id,
+            }}
+        )
+        return result.modified_count == 1
+
+    @classmethod
+    def rebuild(cls, user_id=None, batch_size=500):
+        """
+        Recompute entries from chat_logs (one aggregation), for one user or
+        everyone. Used to backfill and after bulk imports. Returns the number
+        of conversations written.
+        """
+        from .chat_log import ChatLog
+
+        match = {}
+        if user_id is not None:
+            match["user_id"] = ObjectId(user_id) if isinstance(user_id, str) else user_id
+        pipeline = [
+            {"$match": match},
+            {"$sort": {"created_at": 1}},
+            {"$group": {
+                "_id": {"conversation_id": "$conversation_id", "user_id": "$user_id"},
+                "title": {"$first": "$message"},
+                "created_at": {"$first": "$created_at"},
+                "last_message": {"$last": "$message"},
+                "last_updated": {"$last": "$created_at"},
+                "message_count": {"$sum": 1},
+            }},
+            # The first user to write to a conversation id owns it, as in record_message
+            {"$sort": {"created_at": 1}},
+        ]
+
+        written = 0
+        batch = []
+        seen = set()
+        for row in ChatLog.collection.aggregate(pipeline, allowDiskUse=True):
+            key = row.pop("_id")
+            if key["conversation_id"] in seen:
+                continue
+            seen.add(key["conversation_id"])
+            row["title"] = (row["title"] or "")[:TITLE_LENGTH]
+            # Keyed on the owner too: an id another user already owns fails
+            # the upsert with a duplicate key and is left alone
+            batch.append(UpdateOne(
+                {"_id": key["conversation_id"], "user_id": key["user_id"]},
+                {"$set": row, "$setOnInsert": {"summary": None, "summarized_count": 0}},
+                upsert=True
+            ))
+            if len(batch) >= batch_size:
+                written += cls._write_rebuilt(batch)
+                batch = []
+        if batch:
+            written += cls._write_rebuilt(batch)
+        return written
+
+    @classmethod
+    def _write_rebuilt(cls, batch):
+        try:
+            cls.collection.bulk_write(batch, ordered=False)
+            return len(batch)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if any(error.get("code") != DUPLICATE_KEY for error in errors):
+                raise
+            for error in errors:
+                logger.warning("Conversation %s is owned by another user", error.get("op", {}).get("q", {}).get("_id"))
+            return len(batch) - len(errors)
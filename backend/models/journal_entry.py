@@ -1,9 +1,10 @@
-from backend import mongo
+from backend.database import LazyCollection
 from datetime import datetime
 from bson import ObjectId
+from .serialization import parse_datetime
 
 class JournalEntry:
-    collection = mongo.mindbuddy.journal_entries
+    collection = LazyCollection("journal_entries")
 
     def __init__(self, user_id, title, content, is_private=False, sentiment=None, ai_insights=None, tags=None):
         self._id = ObjectId()
@@ -28,7 +29,7 @@ class JournalEntry:
 
     def save(self):
         self.updated_at = datetime.utcnow()
-        result = self.collection.insert_one(self.to_dict())
+        result = self.collection.insert_one(self.to_document())
         self._id = result.inserted_id
         return result
 
@@ -40,23 +41,32 @@ class JournalEntry:
     def delete(self):
         return self.collection.delete_one({"_id": self._id})
 
-    def to_dict(self):
-        # return both snake_case (for backward compatibility) and camelCase (for React)
+    def to_document(self):
+        """Storage form: snake_case only, native ObjectIds and BSON dates"""
         return {
-            "_id": str(self._id),
-            "id": str(self._id),
-            "user_id": str(self.user_id),
-            "userId": str(self.user_id),
+            "_id": self._id,
+            "user_id": self.user_id,
             "title": self.title,
             "content": self.content,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "createdAt": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-            "updatedAt": self.updated_at.isoformat() if self.updated_at else None,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
             "is_private": self.is_private,
-            "isPrivate": self.is_private,
             "sentiment": self.sentiment,
             "ai_insights": self.ai_insights,
+            "tags": self.tags
+        }
+
+    def to_api(self):
+        """JSON response form in the camelCase shape the React client reads; ObjectIds and dates are encoded by the app JSON provider"""
+        return {
+            "id": self._id,
+            "userId": self.user_id,
+            "title": self.title,
+            "content": self.content,
+            "createdAt": self.created_at,
+            "updatedAt": self.updated_at,
+            "isPrivate": self.is_private,
+            "sentiment": self.sentiment,
             "aiInsights": self.ai_insights,
             "tags": self.tags
         }
@@ -82,14 +92,7 @@ class JournalEntry:
         created = data.get("created_at") or data.get("createdAt")
         updated = data.get("updated_at") or data.get("updatedAt")
 
-        if isinstance(created, str):
-            entry.created_at = datetime.fromisoformat(created.replace("Z", "+00:00"))
-        else:
-            entry.created_at = created
-
-        if isinstance(updated, str):
-            entry.updated_at = datetime.fromisoformat(updated.replace("Z", "+00:00"))
-        else:
-            entry.updated_at = updated
+        entry.created_at = parse_datetime(created)
+        entry.updated_at = parse_datetime(updated)
 
         return entry
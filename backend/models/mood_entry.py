@@ -1,9 +1,10 @@
-from backend import mongo
+from backend.database import LazyCollection
 from datetime import datetime
 from bson import ObjectId
+from .serialization import parse_datetime
 
 class MoodEntry:
-    collection = mongo.mindbuddy.mood_entries
+    collection = LazyCollection("mood_entries")
 
     def __init__(self, user_id, mood_level, emoji, note=None, triggers=None):
         self._id = ObjectId()
@@ -26,7 +27,7 @@ class MoodEntry:
 
     def save(self):
         self.updated_at = datetime.utcnow()
-        result = self.collection.insert_one(self.to_dict())
+        result = self.collection.insert_one(self.to_document())
         self._id = result.inserted_id
         return result
 
@@ -47,22 +48,30 @@ class MoodEntry:
     def get_triggers(self):
         return self.triggers or []
 
-    def to_dict(self):
-        # normalize to camelCase for frontend
+    def to_document(self):
+        """Storage form: snake_case only, native ObjectIds and BSON dates"""
         return {
-            "_id": str(self._id),
-            "id": str(self._id),
-            "user_id": str(self.user_id),
-            "userId": str(self.user_id),
+            "_id": self._id,
+            "user_id": self.user_id,
             "mood_level": self.mood_level,
+            "emoji": self.emoji,
+            "note": self.note,
+            "triggers": self.triggers,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at
+        }
+
+    def to_api(self):
+        """JSON response form in the camelCase shape the React client reads; ObjectIds and dates are encoded by the app JSON provider"""
+        return {
+            "id": self._id,
+            "userId": self.user_id,
             "moodLevel": self.mood_level,
             "emoji": self.emoji,
             "note": self.note,
             "triggers": self.triggers,
-            "created_at": self.created_at.isoformat() + "Z" if self.created_at else datetime.utcnow().isoformat() + "Z",
-            "createdAt": self.created_at.isoformat() + "Z" if self.created_at else datetime.utcnow().isoformat() + "Z",
-            "updated_at": self.updated_at.isoformat() + "Z" if self.updated_at else datetime.utcnow().isoformat() + "Z",
-            "updatedAt": self.updated_at.isoformat() + "Z" if self.updated_at else datetime.utcnow().isoformat() + "Z"
+            "createdAt": self.created_at or datetime.utcnow(),
+            "updatedAt": self.updated_at or datetime.utcnow()
         }
 
     @classmethod
@@ -83,27 +92,9 @@ class MoodEntry:
         created = data.get("created_at") or data.get("createdAt")
         updated = data.get("updated_at") or data.get("updatedAt")
 
-        # Handle created_at with fallbacks
-        if isinstance(created, str):
-            try:
-                entry.created_at = datetime.fromisoformat(created.replace("Z", "+00:00"))
-            except (ValueError, TypeError):
-                entry.created_at = datetime.utcnow()
-        elif isinstance(created, datetime):
-            entry.created_at = created
-        else:
-            entry.created_at = datetime.utcnow()
-
-        # Handle updated_at with fallbacks
-        if isinstance(updated, str):
-            try:
-                entry.updated_at = datetime.fromisoformat(updated.replace("Z", "+00:00"))
-            except (ValueError, TypeError):
-                entry.updated_at = datetime.utcnow()
-        elif isinstance(updated, datetime):
-            entry.updated_at = updated
-        else:
-            entry.updated_at = datetime.utcnow()
+        # Fall back to now for missing or unparseable timestamps
+        entry.created_at = parse_datetime(created) or datetime.utcnow()
+        entry.updated_at = parse_datetime(updated) or datetime.utcnow()
 
         return entry
 
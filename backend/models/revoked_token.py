@@ -0,0 +1,60 @@
+from backend.database import LazyCollection
+from datetime import datetime, timedelta
+from pymongo import ASCENDING
+
+
+class RevokedToken:
+    """
+    Revocations shared between workers.
+
+    A row either revokes one token (jti) or every token a user was issued
+    before `revoked_before` (logout everywhere, password change). Rows expire
+    with the tokens they cover via a TTL index, so the collection stays as
+    small as the set of live revoked tokens. Workers mirror it in memory
+    (services.token_service.RevocationList) and only read rows newer than
+    their last sync, less a margin for clock skew between app hosts.
+    """
+    collection = LazyCollection("revoked_tokens")
+
+    @classmethod
+    def ensure_indexes(cls):
+        cls.collection.create_index([("expires_at", ASCENDING)], expireAfterSeconds=0)
+        cls.collection.create_index([("created_at", ASCENDING)])
+        # One row per revoked token: inserting the jti is how /refresh claims a refresh token
+        cls.collection.create_index(
+            [("jti", ASCENDING)], unique=True, partialFilterExpression={"jti": {"$exists": True}}
+        )
+
+    @classmethod
+    def revoke_token(cls, jti, user_id, expires_at):
+        return cls.collection.insert_one({
+            "jti": jti,
+            "user_id": str(user_id),
+            "expires_at": expires_at,
+            "created_at": datetime.utcnow(),
+        })
+
+    @classmethod
+    def revoke_user(cls, user_id, expires_at, revoked_before=None):
+        now = datetime.utcnow()
+        return cls.collection.insert_one({
+            "user_id": str(user_id),
+            "revoked_before": revoked_before or now,
+            "expires_at": expires_at,
+            "created_at": now,
+        })
+
+    @classmethod
+    def covers_user_token(cls, user_id, issued_at):
+        """
+        Whether a per-user revocation covers a token issued at `issued_at`
+        (whole seconds, as in the iat claim; see RevocationList._apply)
+        """
+        return cls.collection.find_one(
+            {"user_id": str(user_id), "revoked_before": {"$gte": issued_at + timedelta(seconds=1)}}, {"_id": 1}
+        ) is not None
+
+    @classmethod
+    def created_since(cls, since):
+        query = {"created_at": {"$gte": since}} if since else {}
+        return cls.collection.find(query, {"_id": 0}).sort("created_at", ASCENDING)
@@ -1,19 +1,23 @@
-from backend import mongo
+from backend.database import LazyCollection
 from datetime import datetime
 from bson import ObjectId
+from pymongo import InsertOne
+from .serialization import parse_datetime
+from .sentiment_rollup import SentimentRollup
 
 class SentimentHistory:
     """
-    Model to store sentiment analysis results from journal entries.
+    Model to store sentiment analysis results from journal entries and chat messages.
     Tracks emotional patterns over time for insights and crisis detection.
     """
-    collection = mongo.mindbuddy.sentiment_history
+    collection = LazyCollection("sentiment_history")
 
     def __init__(self, user_id, journal_entry_id=None, sentiment_label=None, 
-                 sentiment_scores=None, detected_emotions=None, crisis_flag=False):
+                 sentiment_scores=None, detected_emotions=None, crisis_flag=False, chat_log_id=None):
         self._id = ObjectId()
         self.user_id = ObjectId(user_id) if isinstance(user_id, str) else user_id
         self.journal_entry_id = ObjectId(journal_entry_id) if isinstance(journal_entry_id, str) and journal_entry_id else journal_entry_id
+        self.chat_log_id = chat_log_id  # Set instead of journal_entry_id for chat messages
         
         # Sentiment data
         self.sentiment_label = sentiment_label  # 'positive', 'negative', 'neutral'
@@ -94,10 +98,28 @@ class SentimentHistory:
 
     def save(self):
         self.updated_at = datetime.utcnow()
-        result = self.collection.insert_one(self.to_dict())
+        result = self.collection.insert_one(self.to_document())
         self._id = result.inserted_id
+        SentimentRollup.record(
+            self.user_id,
+            self.sentiment_label,
+            self.sentiment_scores,
+            self.crisis_flag,
+            self.created_at
+        )
         return result
 
+    def write_operations(self):
+        """save() as (collection, bulk_write operation) pairs, for services.write_buffer"""
+        self.updated_at = datetime.utcnow()
+        return [(self.collection, InsertOne(self.to_document()))] + SentimentRollup.record_operations(
+            self.user_id,
+            self.sentiment_label,
+            self.sentiment_scores,
+            self.crisis_flag,
+            self.created_at
+        )
+
     def update(self, data):
         self.updated_at = datetime.utcnow()
         data["updated_at"] = self.updated_at
@@ -106,33 +128,40 @@ class SentimentHistory:
     def delete(self):
         return self.collection.delete_one({"_id": self._id})
 
-    def to_dict(self):
+    def to_document(self):
+        """Storage form: native ObjectIds and BSON dates"""
         return {
-            "_id": str(self._id),
-            "user_id": str(self.user_id),
-            "journal_entry_id": str(self.journal_entry_id) if self.journal_entry_id else None,
+            "_id": self._id,
+            "user_id": self.user_id,
+            "journal_entry_id": self.journal_entry_id,
+            "chat_log_id": self.chat_log_id,
             "sentiment_label": self.sentiment_label,
             "sentiment_scores": self.sentiment_scores,
             "detected_emotions": self.detected_emotions,
             "crisis_flag": self.crisis_flag,
             "crisis_keywords": self.crisis_keywords,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+            "created_at": self.created_at,
+            "updated_at": self.updated_at
         }
 
+    def to_api(self):
+        """JSON response form; the app JSON provider encodes ObjectIds and dates"""
+        return self.to_document()
+
     @classmethod
     def from_dict(cls, data):
         sentiment = cls.__new__(cls)
         sentiment._id = data.get("_id")
         sentiment.user_id = data.get("user_id")
         sentiment.journal_entry_id = data.get("journal_entry_id")
+        sentiment.chat_log_id = data.get("chat_log_id")
         sentiment.sentiment_label = data.get("sentiment_label")
         sentiment.sentiment_scores = data.get("sentiment_scores", {})
         sentiment.detected_emotions = data.get("detected_emotions", [])
         sentiment.crisis_flag = data.get("crisis_flag", False)
         sentiment.crisis_keywords = data.get("crisis_keywords", [])
-        sentiment.created_at = data.get("created_at")
-        sentiment.updated_at = data.get("updated_at")
+        sentiment.created_at = parse_datetime(data.get("created_at"))
+        sentiment.updated_at = parse_datetime(data.get("updated_at"))
         return sentiment
 
     def __repr__(self):
@@ -0,0 +1,205 @@
+from backend.database import LazyCollection
+from datetime import datetime, timedelta
+from bson import ObjectId
+from pymongo import UpdateOne
+from .serialization import parse_datetime
+
+SENTIMENT_LABELS = ("positive", "negative", "neutral")
+
+
+class SentimentRollup:
+    """
+    Materialised per-user, per-day sentiment rollups.
+    Updated incrementally from SentimentHistory.save so trend queries read at
+    most one small document per day instead of every sentiment row.
+
+    Each day document also keeps the run-length data needed to combine
+    negative streaks across days exactly:
+    leading_negative, trailing_negative and max_negative_streak.
+    """
+    collection = LazyCollection("sentiment_rollups")
+    streaks = LazyCollection("sentiment_streaks")
+
+    @staticmethod
+    def day_start(moment):
+        """Truncate a datetime to the start of its (UTC) day"""
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    @classmethod
+    def ensure_indexes(cls):
+        cls.collection.create_index([("user_id", 1), ("day", 1)], unique=True)
+
+    @classmethod
+    def _updates(cls, user_id, sentiment_label, sentiment_scores=None, crisis_flag=False, created_at=None):
+        """(collection, filter, update) for the day rollup and the streak, in order"""
+        user_oid = ObjectId(user_id) if isinstance(user_id, str) else user_id
+        created_at = parse_datetime(created_at) or datetime.utcnow()
+        label = sentiment_label if sentiment_label in SENTIMENT_LABELS else "neutral"
+        scores = sentiment_scores or {}
+        is_negative = label == "negative"
+
+        def field(name):
+            return {"$ifNull": [f"${name}", 0]}
+
+        fields = {
+            "user_id": user_oid,
+            "day": cls.day_start(created_at),
+            "total": {"$add": [field("total"), 1]},
+            f"counts.{label}": {"$add": [field(f"counts.{label}"), 1]},
+            "crisis_count": {"$add": [field("crisis_count"), 1 if crisis_flag else 0]},
+            "updated_at": datetime.utcnow(),
+        }
+        for score_name in SENTIMENT_LABELS:
+            path = f"score_sums.{label}.{score_name}"
+            fields[path] = {"$add": [field(path), float(scores.get(score_name, 0) or 0)]}
+
+        # All expressions in one $set stage see the pre-update document,
+        # so "every entry so far was negative" compares the old counters.
+        if is_negative:
+            fields["leading_negative"] = {
+                "$cond": [
+                    {"$eq": [field("counts.negative"), field("total")]},
+                    {"$add": [field("leading_negative"), 1]},
+                    field("leading_negative"),
+                ]
+            }
+            fields["trailing_negative"] = {"$add": [field("trailing_negative"), 1]}
+            fields["max_negative_streak"] = {
+                "$max": [field("max_negative_streak"), {"$add": [field("trailing_negative"), 1]}]
+            }
+        else:
+            fields["leading_negative"] = field("leading_negative")
+            fields["trailing_negative"] = 0
+            fields["max_negative_streak"] = field("max_negative_streak")
+
+        streak_update = {"$set": {"last_label": label, "updated_at": datetime.utcnow()}}
+        if is_negative:
+            streak_update["$inc"] = {"current_negative": 1}
+        else:
+            streak_update["$set"]["current_negative"] = 0
+
+        return [
+            (cls.collection, {"user_id": user_oid, "day": fields["day"]}, [{"$set": fields}]),
+            (cls.streaks, {"_id": user_oid}, streak_update),
+        ]
+
+    @classmethod
+    def record(cls, user_id, sentiment_label, sentiment_scores=None, crisis_flag=False, created_at=None):
+        """Fold a single sentiment result into the user's day rollup and streak"""
+        for collection, query, update in cls._updates(user_id, sentiment_label, sentiment_scores,
+                                                      crisis_flag, created_at):
+            collection.update_one(query, update, upsert=True)
+
+    @classmethod
+    def record_operations(cls, user_id, sentiment_label, sentiment_scores=None, crisis_flag=False,
+                          created_at=None):
+        """record as (collection, bulk_write operation) pairs (see services.write_buffer)"""
+        return [
+            (collection, UpdateOne(query, update, upsert=True))
+            for collection, query, update in cls._updates(user_id, sentiment_label, sentiment_scores,
+                                                          crisis_flag, created_at)
+        ]
+
+    @classmethod
+    def find_by_user(cls, user_id, days=30):
+        """Day rollups for a user covering the last `days` days, oldest first"""
+        user_oid = ObjectId(user_id) if isinstance(user_id, str) else user_id
+        cutoff_day = cls.day_start(datetime.utcnow() - timedelta(days=days))
+        return list(cls.collection.find({
+            "user_id": user_oid,
+            "day": {"$gte": cutoff_day}
+        }).sort("day", 1).limit(days + 1))
+
+    @classmethod
+    def get_current_streak(cls, user_id):
+        """Current run of consecutive negative entries for a user"""
+        user_oid = ObjectId(user_id) if isinstance(user_id, str) else user_id
+        doc = cls.streaks.find_one({"_id": user_oid})
+        return doc.get("current_negative", 0) if doc else 0
+
+    @classmethod
+    def summarize(cls, rollups):
+        """
+        Combine day rollups into window totals.
+
+        Returns a dict with per-label counts and score sums, total entries and the
+        longest run of consecutive negative entries in the window.
+        """
+        counts = {label: 0 for label in SENTIMENT_LABELS}
+        score_sums = {label: {name: 0.0 for name in SENTIMENT_LABELS} for label in SENTIMENT_LABELS}
+        total = 0
+        running = 0
+        longest = 0
+
+        for day in rollups:
+            day_total = day.get("total", 0)
+            day_negative = day.get("counts", {}).get("negative", 0)
+            total += day_total
+            for label in SENTIMENT_LABELS:
+                counts[label] += day.get("counts", {}).get(label, 0)
+                for name in SENTIMENT_LABELS:
+                    score_sums[label][name] += day.get("score_sums", {}).get(label, {}).get(name, 0.0)
+
+            longest = max(longest, day.get("max_negative_streak", 0), running + day.get("leading_negative", 0))
+            if day_total and day_negative == day_total:
+                running += day_total
+            else:
+                running = day.get("trailing_negative", 0)
+            longest = max(longest, running)
+
+        return {
+            "counts": counts,
+            "score_sums": score_sums,
+            "total": total,
+            "consecutive_negative": longest
+        }
+
+    @classmethod
+    def get_sentiment_distribution(cls, summary):
+        """Per-label distribution in the shape of SentimentHistory.get_sentiment_trends"""
+        distribution = []
+        for label in SENTIMENT_LABELS:
+            count = summary["counts"][label]
+            if count:
+                distribution.append({
+                    "_id": label,
+                    "count": count,
+                    "avg_score": summary["score_sums"][label]["positive"] / count
+                })
+        return distribution
+
+    @classmethod
+    def rebuild_for_user(cls, user_id):
+        """Recompute a user's rollups from their full sentiment history; returns the entries folded in"""
+        from .sentiment_history import SentimentHistory
+
+        user_oid = ObjectId(user_id) if isinstance(user_id, str) else user_id
+        cls.collection.delete_many({"user_id": user_oid})
+        cls.streaks.delete_one({"_id": user_oid})
+
+        # Older history rows stored user_id as a string
+        query = {"user_id": {"$in": [user_oid, str(user_oid)]}}
+        entries = 0
+        for record in SentimentHistory.collection.find(query).sort("created_at", 1):
+            cls.record(
+                user_oid,
+                record.get("sentiment_label"),
+                record.get("sentiment_scores"),
+                record.get("crisis_flag", False),
+                record.get("created_at")
+            )
+            entries += 1
+        return entries
+
+    @classmethod
+    def rebuild_all(cls):
+        """Backfill rollups for every user with sentiment history"""
+        from .sentiment_history import SentimentHistory
+
+        users = {
+            ObjectId(user_id) if isinstance(user_id, str) else user_id
+            for user_id in SentimentHistory.collection.distinct("user_id")
+            if user_id is not None and (not isinstance(user_id, str) or ObjectId.is_valid(user_id))
+        }
+        entries = sum(cls.rebuild_for_user(user_oid) for user_oid in users)
+        return {"users": len(users), "entries": entries}
@@ -0,0 +1,22 @@
+from datetime import datetime, timezone
+
+
+def parse_datetime(value):
+    """
+    Normalise a stored timestamp to a naive UTC datetime.
+    Accepts native datetimes (BSON dates) and the ISO strings older documents
+    were written with, including the trailing "Z" MoodEntry used to append.
+    Returns None for missing or unparseable values.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
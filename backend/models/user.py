@@ -1,9 +1,14 @@
-from backend import mongo, bcrypt
+import logging
+from backend import bcrypt
+from backend.database import LazyCollection
 from datetime import datetime
 from bson import ObjectId
+from .serialization import parse_datetime
+
+logger = logging.getLogger(__name__)
 
 class User:
-    collection = mongo.mindbuddy.users
+    collection = LazyCollection("users")
 
     def __init__(self, email, first_name, last_name, phone=None, password=None, is_premium=False):
         self._id = ObjectId()
@@ -15,6 +20,8 @@ class User:
         self.created_at = datetime.utcnow()
         self.updated_at = datetime.utcnow()
         self.is_premium = is_premium
+        # Written by the payment flow, not by the user model
+        self.subscription_status = None
 
         if password:
             self.set_password(password)
@@ -25,27 +32,20 @@ class User:
 
     @classmethod
     def find_by_id(cls, user_id):
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.debug("find_by_id called with user_id: %s", user_id)
-
         # Try ObjectId search first (new format)
         try:
             result = cls.collection.find_one({"_id": ObjectId(user_id)})
             if result:
-                logger.debug("find_by_id result (ObjectId): %s", result)
                 return result
         except Exception as e:
-            logger.debug("ObjectId search failed: %s", e)
+            logger.debug("ObjectId search failed for user_id %s: %s", user_id, e)
 
         # Fallback to string search (legacy format)
-        result = cls.collection.find_one({"_id": user_id})
-        logger.debug("find_by_id result (string): %s", result)
-        return result
+        return cls.collection.find_one({"_id": user_id})
 
     def save(self):
         self.updated_at = datetime.utcnow()
-        result = self.collection.insert_one(self.to_dict())
+        result = self.collection.insert_one(self.to_document())
         self._id = result.inserted_id
         return result
 
@@ -63,19 +63,48 @@ class User:
     def check_password(self, password):
         return bcrypt.check_password_hash(self.password_hash, password)
 
-    def to_dict(self):
+    def to_document(self):
+        """Storage form: native ObjectIds and BSON dates"""
         return {
-            "_id": self._id,  # Don't convert to string, let MongoDB handle ObjectId
+            "_id": self._id,
             "email": self.email,
             "password_hash": self.password_hash,
             "first_name": self.first_name,
             "last_name": self.last_name,
             "phone": self.phone,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
             "is_premium": self.is_premium
         }
 
+    def to_api(self):
+        """JSON response form, never including the password hash; ObjectIds and dates are encoded by the app JSON provider"""
+        return {
+            "_id": self._id,
+            "email": self.email,
+            "first_name": self.first_name,
+            "last_name": self.last_name,
+            "phone": self.phone,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "is_premium": self.is_premium
+        }
+
+    @classmethod
+    def from_claims(cls, claims):
+        """
+        Partial user built from access-token claims, without a database read.
+        Only _id, email and is_premium are set; routes that need the rest
+        of the record use @token_required(load_user=True).
+        """
+        user = cls.__new__(cls)
+        user._id = ObjectId(claims["user_id"])
+        user.email = claims.get("email")
+        user.is_premium = claims.get("premium", False)
+        user.subscription_status = None
+        user.claims = claims
+        return user
+
     @classmethod
     def from_dict(cls, data):
         user = cls.__new__(cls)
@@ -85,15 +114,8 @@ class User:
         user.first_name = data.get("first_name")
         user.last_name = data.get("last_name")
         user.phone = data.get("phone")
-        created_at = data.get("created_at")
-        if isinstance(created_at, str):
-            user.created_at = datetime.fromisoformat(created_at)
-        else:
-            user.created_at = created_at
-        updated_at = data.get("updated_at")
-        if isinstance(updated_at, str):
-            user.updated_at = datetime.fromisoformat(updated_at)
-        else:
-            user.updated_at = updated_at
+        user.created_at = parse_datetime(data.get("created_at"))
+        user.updated_at = parse_datetime(data.get("updated_at"))
         user.is_premium = data.get("is_premium", False)
+        user.subscription_status = data.get("subscription_status")
         return user
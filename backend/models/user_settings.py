@@ -1,9 +1,10 @@
-from backend import mongo
+from backend.database import LazyCollection
 from datetime import datetime
 from bson import ObjectId
+from .serialization import parse_datetime
 
 class UserSettings:
-    collection = mongo.mindbuddy.user_settings
+    collection = LazyCollection("user_settings")
 
     def __init__(self, user_id):
         self._id = ObjectId()
@@ -39,7 +40,7 @@ class UserSettings:
 
     def save(self):
         self.updated_at = datetime.utcnow()
-        result = self.collection.insert_one(self.to_dict())
+        result = self.collection.insert_one(self.to_document())
         self._id = result.inserted_id
         return result
 
@@ -51,10 +52,11 @@ class UserSettings:
     def delete(self):
         return self.collection.delete_one({"_id": self._id})
 
-    def to_dict(self):
+    def to_document(self):
+        """Storage form: native ObjectIds and BSON dates"""
         return {
-            "_id": str(self._id),
-            "user_id": str(self.user_id),
+            "_id": self._id,
+            "user_id": self.user_id,
             "mood_reminders": self.mood_reminders,
             "journal_reminders": self.journal_reminders,
             "crisis_alerts": self.crisis_alerts,
@@ -65,8 +67,8 @@ class UserSettings:
             "theme": self.theme,
             "language": self.language,
             "timezone": self.timezone,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+            "created_at": self.created_at,
+            "updated_at": self.updated_at
         }
 
     def to_dict_formatted(self):
@@ -125,8 +127,8 @@ class UserSettings:
         settings.theme = data.get("theme", 'system')
         settings.language = data.get("language", 'en')
         settings.timezone = data.get("timezone", 'UTC')
-        settings.created_at = data.get("created_at")
-        settings.updated_at = data.get("updated_at")
+        settings.created_at = parse_datetime(data.get("created_at"))
+        settings.updated_at = parse_datetime(data.get("updated_at"))
         return settings
 
     def __repr__(self):
@@ -0,0 +1,118 @@
+from backend.database import LazyCollection
+from datetime import datetime, timedelta
+from bson import ObjectId
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+
+class WebhookEvent:
+    """
+    Durable inbox for payment-provider webhooks.
+
+    Each delivery is stored once, keyed by a unique event_id, and applied
+    later by the webhook processor. Redeliveries of the same event hit the
+    unique index and are dropped at insert time.
+
+    status: 'pending' -> 'processing' -> 'done' | 'ignored' | 'failed'
+    """
+    collection = LazyCollection("webhook_inbox")
+
+    def __init__(self, event_id, provider, event_type, payload, tx_ref=None):
+        self._id = ObjectId()
+        self.event_id = event_id
+        self.provider = provider
+        self.event_type = event_type
+        self.tx_ref = tx_ref
+        self.payload = payload
+
+        # Processing state
+        self.status = 'pending'
+        self.attempts = 0
+        self.last_error = None
+        self.result = None
+        self.locked_until = None
+
+        self.received_at = datetime.utcnow()
+        self.next_attempt_at = self.received_at
+        self.processed_at = None
+
+    @classmethod
+    def ensure_indexes(cls):
+        cls.collection.create_index([("event_id", ASCENDING)], unique=True)
+        cls.collection.create_index([("status", ASCENDING), ("next_attempt_at", ASCENDING)])
+
+    def save(self):
+        """Insert the event; returns False if this event_id was already received."""
+        try:
+            self.collection.insert_one(self.to_document())
+        except DuplicateKeyError:
+            return False
+        return True
+
+    @classmethod
+    def claim_next(cls, lease_seconds=60):
+        """
+        Atomically take the next due event, or one whose processing lease
+        expired (worker died mid-way). Returns the claimed document or None.
+        """
+        now = datetime.utcnow()
+        return cls.collection.find_one_and_update(
+            {"$or": [
+                {"status": "pending", "next_attempt_at": {"$lte": now}},
+                {"status": "processing", "locked_until": {"$lt": now}},
+            ]},
+            {
+                "$set": {"status": "processing", "locked_until": now + timedelta(seconds=lease_seconds)},
+                "$inc": {"attempts": 1},
+            },
+            sort=[("next_attempt_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    @classmethod
+    def complete(cls, event_id, status, result=None):
+        """Finish an event as 'done' or 'ignored'."""
+        return cls.collection.update_one(
+            {"_id": event_id, "status": "processing"},
+            {"$set": {
+                "status": status,
+                "result": result,
+                "processed_at": datetime.utcnow(),
+                "locked_until": None,
+            }},
+        )
+
+    @classmethod
+    def retry_later(cls, event_id, error, delay_seconds, give_up=False):
+        """Record a failed attempt and reschedule it, or mark it failed for good."""
+        update = {"last_error": error, "locked_until": None}
+        if give_up:
+            update.update(status="failed", processed_at=datetime.utcnow())
+        else:
+            update.update(status="pending", next_attempt_at=datetime.utcnow() + timedelta(seconds=delay_seconds))
+        return cls.collection.update_one({"_id": event_id, "status": "processing"}, {"$set": update})
+
+    @classmethod
+    def count_by_status(cls):
+        return {row["_id"]: row["count"] for row in cls.collection.aggregate([
+            {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+        ])}
+
+    def to_document(self):
+        """Storage form: native ObjectIds and BSON dates"""
+        return {
+            "_id": self._id,
+            "event_id": self.event_id,
+            "provider": self.provider,
+            "event_type": self.event_type,
+            "tx_ref": self.tx_ref,
+            "payload": self.payload,
+            "status": self.status,
+            "attempts": self.attempts,
+            "last_error": self.last_error,
+            "result": self.result,
+            "locked_until": self.locked_until,
+            "received_at": self.received_at,
+            "next_attempt_at": self.next_attempt_at,
+            "processed_at": self.processed_at
+        }
@@ -1,13 +1,14 @@
-from backend import mongo
+from backend.database import LazyCollection
 from datetime import datetime
 from bson import ObjectId
+from .serialization import parse_datetime
 
 class WellnessInsight:
     """
     Model to store AI-generated wellness insights and recommendations.
     Provides personalized tips based on user's mood and journal patterns.
     """
-    collection = mongo.mindbuddy.wellness_insights
+    collection = LazyCollection("wellness_insights")
 
     def __init__(self, user_id, insight_type, insight_text, 
                  recommendation=None, activity_suggestion=None, priority='normal'):
@@ -98,7 +99,7 @@ class WellnessInsight:
 
     def save(self):
         self.updated_at = datetime.utcnow()
-        result = self.collection.insert_one(self.to_dict())
+        result = self.collection.insert_one(self.to_document())
         self._id = result.inserted_id
         return result
 
@@ -124,10 +125,11 @@ class WellnessInsight:
     def delete(self):
         return self.collection.delete_one({"_id": self._id})
 
-    def to_dict(self):
+    def to_document(self):
+        """Storage form: native ObjectIds and BSON dates"""
         return {
-            "_id": str(self._id),
-            "user_id": str(self.user_id),
+            "_id": self._id,
+            "user_id": self.user_id,
             "insight_type": self.insight_type,
             "insight_text": self.insight_text,
             "recommendation": self.recommendation,
@@ -137,11 +139,15 @@ class WellnessInsight:
             "is_dismissed": self.is_dismissed,
             "based_on_sentiment": self.based_on_sentiment,
             "based_on_pattern": self.based_on_pattern,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-            "read_at": self.read_at.isoformat() if self.read_at else None
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "read_at": self.read_at
         }
 
+    def to_api(self):
+        """JSON response form; the app JSON provider encodes ObjectIds and dates"""
+        return self.to_document()
+
     @classmethod
     def from_dict(cls, data):
         insight = cls.__new__(cls)
@@ -156,9 +162,9 @@ class WellnessInsight:
         insight.is_dismissed = data.get("is_dismissed", False)
         insight.based_on_sentiment = data.get("based_on_sentiment")
         insight.based_on_pattern = data.get("based_on_pattern")
-        insight.created_at = data.get("created_at")
-        insight.updated_at = data.get("updated_at")
-        insight.read_at = data.get("read_at")
+        insight.created_at = parse_datetime(data.get("created_at"))
+        insight.updated_at = parse_datetime(data.get("updated_at"))
+        insight.read_at = parse_datetime(data.get("read_at"))
         return insight
 
     def __repr__(self):
@@ -0,0 +1,194 @@
+"""
+Slow-query profiler built on PyMongo command monitoring.
+
+Every read/write command is reduced to a shape (field names and operators
+kept, values replaced by "?") and aggregated per (collection, command,
+shape): call count, total/max duration, documents returned, and the routes
+that issued it. report() ranks shapes by total time; explain() re-runs the
+slowest recorded instance of a shape with executionStats to get
+docsExamined, keysExamined and the winning plan (COLLSCAN vs IXSCAN).
+
+Statistics are kept in memory per process and exposed through
+/api/admin/slow-queries.
+"""
+
+import json
+import logging
+import threading
+from collections import Counter
+from flask import request, has_request_context
+from pymongo import monitoring
+from . import database
+
+logger = logging.getLogger(__name__)
+
+PROFILED_COMMANDS = {
+    "find", "aggregate", "count", "distinct", "update", "delete", "findAndModify",
+}
+# Command fields that make up the shape, and those replayed for explain()
+SHAPE_KEYS = ("filter", "query", "pipeline", "sort", "projection", "updates", "deletes", "update", "key")
+LITERAL_KEYS = ("sort", "projection")
+EXPLAIN_KEYS = ("filter", "query", "pipeline", "sort", "projection", "limit", "skip", "key", "hint", "collation")
+MAX_SHAPES = 1000
+
+
+def shape(value):
+    """Strip literal values from a query, keeping structure and operators."""
+    if isinstance(value, dict):
+        return {key: shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        # Collapse lists so $in with 3 or 300 values is the same shape
+        return [shape(value[0])] if value else []
+    return "?"
+
+
+def _route():
+    if has_request_context() and request.url_rule is not None:
+        return f"{request.method} {request.url_rule.rule}"
+    return "<no request>"
+
+
+class SlowQueryProfiler(monitoring.CommandListener):
+
+    def __init__(self, slow_ms=100):
+        self.slow_ms = slow_ms
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._shapes = {}
+
+    def started(self, event):
+        if event.command_name not in PROFILED_COMMANDS:
+            return
+        command = event.command
+        collection = command.get(event.command_name)
+        # Sort and projection specs are part of the shape as-is
+        query = {
+            key: command[key] if key in LITERAL_KEYS else shape(command[key])
+            for key in SHAPE_KEYS if key in command
+        }
+        key = (collection, event.command_name, json.dumps(query, sort_keys=True, default=str))
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (key, event.database_name, command, _route())
+
+    def succeeded(self, event):
+        self._finished(event, event.reply)
+
+    def failed(self, event):
+        self._finished(event, None)
+
+    def _finished(self, event, reply):
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        key, db_name, command, route = pending
+        duration_ms = event.duration_micros / 1000
+        returned = 0
+        if reply and isinstance(reply.get("cursor"), dict):
+            returned = len(reply["cursor"].get("firstBatch", []))
+        elif reply and "n" in reply:
+            returned = reply["n"]
+
+        with self._lock:
+            entry = self._shapes.get(key)
+            if entry is None:
+                if len(self._shapes) >= MAX_SHAPES:
+                    return
+                entry = self._shapes[key] = {
+                    "collection": key[0],
+                    "command": key[1],
+                    "shape": json.loads(key[2]),
+                    "count": 0,
+                    "slow_count": 0,
+                    "errors": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "docs_returned": 0,
+                    "routes": Counter(),
+                    "_sample": None,
+                }
+            entry["count"] += 1
+            entry["total_ms"] += duration_ms
+            entry["docs_returned"] += returned
+            entry["routes"][route] += 1
+            if reply is None:
+                entry["errors"] += 1
+            if duration_ms >= self.slow_ms:
+                entry["slow_count"] += 1
+            if duration_ms >= entry["max_ms"]:
+                entry["max_ms"] = duration_ms
+                entry["_sample"] = (db_name, command)
+
+        if duration_ms >= self.slow_ms:
+            logger.warning("Slow %s on %s took %.1f ms (route %s)", key[1], key[0], duration_ms, route)
+
+    def report(self, top=20, sort="total_ms"):
+        """Top-N shapes, most expensive first."""
+        with self._lock:
+            entries = sorted(self._shapes.values(), key=lambda e: e[sort], reverse=True)[:top]
+            return [self._public(entry) for entry in entries]
+
+    @staticmethod
+    def _public(entry):
+        result = {k: v for k, v in entry.items() if not k.startswith("_")}
+        result["total_ms"] = round(entry["total_ms"], 2)
+        result["max_ms"] = round(entry["max_ms"], 2)
+        result["avg_ms"] = round(entry["total_ms"] / entry["count"], 2)
+        result["routes"] = dict(entry["routes"].most_common(5))
+        return result
+
+    def explain(self, top=5, sort="total_ms"):
+        """Report the top-N shapes with executionStats for their slowest instance."""
+        with self._lock:
+            entries = sorted(self._shapes.values(), key=lambda e: e[sort], reverse=True)[:top]
+            samples = [(self._public(entry), entry["_sample"]) for entry in entries]
+
+        results = []
+        for public, sample in samples:
+            if sample and public["command"] in ("find", "aggregate", "count", "distinct"):
+                public["explain"] = self._run_explain(*sample, command_name=public["command"])
+            results.append(public)
+        return results
+
+    @staticmethod
+    def _run_explain(db_name, command, command_name):
+        spec = {command_name: command[command_name]}
+        spec.update({key: command[key] for key in EXPLAIN_KEYS if key in command})
+        if command_name == "aggregate":
+            spec["cursor"] = {}
+        try:
+            plan = database.get_db(db_name).command("explain", spec, verbosity="executionStats")
+        except Exception as e:
+            return {"error": str(e)}
+        if "stages" in plan:
+            # Aggregations nest the query plan under the first $cursor stage
+            plan = plan["stages"][0].get("$cursor", {})
+        stats = plan.get("executionStats", {})
+        winning = plan.get("queryPlanner", {}).get("winningPlan", {})
+        winning = winning.get("queryPlan", winning)
+        stages = []
+        while winning:
+            stages.append(winning.get("stage"))
+            winning = winning.get("inputStage")
+        return {
+            "docs_examined": stats.get("totalDocsExamined"),
+            "keys_examined": stats.get("totalKeysExamined"),
+            "n_returned": stats.get("nReturned"),
+            "execution_ms": stats.get("executionTimeMillis"),
+            "stages": [stage for stage in stages if stage],
+        }
+
+    def reset(self):
+        with self._lock:
+            self._shapes.clear()
+
+
+profiler = SlowQueryProfiler()
+
+
+def init_app(app):
+    """Attach the profiler to the shared client when enabled in config."""
+    if not app.config.get("QUERY_PROFILER_ENABLED"):
+        return
+    profiler.slow_ms = app.config["SLOW_QUERY_MS"]
+    database.add_event_listener(profiler)
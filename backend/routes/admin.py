@@ -0,0 +1,99 @@
+"""
+Admin Routes
+Operational endpoints, enabled by setting ADMIN_TOKEN.
+"""
+
+from flask import Blueprint, request, jsonify, Response
+from backend.decorators import admin_token_required
+from backend.query_profiler import profiler
+from backend.sampling_profiler import profiler as cpu_profiler
+
+admin_bp = Blueprint("admin", __name__)
+
+PROFILER_INTERVAL_MS = (1, 1000)
+
+
+def _number(data, key):
+    """A numeric body value, None if absent; raises ValueError otherwise."""
+    value = data.get(key)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+        raise ValueError(f"{key} must be a positive number")
+    return value
+
+
+@admin_bp.route("/slow-queries", methods=["GET"])
+@admin_token_required
+def slow_queries():
+    """
+    Top-N MongoDB query shapes recorded by this worker.
+    GET /api/admin/slow-queries?top=20&sort=total_ms|max_ms|count&explain=true
+    """
+    top = request.args.get("top", 20, type=int)
+    sort = request.args.get("sort", "total_ms")
+    if sort not in ("total_ms", "max_ms", "count", "slow_count"):
+        return jsonify({"message": "sort must be total_ms, max_ms, count or slow_count"}), 400
+
+    if request.args.get("explain", "false").lower() == "true":
+        shapes = profiler.explain(top=min(top, 10), sort=sort)
+    else:
+        shapes = profiler.report(top=top, sort=sort)
+
+    return jsonify({"slow_ms": profiler.slow_ms, "shapes": shapes}), 200
+
+
+@admin_bp.route("/slow-queries", methods=["DELETE"])
+@admin_token_required
+def reset_slow_queries():
+    """Clear the recorded query shapes."""
+    profiler.reset()
+    return jsonify({"message": "Query profile reset"}), 200
+
+
+@admin_bp.route("/profiler", methods=["GET"])
+@admin_token_required
+def profiler_status():
+    """
+    Sampling profiler status for the worker serving this request.
+    GET /api/admin/profiler?format=collapsed returns the collapsed stacks instead.
+    """
+    if request.args.get("format") == "collapsed":
+        return Response(cpu_profiler.collapsed(), mimetype="text/plain")
+    return jsonify(cpu_profiler.status()), 200
+
+
+@admin_bp.route("/profiler/start", methods=["POST"])
+@admin_token_required
+def start_profiler():
+    """
+    Start sampling on this worker.
+    POST /api/admin/profiler/start
+    Body: { "seconds": 30, "interval_ms": 10 }
+    seconds is capped at PROFILER_MAX_SECONDS, interval_ms kept within 1-1000.
+    """
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"message": "Body must be a JSON object"}), 400
+    try:
+        seconds = _number(data, "seconds")
+        interval_ms = _number(data, "interval_ms")
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    if interval_ms is not None:
+        interval_ms = min(max(interval_ms, PROFILER_INTERVAL_MS[0]), PROFILER_INTERVAL_MS[1])
+    started = cpu_profiler.start(
+        seconds=min(seconds, cpu_profiler.max_seconds) if seconds is not None else None,
+        interval=interval_ms / 1000 if interval_ms is not None else None,
+    )
+    if not started:
+        return jsonify({"message": "Profiler already running", **cpu_profiler.status()}), 409
+    return jsonify(cpu_profiler.status()), 202
+
+
+@admin_bp.route("/profiler/stop", methods=["POST"])
+@admin_token_required
+def stop_profiler():
+    """Stop sampling and return the collapsed stacks (flamegraph.pl / speedscope input)."""
+    cpu_profiler.stop()
+    return Response(cpu_profiler.collapsed(), mimetype="text/plain")
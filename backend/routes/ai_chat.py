@@ -8,6 +8,8 @@ from backend.decorators import token_required
 from backend.models import ChatLog, SentimentHistory
 from backend.services.llm_service import get_llm_service
 from backend.services.sentiment_service import get_sentiment_analyzer
+from backend.services.context_service import context_service, ConversationNotOwned
+from backend.services.write_buffer import write_buffer
 import traceback
 
 chat_bp = Blueprint("ai_chat", __name__)
@@ -28,39 +30,32 @@ def send_message(current_user):
         if not message or len(message.strip()) < 1:
             return jsonify({"message": "Message is required"}), 400
         
-        current_app.logger.info(f"Chat message from user: {current_user._id}")
+        current_app.logger.debug("Chat message from user: %s", current_user._id)
         
         # Analyze message sentiment (quick, for context)
         analyzer = get_sentiment_analyzer()
         message_sentiment = analyzer.analyze_sentiment(message)
         sentiment_label = message_sentiment.get('sentiment_label', 'neutral')
         
-        # Get conversation context if conversation_id provided
-        context = []
+        # Newest turns that fit the token budget (cached per conversation)
+        messages = []
         if conversation_id:
-            context = ChatLog.get_conversation_context(conversation_id, limit=5)
-        
+            try:
+                messages = context_service.build_messages(conversation_id, current_user._id)
+            except ConversationNotOwned:
+                return jsonify({"message": "Unauthorized"}), 403
+
         # Generate AI response using LLM service
         llm_service = get_llm_service()
         if llm_service is None:
             return jsonify({'error': 'LLM service not available'}), 503
 
-        # Convert context to messages format for LLM service
-        messages = []
-        if context:
-            for msg in context[-5:]:  # Last 5 messages for context
-                role = msg.get('role', 'user')
-                content = msg.get('content', '')
-                if role == 'user':
-                    messages.append({"role": "user", "content": content})
-                elif role == 'assistant':
-                    messages.append({"role": "assistant", "content": content})
-
         # Add current message
         messages.append({"role": "user", "content": message})
 
-        # Generate response
-        ai_response = llm_service.generate_response(messages)
+        # Generate response (usage gets the model's token counts for this turn)
+        usage = {}
+        ai_response = llm_service.generate_response(messages, usage=usage)
 
         # Check for crisis keywords in response
         requires_help = any(keyword in ai_response.lower() for keyword in [
@@ -73,7 +68,8 @@ def send_message(current_user):
             'requires_professional_help': requires_help
         }
         
-        # Save chat log
+        # Queue the chat log, its sentiment row and the conversation update;
+        # they are written in batches off the response path
         chat_log = ChatLog(
             user_id=str(current_user._id),
             message=message,
@@ -82,7 +78,18 @@ def send_message(current_user):
             conversation_id=conversation_id
         )
         chat_log.sentiment = sentiment_label
-        chat_log.save()
+        chat_log.tokens_used = usage.get("total_tokens", 0)
+        sentiment_history = SentimentHistory(
+            user_id=current_user._id,
+            sentiment_label=sentiment_label,
+            sentiment_scores=message_sentiment.get('sentiment_scores'),
+            detected_emotions=message_sentiment.get('detected_emotions'),
+            crisis_flag=message_sentiment.get('crisis_flag', False),
+            chat_log_id=chat_log._id
+        )
+        sentiment_history.crisis_keywords = message_sentiment.get('crisis_keywords', [])
+        write_buffer.submit_turn(chat_log, sentiment_history)
+        context_service.record_turn(chat_log, new_conversation=not conversation_id)
         
         # If new conversation, use the generated conversation_id
         if not conversation_id:
@@ -99,7 +106,7 @@ def send_message(current_user):
         }), 200
         
     except Exception as e:
-        current_app.logger.error(f"Chat message error: {e}\n{traceback.format_exc()}")
+        current_app.logger.error("Chat message error: %s\n%s", e, traceback.format_exc())
         return jsonify({"message": "Internal server error"}), 500
 
 
@@ -114,7 +121,7 @@ def get_conversations(current_user):
         limit = request.args.get("limit", 10, type=int)
         limit = min(limit, 50)  # Max 50 conversations
         
-        current_app.logger.info(f"Fetching conversations for user: {current_user._id}")
+        current_app.logger.debug("Fetching conversations for user: %s", current_user._id)
         
         # Get recent conversations
         conversations = ChatLog.get_recent_conversations(str(current_user._id), limit=limit)
@@ -125,7 +132,7 @@ def get_conversations(current_user):
         }), 200
         
     except Exception as e:
-        current_app.logger.error(f"Get conversations error: {e}\n{traceback.format_exc()}")
+        current_app.logger.error("Get conversations error: %s\n%s", e, traceback.format_exc())
         return jsonify({"message": "Internal server error"}), 500
 
 
@@ -140,7 +147,7 @@ def get_conversation(current_user, conversation_id):
         limit = request.args.get("limit", 50, type=int)
         limit = min(limit, 100)  # Max 100 messages
         
-        current_app.logger.info(f"Fetching conversation {conversation_id} for user: {current_user._id}")
+        current_app.logger.debug("Fetching conversation %s for user: %s", conversation_id, current_user._id)
         
         # Get conversation messages
         messages = ChatLog.find_by_conversation(conversation_id, limit=limit)
@@ -153,12 +160,12 @@ def get_conversation(current_user, conversation_id):
         
         return jsonify({
             "conversation_id": conversation_id,
-            "messages": [ChatLog.from_dict(m).to_dict() for m in messages],
+            "messages": [ChatLog.from_dict(m).to_api() for m in messages],
             "count": len(messages)
         }), 200
         
     except Exception as e:
-        current_app.logger.error(f"Get conversation error: {e}\n{traceback.format_exc()}")
+        current_app.logger.error("Get conversation error: %s\n%s", e, traceback.format_exc())
         return jsonify({"message": "Internal server error"}), 500
 
 
@@ -173,18 +180,18 @@ def get_chat_history(current_user):
         limit = request.args.get("limit", 50, type=int)
         limit = min(limit, 200)  # Max 200 messages
         
-        current_app.logger.info(f"Fetching chat history for user: {current_user._id}")
+        current_app.logger.debug("Fetching chat history for user: %s", current_user._id)
         
         # Get chat history
         chat_logs = ChatLog.find_by_user(str(current_user._id), limit=limit)
         
         return jsonify({
-            "history": [ChatLog.from_dict(log).to_dict() for log in chat_logs],
+            "history": chat_logs,  # stored documents are already in the API shape
             "count": len(chat_logs)
         }), 200
         
     except Exception as e:
-        current_app.logger.error(f"Get chat history error: {e}\n{traceback.format_exc()}")
+        current_app.logger.error("Get chat history error: %s\n%s", e, traceback.format_exc())
         return jsonify({"message": "Internal server error"}), 500
 
 
@@ -196,7 +203,7 @@ def proactive_check_in(current_user):
     GET /api/chat/proactive-check-in
     """
     try:
-        current_app.logger.info(f"Generating proactive check-in for user: {current_user._id}")
+        current_app.logger.debug("Generating proactive check-in for user: %s", current_user._id)
         
         # Get recent sentiment trends
         sentiment_records = SentimentHistory.find_by_user(str(current_user._id), limit=10, days=7)
@@ -240,5 +247,5 @@ def proactive_check_in(current_user):
         }), 200
         
     except Exception as e:
-        current_app.logger.error(f"Proactive check-in error: {e}\n{traceback.format_exc()}")
+        current_app.logger.error("Proactive check-in error: %s\n%s", e, traceback.format_exc())
         return jsonify({"message": "Internal server error"}), 500
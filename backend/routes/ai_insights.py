@@ -24,7 +24,7 @@ def get_insights(current_user):
         
         limit = min(limit, 50)  # Max 50 insights
         
-        current_app.logger.info(f"Fetching insights for user: {current_user._id}")
+        current_app.logger.debug("Fetching insights for user: %s", current_user._id)
         
         # Get insights
         insights = WellnessInsight.find_by_user(
@@ -34,12 +34,12 @@ def get_insights(current_user):
         )
         
         return jsonify({
-            "insights": [WellnessInsight.from_dict(i).to_dict() for i in insights],
+            "insights": [WellnessInsight.from_dict(i).to_api() for i in insights],
             "count": len(insights)
         }), 200
         
     except Exception as e:
-        current_app.logger.error(f"Get insights error: {e}\n{traceback.format_exc()}")
+        current_app.logger.error("Get insights error: %s\n%s", e, traceback.format_exc())
         return jsonify({"message": "Internal server error"}), 500
 
 
@@ -51,19 +51,19 @@ def get_urgent_insights(current_user):
     GET /api/insights/urgent
     """
     try:
-        current_app.logger.info(f"Fetching urgent insights for user: {current_user._id}")
+        current_app.logger.debug("Fetching urgent insights for user: %s", current_user._id)
         
         # Get urgent insights
         urgent = WellnessInsight.get_urgent_insights(str(current_user._id))
         
         return jsonify({
-            "urgent_insights": [WellnessInsight.from_dict(i).to_dict() for i in urgent],
+            "urgent_insights": [WellnessInsight.from_dict(i).to_api() for i in urgent],
             "count": len(urgent),
             "has_urgent": len(urgent) > 0
         }), 200
         
     except Exception as e:
-        current_app.logger.error(f"Get urgent insights error: {e}\n{traceback.format_exc()}")
+        current_app.logger.error("Get urgent insights error: %s\n%s", e, traceback.format_exc())
         return jsonify({"message": "Internal server error"}), 500
 
 
@@ -75,14 +75,14 @@ def get_daily_insight(current_user):
     GET /api/insights/daily
     """
     try:
-        current_app.logger.info(f"Fetching daily insight for user: {current_user._id}")
+        current_app.logger.debug("Fetching daily insight for user: %s", current_user._id)
         
         # Check for existing daily insight
         daily_insight = WellnessInsight.get_daily_insight(str(current_user._id))
         
         if daily_insight:
             return jsonify({
-                "insight": WellnessInsight.from_dict(daily_insight).to_dict(),
+                "insight": WellnessInsight.from_dict(daily_insight).to_api(),
                 "is_new": False
             }), 200
         
@@ -113,12 +113,12 @@ def get_daily_insight(current_user):
         new_insight.save()
         
         return jsonify({
-            "insight": new_insight.to_dict(),
+            "insight": new_insight.to_api(),
             "is_new": True
         }), 200
         
     except Exception as e:
-        current_app.logger.error(f"Get daily insight error: {e}\n{traceback.format_exc()}")
+        current_app.logger.error("Get daily insight error: %s\n%s", e, traceback.format_exc())
         return jsonify({"message": "Internal server error"}), 500
 
 
@@ -130,7 +130,7 @@ def mark_insight_read(current_user, insight_id):
     PUT /api/insights/<insight_id>/read
     """
     try:
-        current_app.logger.info(f"Marking insight {insight_id} as read for user: {current_user._id}")
+        current_app.logger.debug("Marking insight %s as read for user: %s", insight_id, current_user._id)
         
         # Get the insight
         insight_data = WellnessInsight.find_by_id(insight_id)
@@ -149,11 +149,11 @@ def mark_insight_read(current_user, insight_id):
         
         return jsonify({
             "message": "Insight marked as read",
-            "insight": insight.to_dict()
+            "insight": insight.to_api()
         }), 200
         
     except Exception as e:
-        current_app.logger.error(f"Mark insight read error: {e}\n{traceback.format_exc()}")
+        current_app.logger.error("Mark insight read error: %s\n%s", e, traceback.format_exc())
         return jsonify({"message": "Internal server error"}), 500
 
 
@@ -165,7 +165,7 @@ def dismiss_insight(current_user, insight_id):
     PUT /api/insights/<insight_id>/dismiss
     """
     try:
-        current_app.logger.info(f"Dismissing insight {insight_id} for user: {current_user._id}")
+        current_app.logger.debug("Dismissing insight %s for user: %s", insight_id, current_user._id)
         
         # Get the insight
         insight_data = WellnessInsight.find_by_id(insight_id)
@@ -184,11 +184,11 @@ def dismiss_insight(current_user, insight_id):
         
         return jsonify({
             "message": "Insight dismissed",
-            "insight": insight.to_dict()
+            "insight": insight.to_api()
         }), 200
         
     except Exception as e:
-        current_app.logger.error(f"Dismiss insight error: {e}\n{traceback.format_exc()}")
+        current_app.logger.error("Dismiss insight error: %s\n%s", e, traceback.format_exc())
         return jsonify({"message": "Internal server error"}), 500
 
 
@@ -204,7 +204,7 @@ def generate_insight(current_user):
         data = request.get_json()
         insight_type = data.get("type", "wellness_recommendation")
 
-        current_app.logger.info(f"Generating {insight_type} insight for user: {current_user._id}")
+        current_app.logger.debug("Generating %s insight for user: %s", insight_type, current_user._id)
 
         insights_gen = get_insights_generator()
 
@@ -261,11 +261,11 @@ def generate_insight(current_user):
 
         return jsonify({
             "message": "Insight generated successfully",
-            "insight": new_insight.to_dict()
+            "insight": new_insight.to_api()
         }), 201
 
     except Exception as e:
-        current_app.logger.error(f"Generate insight error: {e}\n{traceback.format_exc()}")
+        current_app.logger.error("Generate insight error: %s\n%s", e, traceback.format_exc())
         return jsonify({"message": "Internal server error"}), 500
 
 
@@ -317,5 +317,5 @@ Journal Entry:
         return jsonify({"insight": insight}), 200
 
     except Exception as e:
-        current_app.logger.error(f"Error generating insight: {e}\n{traceback.format_exc()}")
+        current_app.logger.error("Error generating insight: %s\n%s", e, traceback.format_exc())
         return jsonify({"error": "Failed to generate insight"}), 500
@@ -5,7 +5,7 @@ Provides sentiment analysis for journal entries and mood tracking.
 
 from flask import Blueprint, request, jsonify, current_app
 from backend.decorators import token_required
-from backend.models import SentimentHistory, JournalEntry, WellnessInsight
+from backend.models import SentimentHistory, SentimentRollup, JournalEntry, WellnessInsight
 from backend.services.sentiment_service import get_sentiment_analyzer
 from backend.services.insights_service import get_insights_generator
 import traceback
@@ -28,7 +28,7 @@ def analyze_sentiment(current_user):
         if not text:
             return jsonify({"message": "Text is required"}), 400
         
-        current_app.logger.info(f"Analyzing sentiment for user: {current_user._id}")
+        current_app.logger.debug("Analyzing sentiment for user: %s", current_user._id)
         
         # Get sentiment analyzer
         analyzer = get_sentiment_analyzer()
@@ -54,7 +54,7 @@ def analyze_sentiment(current_user):
         
         # Check for crisis and generate urgent insight
         if sentiment_result['crisis_flag']:
-            current_app.logger.warning(f"Crisis detected for user {current_user._id}")
+            current_app.logger.warning("Crisis detected for user %s", current_user._id)
             
             crisis_insight_data = insights_gen.generate_crisis_support_insight(
                 sentiment_result['crisis_keywords']
@@ -71,7 +71,7 @@ def analyze_sentiment(current_user):
             crisis_insight.based_on_pattern = crisis_insight_data['based_on_pattern']
             crisis_insight.save()
             
-            insights_generated.append(crisis_insight.to_dict())
+            insights_generated.append(crisis_insight.to_api())
         
         # Generate wellness recommendation based on sentiment
         elif sentiment_result['sentiment_label'] == 'negative':
@@ -91,15 +91,15 @@ def analyze_sentiment(current_user):
             wellness_insight.based_on_sentiment = recommendation_data['based_on_sentiment']
             wellness_insight.save()
             
-            insights_generated.append(wellness_insight.to_dict())
+            insights_generated.append(wellness_insight.to_api())
         
         return jsonify({
-            "sentiment": sentiment_history.to_dict(),
+            "sentiment": sentiment_history.to_api(),
             "insights": insights_generated
         }), 200
         
     except Exception as e:
-        current_app.logger.error(f"Sentiment analysis error: {e}\n{traceback.format_exc()}")
+        current_app.logger.error("Sentiment analysis error: %s\n%s", e, traceback.format_exc())
         return jsonify({"message": "Internal server error"}), 500
 
 
@@ -118,7 +118,7 @@ def get_sentiment_history(current_user):
         limit = min(limit, 100)  # Max 100 records
         days = min(days, 365)  # Max 1 year
         
-        current_app.logger.info(f"Fetching sentiment history for user: {current_user._id}")
+        current_app.logger.debug("Fetching sentiment history for user: %s", current_user._id)
         
         # Get sentiment history
         sentiment_records = SentimentHistory.find_by_user(
@@ -128,12 +128,12 @@ def get_sentiment_history(current_user):
         )
         
         return jsonify({
-            "history": [SentimentHistory.from_dict(s).to_dict() for s in sentiment_records],
+            "history": [SentimentHistory.from_dict(s).to_api() for s in sentiment_records],
             "count": len(sentiment_records)
         }), 200
         
     except Exception as e:
-        current_app.logger.error(f"Get sentiment history error: {e}\n{traceback.format_exc()}")
+        current_app.logger.error("Get sentiment history error: %s\n%s", e, traceback.format_exc())
         return jsonify({"message": "Internal server error"}), 500
 
 
@@ -148,30 +148,44 @@ def get_sentiment_trends(current_user):
         days = request.args.get("days", 30, type=int)
         days = min(days, 365)  # Max 1 year
         
-        current_app.logger.info(f"Analyzing sentiment trends for user: {current_user._id}")
+        current_app.logger.debug("Analyzing sentiment trends for user: %s", current_user._id)
         
-        # Get sentiment history
-        sentiment_records = SentimentHistory.find_by_user(
-            str(current_user._id),
-            days=days
-        )
+        # Read the per-day rollups (at most one document per day)
+        rollups = SentimentRollup.find_by_user(str(current_user._id), days=days)
+        summary = SentimentRollup.summarize(rollups)
         
-        if not sentiment_records or len(sentiment_records) < 2:
+        if summary['total'] < 2:
             return jsonify({
                 "message": "Not enough data for trend analysis",
                 "trend": None
             }), 200
         
+        counts = summary['counts']
+        negative_score_sum = sum(
+            label_sums['negative'] for label_sums in summary['score_sums'].values()
+        )
+        
         # Analyze trends
         analyzer = get_sentiment_analyzer()
-        trend_analysis = analyzer.analyze_sentiment_trend(sentiment_records)
+        trend_analysis = analyzer.summarize_trend(
+            summary['total'],
+            counts['negative'],
+            counts['positive'],
+            summary['consecutive_negative'],
+            negative_score_sum
+        )
+        trend_analysis['current_negative_streak'] = SentimentRollup.get_current_streak(str(current_user._id))
         
         # Get aggregated data
-        trends_data = SentimentHistory.get_sentiment_trends(str(current_user._id), days=days)
+        trends_data = SentimentRollup.get_sentiment_distribution(summary)
         
         # Generate pattern insight if significant pattern detected
         insights_gen = get_insights_generator()
-        pattern_insight = insights_gen.analyze_mood_patterns(sentiment_records)
+        pattern_insight = insights_gen.analyze_mood_pattern_counts(
+            counts['negative'],
+            counts['positive'],
+            summary['total']
+        )
         
         # Save pattern insight if appropriate
         if pattern_insight and trend_analysis.get('risk_level') != 'low':
@@ -189,7 +203,7 @@ def get_sentiment_trends(current_user):
                 mood_insight.based_on_pattern = pattern_insight.get('based_on_pattern')
                 mood_insight.save()
                 
-                pattern_insight = mood_insight.to_dict()
+                pattern_insight = mood_insight.to_api()
         
         return jsonify({
             "trend_analysis": trend_analysis,
@@ -198,7 +212,7 @@ def get_sentiment_trends(current_user):
         }), 200
         
     except Exception as e:
-        current_app.logger.error(f"Sentiment trends error: {e}\n{traceback.format_exc()}")
+        current_app.logger.error("Sentiment trends error: %s\n%s", e, traceback.format_exc())
         return jsonify({"message": "Internal server error"}), 500
 
 
@@ -213,7 +227,7 @@ def check_crisis_flags(current_user):
         days = request.args.get("days", 7, type=int)
         days = min(days, 30)
         
-        current_app.logger.info(f"Checking crisis flags for user: {current_user._id}")
+        current_app.logger.debug("Checking crisis flags for user: %s", current_user._id)
         
         # Get recent crisis flags
         crisis_records = SentimentHistory.get_recent_crisis_flags(
@@ -226,9 +240,9 @@ def check_crisis_flags(current_user):
         return jsonify({
             "has_crisis_flags": has_crisis,
             "crisis_count": len(crisis_records),
-            "recent_crises": [SentimentHistory.from_dict(c).to_dict() for c in crisis_records]
+            "recent_crises": [SentimentHistory.from_dict(c).to_api() for c in crisis_records]
         }), 200
         
     except Exception as e:
-        current_app.logger.error(f"Crisis check error: {e}\n{traceback.format_exc()}")
+        current_app.logger.error("Crisis check error: %s\n%s", e, traceback.format_exc())
         return jsonify({"message": "Internal server error"}), 500
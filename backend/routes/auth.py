@@ -1,17 +1,25 @@
 # backend/routes/auth.py
 from flask import Blueprint, request, jsonify, current_app
-from backend.models import User
+from backend.models import User, RevokedToken
 from backend.decorators import token_required
-import jwt, datetime, traceback
+from backend.services import login_service, token_service
+from datetime import datetime
+import jwt, traceback
 
 auth = Blueprint("auth", __name__)
 
 
-def serialize_doc(doc):
-    """Convert ObjectId to string for JSON serialization."""
-    if "_id" in doc and hasattr(doc["_id"], '__str__'):
-        doc["_id"] = str(doc["_id"])
-    return doc
+def _rate_limited(retry_after):
+    response = jsonify({"message": "Too many attempts, try again later"})
+    response.headers["Retry-After"] = str(int(retry_after) + 1)
+    return response, 429
+
+
+def _hasher_busy():
+    current_app.logger.warning("Rejected: password hashing pool saturated")
+    response = jsonify({"message": "Service busy, try again shortly"})
+    response.headers["Retry-After"] = "1"
+    return response, 503
 
 
 def _extract_email_password(data):
@@ -27,7 +35,7 @@ def _extract_email_password(data):
 @auth.route("/register", methods=["POST"])
 def register():
     try:
-        current_app.logger.info("Register request received")
+        current_app.logger.debug("Register request received")
         data = request.get_json()
         if not data:
             current_app.logger.warning("Register failed: No JSON data provided")
@@ -38,7 +46,7 @@ def register():
         email = data.get('email')
         password = data.get('password')
 
-        current_app.logger.info("Register attempt for email: %s", email)
+        current_app.logger.debug("Register attempt for email: %s", email)
 
         if not all([firstName, lastName, email, password]):
             current_app.logger.warning("Register failed: Missing required fields for email: %s", email)
@@ -54,7 +62,7 @@ def register():
         new_user.save()
 
         current_app.logger.info("User registered successfully: user_id=%s, email=%s", str(new_user._id), email)
-        return jsonify({"message": "User created successfully", "user": serialize_doc(new_user.to_dict())}), 201
+        return jsonify({"message": "User created successfully", "user": new_user.to_api()}), 201
 
     except Exception as e:
         current_app.logger.error("Register error for email: %s - %s\n%s", email if 'email' in locals() else 'unknown', e, traceback.format_exc())
@@ -62,7 +70,7 @@ def register():
 
 
 @auth.route("/change-password", methods=["PUT"])
-@token_required
+@token_required(load_user=True)
 def change_password(current_user):
     try:
         data = request.get_json(silent=True) or {}
@@ -72,19 +80,31 @@ def change_password(current_user):
         if not current_password or not new_password:
             return jsonify({"message": "Current password and new password are required"}), 400
 
-        # Verify current password
-        if not current_user.check_password(current_password):
-            return jsonify({"message": "Current password is incorrect"}), 400
-
         # Validate new password
         if len(new_password) < 8:
             return jsonify({"message": "New password must be at least 8 characters long"}), 400
 
-        # Update password
-        current_user.set_password(new_password)
+        # Same per-IP and per-account limits as login: this is a password oracle too
+        retry_after = login_service.check_rate_limits(
+            login_service.client_ip(request, current_app.config["LOGIN_PROXY_HOPS"]), current_user.email
+        )
+        if retry_after:
+            return _rate_limited(retry_after)
+
+        # Verify current password and hash the new one on the bounded pool
+        hasher = login_service.hasher
+        try:
+            if not hasher.check(current_user.password_hash, current_password):
+                return jsonify({"message": "Current password is incorrect"}), 400
+            current_user.password_hash = hasher.hash(new_password)
+        except login_service.HasherBusy:
+            return _hasher_busy()
+
+        # Update password and sign out every other session
         current_user.update({"password_hash": current_user.password_hash})
+        token_service.revocations.revoke_user(current_user._id, current_app.config["REFRESH_TOKEN_TTL_DAYS"])
 
-        return jsonify({"message": "Password changed successfully"}), 200
+        return jsonify({"message": "Password changed successfully", **token_service.issue_tokens(current_user)}), 200
 
     except Exception as e:
         current_app.logger.error("Change password error: %s\n%s", e, traceback.format_exc())
@@ -100,25 +120,95 @@ def login():
         if not email or not password:
             return jsonify({"message": "email and password are required"}), 400
 
+        retry_after = login_service.check_rate_limits(
+            login_service.client_ip(request, current_app.config["LOGIN_PROXY_HOPS"]), email
+        )
+        if retry_after:
+            return _rate_limited(retry_after)
+
         user_data = User.find_by_email(email)
         if not user_data:
             return jsonify({"message": "Invalid credentials"}), 401
 
         user = User.from_dict(user_data)
-        if not user.check_password(password):
+        hasher = login_service.hasher
+        try:
+            password_ok = hasher.check(user.password_hash, password)
+        except login_service.HasherBusy:
+            return _hasher_busy()
+        if not password_ok:
             return jsonify({"message": "Invalid credentials"}), 401
 
-        payload = {
-            "user_id": str(user._id),
-            "exp": datetime.datetime.utcnow() + datetime.timedelta(hours=24),
-        }
+        if hasher.needs_rehash(user.password_hash):
+            hasher.rehash_later(User.collection, user._id, user.password_hash, password)
 
-        token = jwt.encode(payload, current_app.config["SECRET_KEY"], algorithm="HS256")
+        tokens = token_service.issue_tokens(user)
 
-        current_app.logger.info("User login successful: user_id=%s, email=%s, _id type=%s", str(user._id), user.email, type(user._id))
-        current_app.logger.debug("User _id details: str(user._id)=%s, repr(user._id)=%s", str(user._id), repr(user._id))
-        return jsonify({"token": token, "user": serialize_doc(user.to_dict())}), 200
+        current_app.logger.info("User login successful: user_id=%s", user._id)
+        return jsonify({**tokens, "user": user.to_api()}), 200
 
     except Exception as e:
         current_app.logger.error("Login error: %s\n%s", e, traceback.format_exc())
         return jsonify({"message": "Internal server error"}), 500
+
+
+@auth.route("/refresh", methods=["POST"])
+def refresh():
+    """
+    Exchange a refresh token for a new access/refresh pair.
+    The presented refresh token is revoked (rotation).
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        refresh_token = data.get("refresh_token")
+        if not refresh_token:
+            return jsonify({"message": "refresh_token is required"}), 400
+
+        try:
+            claims = token_service.decode(refresh_token, expected_type=token_service.REFRESH)
+        except jwt.ExpiredSignatureError:
+            return jsonify({"message": "Refresh token has expired!"}), 401
+        except jwt.InvalidTokenError:
+            return jsonify({"message": "Refresh token is invalid!"}), 401
+
+        user_data = User.find_by_id(claims["user_id"])
+        if not user_data:
+            return jsonify({"message": "User not found!"}), 401
+
+        # The worker's revocation mirror may lag; check the database directly
+        if RevokedToken.covers_user_token(claims["user_id"], datetime.utcfromtimestamp(claims["iat"])):
+            return jsonify({"message": "Refresh token is invalid!"}), 401
+
+        # Claim the token in the database, so a replay on any worker fails
+        if not token_service.revocations.revoke(claims):
+            return jsonify({"message": "Refresh token is invalid!"}), 401
+        return jsonify(token_service.issue_tokens(User.from_dict(user_data))), 200
+
+    except Exception as e:
+        current_app.logger.error("Refresh error: %s\n%s", e, traceback.format_exc())
+        return jsonify({"message": "Internal server error"}), 500
+
+
+@auth.route("/logout", methods=["POST"])
+@token_required
+def logout(current_user):
+    """Revoke the access token used for this request and, if given, the refresh token."""
+    try:
+        revocations = token_service.revocations
+        if "jti" in current_user.claims:
+            revocations.revoke(current_user.claims)
+
+        refresh_token = (request.get_json(silent=True) or {}).get("refresh_token")
+        if refresh_token:
+            try:
+                claims = token_service.decode(refresh_token, expected_type=token_service.REFRESH)
+                if claims["user_id"] == str(current_user._id):
+                    revocations.revoke(claims)
+            except jwt.InvalidTokenError:
+                pass  # Already unusable
+
+        return jsonify({"message": "Logged out"}), 200
+
+    except Exception as e:
+        current_app.logger.error("Logout error: %s\n%s", e, traceback.format_exc())
+        return jsonify({"message": "Internal server error"}), 500
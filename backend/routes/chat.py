@@ -26,7 +26,7 @@ def chat():
         return jsonify({'reply': reply})
 
     except Exception as e:
-        logger.error(f'Error in chat endpoint: {e}')
+        logger.error('Error in chat endpoint: %s', e)
         return jsonify({'error': 'Internal server error'}), 500
 
 @chat_bp.route('/api/chat/stream', methods=['POST'])
@@ -51,11 +51,11 @@ def chat_stream():
                     yield f"data: {chunk}\n\n"
                 yield "data: [DONE]\n\n"
             except Exception as e:
-                logger.error(f'Error in streaming: {e}')
+                logger.error('Error in streaming: %s', e)
                 yield f"data: Error: {str(e)}\n\n"
 
         return Response(generate(), mimetype='text/event-stream')
 
     except Exception as e:
-        logger.error(f'Error in chat stream endpoint: {e}')
+        logger.error('Error in chat stream endpoint: %s', e)
         return jsonify({'error': 'Internal server error'}), 500
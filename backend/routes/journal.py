@@ -16,7 +16,7 @@ def get_entries(current_user):
         entries_data = JournalEntry.find_by_user(str(current_user._id))
         entries = [JournalEntry.from_dict(entry) for entry in entries_data]
         entries.sort(key=lambda x: x.created_at, reverse=True)
-        return jsonify([entry.to_dict() for entry in entries])
+        return jsonify([entry.to_api() for entry in entries])
     except Exception as e:
         current_app.logger.error("Get journal entries error: %s\n%s", e, traceback.format_exc())
         return jsonify({"message": "Internal server error"}), 500
@@ -38,7 +38,7 @@ def create_entry(current_user):
             is_private=is_private
         )
         entry.save()
-        return jsonify(entry.to_dict()), 201
+        return jsonify(entry.to_api()), 201
     except Exception as e:
         current_app.logger.error("Create journal entry error: %s\n%s", e, traceback.format_exc())
         return jsonify({"message": "Internal server error"}), 500
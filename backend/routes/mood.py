@@ -48,7 +48,7 @@ def create_mood_entry(current_user):
 
         return jsonify({
             "message": "Mood entry created successfully",
-            "entry": mood_entry.to_dict()
+            "entry": mood_entry.to_api()
         }), 201
 
     except Exception as e:
@@ -88,7 +88,7 @@ def get_mood_entries(current_user):
         paginated_entries = entries[offset:offset + limit]
 
         return jsonify({
-            "entries": [entry.to_dict() for entry in paginated_entries],
+            "entries": [entry.to_api() for entry in paginated_entries],
             "total": total,
             "limit": limit,
             "offset": offset
@@ -109,7 +109,7 @@ def get_mood_entry(current_user, entry_id):
             return jsonify({"message": "Mood entry not found"}), 404
 
         entry = MoodEntry.from_dict(entry_data)
-        return jsonify({"entry": entry.to_dict()}), 200
+        return jsonify({"entry": entry.to_api()}), 200
 
     except Exception as e:
         current_app.logger.error("Get mood entry error: %s\n%s", e, traceback.format_exc())
@@ -157,13 +157,13 @@ def update_mood_entry(current_user, entry_id):
 
             return jsonify({
                 "message": "Mood entry updated successfully",
-                "entry": updated_entry.to_dict()
+                "entry": updated_entry.to_api()
             }), 200
         else:
             entry = MoodEntry.from_dict(entry_data)
             return jsonify({
                 "message": "Mood entry updated successfully",
-                "entry": entry.to_dict()
+                "entry": entry.to_api()
             }), 200
 
     except Exception as e:
@@ -265,7 +265,7 @@ def get_mood_stats(current_user):
 def get_today_mood(current_user):
     """Check if user has logged mood today"""
     try:
-        current_app.logger.info("Get today mood request for user_id: %s", str(current_user._id))
+        current_app.logger.debug("Get today mood request for user_id: %s", str(current_user._id))
         today = datetime.utcnow().date()
 
         # Get all entries for user and check today's date
@@ -274,13 +274,13 @@ def get_today_mood(current_user):
         for entry_data in entries_data:
             entry = MoodEntry.from_dict(entry_data)
             if entry.created_at.date() == today:
-                current_app.logger.info("Today mood entry found for user_id: %s", str(current_user._id))
+                current_app.logger.debug("Today mood entry found for user_id: %s", str(current_user._id))
                 return jsonify({
                     "hasEntry": True,
-                    "entry": entry.to_dict()
+                    "entry": entry.to_api()
                 }), 200
 
-        current_app.logger.info("No today mood entry for user_id: %s", str(current_user._id))
+        current_app.logger.debug("No today mood entry for user_id: %s", str(current_user._id))
         return jsonify({
             "hasEntry": False,
             "entry": None
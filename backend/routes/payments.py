@@ -1,31 +1,25 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from backend.services.flutterwave import FlutterwaveService
-from backend.services.mongo import MongoService
-from backend.config import Config
+from backend.decorators import jwt_required, get_jwt_identity
+from backend.services.flutterwave import get_flutterwave_service
+from backend.services.mongo import get_mongo_service
+from backend.services.entitlement_service import entitlements
 from backend.models import SubscribeRequest, SubscribeResponse
+from datetime import datetime
 import logging
+import uuid
 
 logger = logging.getLogger(__name__)
 
 payments_bp = Blueprint('payments', __name__)
 
-# Initialize services
-flutterwave_service = FlutterwaveService(
-    secret_key=Config.FLW_SECRET_KEY,
-    signature_key=Config.FLW_SIGNATURE_KEY
-)
-mongo_service = MongoService(
-    mongo_uri=Config.MONGO_URI,
-    db_name=Config.MONGODB_DB_NAME
-)
-
 @payments_bp.route('/flutterwave/initialize', methods=['POST'])
 @jwt_required()
-async def initialize_flutterwave_payment():
+def initialize_flutterwave_payment():
     try:
         data = request.get_json()
         user_id = get_jwt_identity()
+        flutterwave_service = get_flutterwave_service()
+        mongo_service = get_mongo_service()
 
         # Validate required fields
         required_fields = ['email', 'name', 'amount', 'currency', 'planId', 'redirectUrl']
@@ -43,11 +37,12 @@ async def initialize_flutterwave_payment():
             currency=data['currency']
         )
 
-        # Generate transaction reference
-        tx_ref = f'mindbuddy-{user_id}-{subscribe_request.plan_name}-{data.get("timestamp", "now")}'
+        # Generate a unique transaction reference (payment_ref is a unique index,
+        # and Flutterwave de-duplicates on tx_ref)
+        tx_ref = f'mindbuddy-{uuid.uuid4().hex[:16]}-{int(datetime.utcnow().timestamp())}'
 
         # Create payment link
-        payment_link = await flutterwave_service.create_payment_link(
+        payment_link = flutterwave_service.create_payment_link(
             amount=subscribe_request.amount,
             currency=subscribe_request.currency,
             tx_ref=tx_ref,
@@ -67,12 +62,13 @@ async def initialize_flutterwave_payment():
             'plan_amount': subscribe_request.amount,
             'payment_ref': tx_ref,
             'status': 'pending',
-            'created_at': data.get('timestamp', None)
+            'created_at': datetime.utcnow()
         }
 
         if not mongo_service.create_subscription(subscription_doc):
-            logger.error(f'Failed to store subscription for user {user_id}')
-            # Continue anyway as payment link was created
+            # Without the subscription the payment could never be matched to it
+            logger.error('Failed to store subscription for user %s', user_id)
+            return jsonify({'error': 'Failed to create subscription'}), 500
 
         response = SubscribeResponse(
             payment_link=payment_link,
@@ -83,7 +79,7 @@ async def initialize_flutterwave_payment():
         return jsonify(response.to_dict()), 200
 
     except Exception as e:
-        logger.error(f'Error initializing Flutterwave payment: {e}')
+        logger.error('Error initializing Flutterwave payment: %s', e)
         return jsonify({'error': 'Internal server error'}), 500
 
 @payments_bp.route('/paystack/initialize', methods=['POST'])
@@ -92,7 +88,7 @@ def initialize_paystack_payment():
     try:
         return jsonify({'error': 'Paystack integration not implemented yet'}), 501
     except Exception as e:
-        logger.error(f'Error initializing Paystack payment: {e}')
+        logger.error('Error initializing Paystack payment: %s', e)
         return jsonify({'error': 'Internal server error'}), 500
 
 @payments_bp.route('/stripe/initialize', methods=['POST'])
@@ -101,7 +97,7 @@ def initialize_stripe_payment():
     try:
         return jsonify({'error': 'Stripe integration not implemented yet'}), 501
     except Exception as e:
-        logger.error(f'Error initializing Stripe payment: {e}')
+        logger.error('Error initializing Stripe payment: %s', e)
         return jsonify({'error': 'Internal server error'}), 500
 
 @payments_bp.route('/mpesa/initialize', methods=['POST'])
@@ -110,7 +106,7 @@ def initialize_mpesa_payment():
     try:
         return jsonify({'error': 'M-Pesa integration not implemented yet'}), 501
     except Exception as e:
-        logger.error(f'Error initializing M-Pesa payment: {e}')
+        logger.error('Error initializing M-Pesa payment: %s', e)
         return jsonify({'error': 'Internal server error'}), 500
 
 @payments_bp.route('/flutterwave/verify/<transaction_id>', methods=['GET'])
@@ -123,7 +119,7 @@ def verify_flutterwave_payment(transaction_id):
             'message': 'Payment verified successfully'
         }), 200
     except Exception as e:
-        logger.error(f'Error verifying Flutterwave payment: {e}')
+        logger.error('Error verifying Flutterwave payment: %s', e)
         return jsonify({'error': 'Internal server error'}), 500
 
 @payments_bp.route('/paystack/verify/<transaction_id>', methods=['GET'])
@@ -132,7 +128,7 @@ def verify_paystack_payment(transaction_id):
     try:
         return jsonify({'error': 'Paystack verification not implemented yet'}), 501
     except Exception as e:
-        logger.error(f'Error verifying Paystack payment: {e}')
+        logger.error('Error verifying Paystack payment: %s', e)
         return jsonify({'error': 'Internal server error'}), 500
 
 @payments_bp.route('/stripe/verify/<transaction_id>', methods=['GET'])
@@ -141,7 +137,7 @@ def verify_stripe_payment(transaction_id):
     try:
         return jsonify({'error': 'Stripe verification not implemented yet'}), 501
     except Exception as e:
-        logger.error(f'Error verifying Stripe payment: {e}')
+        logger.error('Error verifying Stripe payment: %s', e)
         return jsonify({'error': 'Internal server error'}), 500
 
 @payments_bp.route('/mpesa/verify/<transaction_id>', methods=['GET'])
@@ -150,17 +146,31 @@ def verify_mpesa_payment(transaction_id):
     try:
         return jsonify({'error': 'M-Pesa verification not implemented yet'}), 501
     except Exception as e:
-        logger.error(f'Error verifying M-Pesa payment: {e}')
+        logger.error('Error verifying M-Pesa payment: %s', e)
         return jsonify({'error': 'Internal server error'}), 500
 
 @payments_bp.route('/history', methods=['GET'])
 @jwt_required()
 def get_payment_history():
+    """
+    GET /api/payments/history?limit=20&cursor=<next_cursor>
+    Newest first; pass next_cursor back to get the following page.
+    """
     try:
         user_id = get_jwt_identity()
-        return jsonify({'payments': []}), 200
+        limit = request.args.get('limit', 20, type=int)
+        limit = max(1, min(limit, 100))  # Max 100 payments per page
+
+        try:
+            payments, next_cursor = get_mongo_service().get_payment_history(
+                user_id, limit=limit, cursor=request.args.get('cursor')
+            )
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+
+        return jsonify({'payments': payments, 'next_cursor': next_cursor}), 200
     except Exception as e:
-        logger.error(f'Error getting payment history: {e}')
+        logger.error('Error getting payment history: %s', e)
         return jsonify({'error': 'Internal server error'}), 500
 
 @payments_bp.route('/subscription/cancel', methods=['POST'])
@@ -168,7 +178,19 @@ def get_payment_history():
 def cancel_subscription():
     try:
         user_id = get_jwt_identity()
-        return jsonify({'message': 'Subscription cancelled successfully'}), 200
+        mongo_service = get_mongo_service()
+
+        subscription = mongo_service.cancel_subscription(user_id)
+        if subscription is None:
+            return jsonify({'error': 'No active subscription'}), 404
+
+        mongo_service.update_user_subscription(user_id, {'subscription_status': 'cancelled'})
+        entitlements.invalidate(user_id)
+
+        return jsonify({
+            'message': 'Subscription cancelled successfully',
+            'subscription': subscription
+        }), 200
     except Exception as e:
-        logger.error(f'Error cancelling subscription: {e}')
+        logger.error('Error cancelling subscription: %s', e)
         return jsonify({'error': 'Internal server error'}), 500
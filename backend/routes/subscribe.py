@@ -1,10 +1,9 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from datetime import datetime
 import uuid
-import asyncio
 from backend.models import SubscribeRequest, SubscribeResponse
-from backend.services.mongo import MongoService
-from backend.services.flutterwave import FlutterwaveService
+from backend.services.mongo import get_mongo_service
+from backend.services.flutterwave import get_flutterwave_service
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,15 +11,8 @@ logger = logging.getLogger(__name__)
 subscribe_bp = Blueprint('subscribe', __name__)
 
 def init_services():
-    """Initialize services with config."""
-    from flask import current_app
-    config = current_app.config
-    mongo_service = MongoService(config['MONGO_URI'], config['MONGODB_DB_NAME'])
-    flutterwave_service = FlutterwaveService(
-        config['FLW_SECRET_KEY'],
-        config.get('FLW_SIGNATURE_KEY')
-    )
-    return mongo_service, flutterwave_service
+    """Return the shared (process-wide) services."""
+    return get_mongo_service(), get_flutterwave_service()
 
 @subscribe_bp.route('/subscribe', methods=['POST'])
 def subscribe():
@@ -38,22 +30,16 @@ def subscribe():
         # Generate unique tx_ref
         tx_ref = f"mindbuddy-{uuid.uuid4().hex[:16]}-{int(datetime.utcnow().timestamp())}"
 
-        # Create payment link asynchronously
-        from flask import current_app
+        # Create payment link over the shared pooled client
         redirect_url = current_app.config.get('REDIRECT_URL') or (request.root_url.rstrip('/') + "/payment/callback")
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        payment_link = loop.run_until_complete(
-            flutterwave_service.create_payment_link(
-                amount=subscribe_req.amount,
-                currency=subscribe_req.currency,
-                tx_ref=tx_ref,
-                email=subscribe_req.email,
-                name=subscribe_req.name,
-                redirect_url=redirect_url
-            )
+        payment_link = flutterwave_service.create_payment_link(
+            amount=subscribe_req.amount,
+            currency=subscribe_req.currency,
+            tx_ref=tx_ref,
+            email=subscribe_req.email,
+            name=subscribe_req.name,
+            redirect_url=redirect_url
         )
-        loop.close()
 
         if not payment_link:
             return jsonify({"error": "Failed to create payment link"}), 500
@@ -78,8 +64,8 @@ def subscribe():
             status="pending"
         )
 
-        return jsonify(response.dict()), 200
+        return jsonify(response.to_dict()), 200
 
     except Exception as e:
-        logger.error(f"Subscribe endpoint error: {e}")
+        logger.error("Subscribe endpoint error: %s", e)
         return jsonify({"error": "Internal server error"}), 500
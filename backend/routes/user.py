@@ -1,12 +1,13 @@
-from flask import Blueprint, request, jsonify, current_app, send_file
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from backend.models.user import User
 from backend.models.user_settings import UserSettings
 from backend.models.mood_entry import MoodEntry
 from backend.models.journal_entry import JournalEntry
 from backend.decorators import token_required
+from backend.services.export_service import stream_user_export
+from backend.services.entitlement_service import entitlements
+from backend.services import token_service
 import traceback
-import json
-import io
 from datetime import datetime
 from bson import ObjectId
 
@@ -17,11 +18,11 @@ def ping_user():
     return jsonify({"message": "user blueprint is alive"}), 200
 
 @user_bp.route("/profile", methods=["GET"])
-@token_required
+@token_required(load_user=True)
 def get_profile(current_user):
     """Get user profile"""
     try:
-        return jsonify(current_user.to_dict()), 200
+        return jsonify(current_user.to_api()), 200
     except Exception as e:
         current_app.logger.error("Get profile error: %s\n%s", e, traceback.format_exc())
         return jsonify({"message": "Internal server error"}), 500
@@ -54,14 +55,15 @@ def update_profile(current_user):
 
         if update_data:
             current_user.update(update_data)
-            # Refresh current_user data
-            current_user_data = User.find_by_id(str(current_user._id))
-            if current_user_data:
-                current_user = User.from_dict(current_user_data)
+
+        # current_user is built from token claims; the response needs the full record
+        current_user_data = User.find_by_id(str(current_user._id))
+        if not current_user_data:
+            return jsonify({"message": "User not found"}), 404
 
         return jsonify({
             "message": "Profile updated successfully",
-            "user": current_user.to_dict()
+            "user": User.from_dict(current_user_data).to_api()
         }), 200
 
     except Exception as e:
@@ -106,7 +108,7 @@ def update_settings(current_user):
         else:
             settings = UserSettings.from_dict(settings_data)
             settings.update_from_dict(data)
-            settings.update(settings.to_dict())
+            settings.update(settings.to_document())
 
         return jsonify({
             "message": "Settings updated successfully",
@@ -118,46 +120,35 @@ def update_settings(current_user):
         return jsonify({"message": "Internal server error"}), 500
 
 @user_bp.route("/export-data", methods=["GET"])
-@token_required
+@token_required(load_user=True)
 def export_user_data(current_user):
-    """Export all user data as JSON"""
+    """
+    Stream all user data as a download.
+    GET /api/user/export-data?format=json|ndjson&gzip=true
+    """
     try:
-        # Collect all user data
-        user_data = {
-            "profile": current_user.to_dict(),
-            "settings": None,
-            "moodEntries": [],
-            "journalEntries": [],
-            "exportedAt": datetime.utcnow().isoformat()
-        }
-
-        # Get user settings
-        settings_data = UserSettings.find_by_user(str(current_user._id))
-        if settings_data:
-            settings = UserSettings.from_dict(settings_data)
-            user_data["settings"] = settings.to_dict_formatted()
-
-        # Get mood entries
-        mood_entries_data = MoodEntry.find_by_user(str(current_user._id))
-        user_data["moodEntries"] = [entry for entry in mood_entries_data]
-
-        # Get journal entries
-        journal_entries_data = JournalEntry.find_by_user(str(current_user._id))
-        user_data["journalEntries"] = [entry for entry in journal_entries_data]
-
-        # Create JSON file in memory
-        json_data = json.dumps(user_data, indent=2, default=str)
-        json_bytes = json_data.encode('utf-8')
-
-        # Create a file-like object
-        file_obj = io.BytesIO(json_bytes)
-        file_obj.seek(0)
+        fmt = request.args.get("format", "json").lower()
+        if fmt not in ("json", "ndjson"):
+            return jsonify({"message": "format must be json or ndjson"}), 400
+        compress = request.args.get("gzip", "false").lower() == "true"
+
+        filename = f'mindbuddy-data-{str(current_user._id)}-{datetime.utcnow().strftime("%Y%m%d")}.{fmt}'
+        mimetype = "application/x-ndjson" if fmt == "ndjson" else "application/json"
+        if compress:
+            filename += ".gz"
+            mimetype = "application/gzip"
+
+        stream = stream_user_export(
+            current_user,
+            encode=current_app.json.dumps_bytes,
+            fmt=fmt,
+            compress=compress
+        )
 
-        return send_file(
-            file_obj,
-            as_attachment=True,
-            download_name=f'mindbuddy-data-{str(current_user._id)}-{datetime.utcnow().strftime("%Y%m%d")}.json',
-            mimetype='application/json'
+        return Response(
+            stream_with_context(stream),
+            mimetype=mimetype,
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
         )
 
     except Exception as e:
@@ -174,8 +165,9 @@ def delete_account(current_user):
         JournalEntry.collection.delete_many({"user_id": current_user._id})
         UserSettings.collection.delete_many({"user_id": current_user._id})
 
-        # Delete the user
+        # Delete the user and invalidate every token issued to them
         current_user.delete()
+        token_service.revocations.revoke_user(current_user._id, current_app.config["REFRESH_TOKEN_TTL_DAYS"])
 
         return jsonify({"message": "Account deleted successfully"}), 200
 
@@ -184,7 +176,7 @@ def delete_account(current_user):
         return jsonify({"message": "Internal server error"}), 500
 
 @user_bp.route("/stats", methods=["GET"])
-@token_required
+@token_required(load_user=True)
 def get_user_stats(current_user):
     """Get user statistics"""
     try:
@@ -199,8 +191,8 @@ def get_user_stats(current_user):
             "totalMoodEntries": mood_count,
             "totalJournalEntries": journal_count,
             "daysSinceJoining": days_since_joining,
-            "isPremium": current_user.is_premium,
-            "memberSince": current_user.created_at.isoformat() if current_user.created_at else None
+            "isPremium": entitlements.is_premium(current_user),
+            "memberSince": current_user.created_at
         }
 
         return jsonify({"stats": stats}), 200
@@ -221,10 +213,10 @@ def login():
     return jsonify({"message": "Please use /api/auth/login endpoint"}), 301
 
 @user_bp.route("/me", methods=["GET"])
-@token_required
+@token_required(load_user=True)
 def get_current_user(current_user):
     """Legacy endpoint - use /profile instead"""
-    return jsonify(current_user.to_dict()), 200
+    return jsonify(current_user.to_api()), 200
 
 @user_bp.route("/", methods=["GET"])
 def list_users():
@@ -0,0 +1,196 @@
+"""
+Opt-in sampling CPU profiler for running workers.
+
+A background thread wakes every `interval` seconds, snapshots the stack of
+every thread currently serving a request (sys._current_frames) and counts
+each stack in collapsed form, prefixed with the request's route:
+
+    GET /api/mood/stats;backend.routes.mood:get_mood_stats;... 42
+
+The output feeds flamegraph.pl or speedscope directly. Nothing runs until a
+session is started, either from /api/admin/profiler or by sending the
+configured signal to a worker; a second signal stops the session and writes
+the profile to PROFILE_DIR.
+"""
+
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from flask import request
+
+logger = logging.getLogger(__name__)
+
+
+class SamplingProfiler:
+
+    def __init__(self, interval=0.01, max_depth=64):
+        self.interval = interval
+        self._session_interval = interval
+        self.max_depth = max_depth
+        self.output_dir = "/tmp"
+        self.max_seconds = 60
+        self._lock = threading.Lock()
+        self._routes = {}
+        self._stacks = Counter()
+        self._samples = 0
+        self._thread = None
+        self._stop = threading.Event()
+        self._started_at = None
+        self._dump_on_stop = False
+        self._toggle_requested = threading.Event()
+        self._toggle_thread = None
+        self._toggle_pid = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    # Request tagging; cheap enough to leave on, but skipped while idle
+    def enter_request(self, route):
+        if self.running:
+            self._routes[threading.get_ident()] = route
+
+    def exit_request(self):
+        self._routes.pop(threading.get_ident(), None)
+
+    def start(self, seconds=None, interval=None, dump_on_stop=False):
+        """Start a sampling session; returns False if one is already running."""
+        with self._lock:
+            if self.running:
+                return False
+            # A custom interval applies to this session only
+            self._session_interval = interval or self.interval
+            self._stacks = Counter()
+            self._samples = 0
+            self._stop.clear()
+            self._started_at = time.time()
+            self._dump_on_stop = dump_on_stop
+            duration = min(seconds or self.max_seconds, self.max_seconds)
+            self._thread = threading.Thread(
+                target=self._run, args=(duration,), name="sampling-profiler", daemon=True
+            )
+            self._thread.start()
+        logger.info("Sampling profiler started (pid %s, %.0f ms interval, up to %ss)",
+                    os.getpid(), self._session_interval * 1000, duration)
+        return True
+
+    def stop(self, wait=True):
+        self._stop.set()
+        thread = self._thread
+        if wait and thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _run(self, duration):
+        own = threading.get_ident()
+        deadline = time.monotonic() + duration
+        while not self._stop.wait(self._session_interval) and time.monotonic() < deadline:
+            frames = sys._current_frames()
+            for ident, route in list(self._routes.items()):
+                frame = frames.get(ident)
+                if frame is None or ident == own:
+                    continue
+                self._stacks[self._collapse(route, frame)] += 1
+            self._samples += 1
+        self._routes.clear()
+        logger.info("Sampling profiler stopped after %s samples", self._samples)
+        if self._dump_on_stop:
+            self.dump()
+
+    def _collapse(self, route, frame):
+        names = []
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            names.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_name}")
+            frame = frame.f_back
+        names.append(route)
+        return ";".join(reversed(names))
+
+    def collapsed(self):
+        """Collapsed-stack text of the current or last session."""
+        return "".join(f"{stack} {count}\n" for stack, count in self._stacks.most_common())
+
+    def status(self):
+        return {
+            "running": self.running,
+            "pid": os.getpid(),
+            "interval_ms": round((self._session_interval if self.running else self.interval) * 1000, 2),
+            "started_at": self._started_at,
+            "samples": self._samples,
+            "stacks": len(self._stacks),
+        }
+
+    def dump(self):
+        path = os.path.join(self.output_dir, f"mindbuddy-{os.getpid()}-{int(self._started_at or time.time())}.folded")
+        with open(path, "w") as f:
+            f.write(self.collapsed())
+        logger.warning("Wrote sampling profile to %s", path)
+        return path
+
+    def toggle(self, signum=None, frame=None):
+        """
+        Signal handler: only flags the request. The handler can interrupt a
+        thread holding self._lock (or the logging locks), so starting,
+        stopping and logging happen on the toggle thread instead.
+        """
+        self._toggle_requested.set()
+
+    def ensure_toggle_thread(self):
+        """Start the thread that serves toggle requests (once per process)."""
+        with self._lock:
+            if self._toggle_thread is not None and self._toggle_thread.is_alive() and self._toggle_pid == os.getpid():
+                return
+            self._toggle_pid = os.getpid()
+            self._toggle_thread = threading.Thread(target=self._serve_toggles, name="sampling-profiler-toggle",
+                                                   daemon=True)
+            self._toggle_thread.start()
+
+    def _serve_toggles(self):
+        """Start a session, or stop the running one and dump it, per toggle request."""
+        while True:
+            self._toggle_requested.wait()
+            self._toggle_requested.clear()
+            try:
+                if self.running:
+                    self._dump_on_stop = True
+                    self.stop()
+                else:
+                    self.start(dump_on_stop=True)
+            except Exception as e:
+                logger.error("Sampling profiler toggle failed: %s", e)
+
+
+profiler = SamplingProfiler()
+
+
+def install_signal_handler(signame):
+    """Toggle the profiler on `signame` (e.g. "SIGPROF"); call from the worker's main thread."""
+    signum = getattr(signal, signame)
+    profiler.ensure_toggle_thread()
+    signal.signal(signum, profiler.toggle)
+    logger.info("Sampling profiler toggles on %s for pid %s", signame, os.getpid())
+
+
+def init_app(app):
+    """Tag request threads with their route and apply profiler config."""
+    profiler.interval = app.config["PROFILER_INTERVAL_MS"] / 1000
+    profiler.max_seconds = app.config["PROFILER_MAX_SECONDS"]
+    profiler.output_dir = app.config["PROFILE_DIR"]
+
+    @app.before_request
+    def tag_route():
+        if profiler.running:
+            rule = request.url_rule
+            profiler.enter_request(f"{request.method} {rule.rule if rule is not None else '<unmatched>'}")
+
+    @app.teardown_request
+    def untag_route(exc=None):
+        profiler.exit_request()
+
+    # Under gunicorn the handler is installed per worker (see gunicorn.conf.py);
+    # workers reset inherited signal handlers after fork.
+    if app.config["PROFILER_SIGNAL"] and threading.current_thread() is threading.main_thread():
+        install_signal_handler(app.config["PROFILER_SIGNAL"])
@@ -48,7 +48,7 @@ class ChatBot:
             "Would you like me to help you find local mental health resources?"
         )
         
-        logger.info(f"ChatBot initialized with model: {self.model_name}")
+        logger.info("ChatBot initialized with model: %s", self.model_name)
     
     def generate_response(self, message: str, conversation_context: List[Dict] = None,
                          user_sentiment: str = None) -> Dict:
@@ -89,7 +89,7 @@ class ChatBot:
                 return self._get_fallback_response(user_sentiment)
                 
         except Exception as e:
-            logger.error(f"Error generating chat response: {e}")
+            logger.error("Error generating chat response: %s", e)
             return self._get_fallback_response(user_sentiment)
     
     def _call_inference_api(self, prompt: str, max_retries: int = 2) -> Optional[str]:
@@ -130,26 +130,26 @@ class ChatBot:
                         if 'generated_text' in result:
                             return result['generated_text'].strip()
                     
-                    logger.warning(f"Unexpected API response format: {result}")
+                    logger.warning("Unexpected API response format: %s", result)
                     return None
                     
                 elif response.status_code == 503:
                     # Model is loading, wait and retry
-                    logger.info(f"Model loading, waiting... (attempt {attempt + 1})")
+                    logger.info("Model loading, waiting... (attempt %s)", attempt + 1)
                     time.sleep(5)
                     continue
                 else:
-                    logger.error(f"API error {response.status_code}: {response.text}")
+                    logger.error("API error %s: %s", response.status_code, response.text)
                     return None
                     
             except requests.exceptions.Timeout:
-                logger.warning(f"API timeout (attempt {attempt + 1})")
+                logger.warning("API timeout (attempt %s)", attempt + 1)
                 if attempt < max_retries - 1:
                     time.sleep(2)
                     continue
                 return None
             except Exception as e:
-                logger.error(f"Error calling inference API: {e}")
+                logger.error("Error calling inference API: %s", e)
                 return None
         
         return None
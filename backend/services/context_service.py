@@ -0,0 +1,177 @@
+"""
+Context Service
+Recent conversation turns for prompt assembly.
+
+Each worker keeps a ring buffer of the last CHAT_CONTEXT_MAX_TURNS turns
+per conversation (LRU-bounded to CHAT_CONTEXT_CACHE_SIZE conversations),
+appended to as turns are saved. A buffer is trusted while its turn count
+matches the conversation's message_count plus its turns still in the write
+buffer, which costs one _id lookup on the conversations index. Otherwise,
+for example after another worker wrote to the conversation, the last turns
+are re-read with one descending, projected query on
+(conversation_id, created_at). The prompt is the conversation's
+rolling summary (see summary_service) followed by the newest turns after it
+that fit CHAT_CONTEXT_TOKEN_BUDGET.
+"""
+
+import logging
+import threading
+from collections import OrderedDict, deque
+from backend.models import ChatLog, Conversation
+from backend.services.write_buffer import write_buffer
+
+logger = logging.getLogger(__name__)
+
+# Rough tokens-per-character for English text; no tokenizer is loaded for the Groq models
+CHARS_PER_TOKEN = 4
+
+SUMMARY_PREFIX = "Summary of the earlier conversation: "
+
+
+def estimate_tokens(text):
+    return len(text or "") // CHARS_PER_TOKEN + 1
+
+
+def turn_messages(turn):
+    """A stored turn (user message plus the reply to it) as chat messages."""
+    if turn.get("role") == "assistant":
+        return [{"role": "assistant", "content": turn.get("message") or turn.get("ai_response") or ""}]
+    messages = [{"role": "user", "content": turn.get("message") or ""}]
+    if turn.get("ai_response"):
+        messages.append({"role": "assistant", "content": turn["ai_response"]})
+    return messages
+
+
+class ConversationNotOwned(Exception):
+    """The conversation id belongs to another user."""
+
+
+class _Buffer:
+    __slots__ = ("turns", "count")
+
+    def __init__(self, turns, count, max_turns):
+        self.turns = deque(turns, maxlen=max_turns)
+        self.count = count
+
+
+class ContextService:
+
+    def __init__(self, max_turns=10, token_budget=1500, cache_size=1000):
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.cache_size = cache_size
+        self._buffers = OrderedDict()
+        self._lock = threading.Lock()
+
+    def configure(self, config):
+        self.max_turns = config["CHAT_CONTEXT_MAX_TURNS"]
+        self.token_budget = config["CHAT_CONTEXT_TOKEN_BUDGET"]
+        self.cache_size = config["CHAT_CONTEXT_CACHE_SIZE"]
+        self.clear()
+
+    def _cached(self, conversation_id, count):
+        with self._lock:
+            buffer = self._buffers.get(conversation_id)
+            if buffer is None or buffer.count != count:
+                return None
+            self._buffers.move_to_end(conversation_id)
+            return list(buffer.turns)
+
+    def _store(self, conversation_id, turns, count):
+        with self._lock:
+            self._buffers[conversation_id] = _Buffer(turns, count, self.max_turns)
+            self._buffers.move_to_end(conversation_id)
+            while len(self._buffers) > self.cache_size:
+                self._buffers.popitem(last=False)
+
+    def _load(self, conversation_id, user_id):
+        conversation = Conversation.get_state(conversation_id)
+        # Turns still in the write buffer count as part of the conversation
+        pending = write_buffer.pending_turns(conversation_id)
+        if conversation is not None:
+            if str(conversation["user_id"]) != str(user_id):
+                raise ConversationNotOwned(conversation_id)
+            conversation["message_count"] += len(pending)
+            turns = self._cached(conversation_id, conversation["message_count"])
+            if turns is not None:
+                return conversation, turns
+
+        turns = ChatLog.find_recent_turns(conversation_id, self.max_turns)
+        if pending:
+            # A flush may have landed between the two reads
+            written = {turn["_id"] for turn in turns}
+            turns = (turns + [turn for turn in pending if turn["_id"] not in written])[-self.max_turns:]
+        if conversation is not None:
+            self._store(conversation_id, turns, conversation["message_count"])
+        return conversation, turns
+
+    def recent_turns(self, conversation_id, user_id):
+        """
+        The last max_turns turns of a conversation, oldest first. Raises
+        ConversationNotOwned if the conversation belongs to someone else.
+        """
+        return self._load(conversation_id, user_id)[1]
+
+    def build_messages(self, conversation_id, user_id, token_budget=None):
+        """
+        Chat messages for the prompt, oldest first: the conversation summary,
+        if there is one, then the newest unsummarised turns that fit the
+        token budget. Schedules a summary once the unsummarised turns
+        outgrow the summariser's trigger.
+        """
+        budget = self.token_budget if token_budget is None else token_budget
+        conversation, turns = self._load(conversation_id, user_id)
+        prompt = []
+        if conversation is not None:
+            unsummarized = conversation["message_count"] - (conversation.get("summarized_count") or 0)
+            if conversation.get("summary"):
+                turns = turns[-unsummarized:] if unsummarized > 0 else []
+                summary = SUMMARY_PREFIX + conversation["summary"]
+                budget -= estimate_tokens(summary)
+                prompt.append({"role": "system", "content": summary})
+            self._maybe_summarize(conversation_id, turns, unsummarized)
+
+        selected = []
+        for turn in reversed(turns):
+            messages = turn_messages(turn)
+            cost = sum(estimate_tokens(m["content"]) for m in messages)
+            if cost > budget:
+                break
+            budget -= cost
+            selected.append(messages)
+        return prompt + [message for messages in reversed(selected) for message in messages]
+
+    def _maybe_summarize(self, conversation_id, turns, unsummarized):
+        from backend.services.summary_service import summarizer
+
+        if unsummarized <= summarizer.keep_turns:
+            return
+        # Turns older than the window are dropped from prompts until summarised
+        raw_tokens = sum(estimate_tokens(m["content"]) for turn in turns for m in turn_messages(turn))
+        if unsummarized > len(turns) or raw_tokens > summarizer.trigger_tokens:
+            summarizer.schedule(conversation_id)
+
+    def record_turn(self, chat_log, new_conversation=False):
+        """
+        Append a just-saved (or just-queued) turn to its conversation's buffer. A new
+        conversation gets a buffer holding just this turn; otherwise turns
+        are only appended to buffers this worker already has.
+        """
+        turn = {"_id": chat_log._id, "role": chat_log.role, "message": chat_log.message,
+                "ai_response": chat_log.ai_response}
+        with self._lock:
+            buffer = self._buffers.get(chat_log.conversation_id)
+            if buffer is not None:
+                buffer.turns.append(turn)
+                buffer.count += 1
+                return
+        if new_conversation:
+            self._store(chat_log.conversation_id, [turn], 1)
+
+    def clear(self):
+        with self._lock:
+            self._buffers.clear()
+
+
+# Singleton instance
+context_service = ContextService()
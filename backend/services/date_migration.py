@@ -0,0 +1,167 @@
+"""
+BSON Date Migration
+Converts timestamps that older model code stored as ISO strings into native
+BSON dates, so date-range queries and indexes on them actually match.
+
+The migration is batched and resumable: only documents that still hold a
+string timestamp are selected, and progress (the last _id processed) is
+checkpointed per collection in the `migration_state` collection. An
+interrupted run resumes after that _id, unless pending documents now have
+_ids of another type (say, re-keyed by compact-documents in between), which
+a $gt on the old _id would never match; then, like a run after a completed
+one, it starts over from the beginning.
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, List
+from bson import ObjectId
+from pymongo import UpdateOne
+from backend.models import (
+    User, UserSettings, MoodEntry, JournalEntry,
+    SentimentHistory, ChatLog, WellnessInsight
+)
+from backend.models.serialization import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_NAME = "bson_dates"
+
+# Timestamp fields per model that may hold ISO strings
+DATE_FIELDS = {
+    User: ["created_at", "updated_at"],
+    UserSettings: ["created_at", "updated_at"],
+    MoodEntry: ["created_at", "updated_at", "createdAt", "updatedAt"],
+    JournalEntry: ["created_at", "updated_at", "createdAt", "updatedAt"],
+    SentimentHistory: ["created_at", "updated_at"],
+    ChatLog: ["created_at", "updated_at"],
+    WellnessInsight: ["created_at", "updated_at", "read_at"],
+}
+
+
+def _string_dates_query(fields: List[str]) -> Dict:
+    return {"$or": [{field: {"$type": "string"}} for field in fields]}
+
+
+# BSON $type aliases for the _id types a checkpoint can hold
+ID_TYPES = {ObjectId: "objectId", str: "string", int: "number", float: "number"}
+
+
+def _other_id_types(collection, query: Dict, last_id) -> bool:
+    """Whether any document matching `query` has an _id of a different type than last_id."""
+    alias = ID_TYPES.get(type(last_id))
+    if alias is None:
+        return True
+    return collection.find_one({**query, "_id": {"$not": {"$type": alias}}}, {"_id": 1}) is not None
+
+
+def _state_collection():
+    return User.collection.database.migration_state
+
+
+def migrate_collection(model, fields: List[str], batch_size: int = 500) -> Dict:
+    """
+    Convert string timestamps in one collection, in _id order, resuming
+    after the checkpointed _id if the previous run did not complete.
+
+    Returns a dict with the number of converted and unparseable documents.
+    """
+    collection = model.collection
+    state = _state_collection()
+    state_id = f"{MIGRATION_NAME}:{collection.name}"
+    checkpoint = state.find_one({"_id": state_id}) or {}
+
+    # A run after a completed one starts its count over too
+    converted = checkpoint.get("converted", 0) if not checkpoint.get("completed_at") else 0
+    failed = []
+    ops = []
+
+    def flush(last_id):
+        nonlocal ops, converted
+        if ops:
+            result = collection.bulk_write(ops, ordered=False)
+            converted += result.modified_count
+            ops = []
+        state.update_one(
+            {"_id": state_id},
+            {"$set": {"last_id": last_id, "converted": converted, "updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+
+    last_id = None
+    query = _string_dates_query(fields)
+    if checkpoint and not checkpoint.get("completed_at"):
+        last_id = checkpoint.get("last_id")
+        if last_id is not None and _other_id_types(collection, query, last_id):
+            logger.warning("%s: pending _ids differ in type from the checkpoint; starting over",
+                           collection.name)
+            last_id = None
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+    elif checkpoint:
+        state.update_one(
+            {"_id": state_id},
+            {"$set": {"converted": 0}, "$unset": {"completed_at": "", "last_id": ""}}
+        )
+
+    cursor = collection.find(
+        query,
+        projection=fields,
+        batch_size=batch_size
+    ).sort("_id", 1)
+    for doc in cursor:
+        update = {}
+        for field in fields:
+            value = doc.get(field)
+            if isinstance(value, str):
+                parsed = parse_datetime(value)
+                if parsed is None:
+                    failed.append({"_id": str(doc["_id"]), "field": field, "value": value})
+                    continue
+                update[field] = parsed
+
+        if update:
+            ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": update}))
+        last_id = doc["_id"]
+
+        if len(ops) >= batch_size:
+            flush(last_id)
+            logger.info("Migrated %s: %d documents so far", collection.name, converted)
+
+    flush(last_id)
+    state.update_one({"_id": state_id}, {"$set": {"completed_at": datetime.utcnow()}})
+
+    if failed:
+        logger.warning("%s: %d timestamps could not be parsed", collection.name, len(failed))
+
+    return {"converted": converted, "unparseable": failed}
+
+
+def migrate_all(batch_size: int = 500) -> Dict:
+    """Run the migration over every model collection."""
+    results = {}
+    for model, fields in DATE_FIELDS.items():
+        results[model.collection.name] = migrate_collection(model, fields, batch_size=batch_size)
+    return results
+
+
+def verify() -> Dict:
+    """
+    Report how many documents per collection still hold string timestamps.
+
+    Returns a dict keyed by collection name with total documents, remaining
+    string counts per field and an `ok` flag.
+    """
+    report = {}
+    for model, fields in DATE_FIELDS.items():
+        collection = model.collection
+        remaining = {
+            field: collection.count_documents({field: {"$type": "string"}})
+            for field in fields
+        }
+        report[collection.name] = {
+            "total": collection.estimated_document_count(),
+            "remaining_strings": remaining,
+            "ok": not any(remaining.values())
+        }
+    return report
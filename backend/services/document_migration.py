@@ -0,0 +1,136 @@
+"""
+Document Compaction Migration
+Rewrites documents stored by the old shared to_dict() path into the compact
+to_document() storage shape:
+
+- string `_id`, `user_id` and `journal_entry_id` values become ObjectIds
+- duplicated camelCase fields on journal and mood entries are removed
+
+Like the date migration it is batched and safe to re-run: only documents that
+still match a legacy shape are selected.
+"""
+
+import logging
+from typing import Dict, List
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from backend.models import (
+    UserSettings, MoodEntry, JournalEntry,
+    SentimentHistory, ChatLog, WellnessInsight
+)
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY_ERROR = 11000
+
+# Reference fields per model that older documents stored as strings
+ID_FIELDS = {
+    UserSettings: ["user_id"],
+    MoodEntry: ["user_id"],
+    JournalEntry: ["user_id"],
+    SentimentHistory: ["user_id", "journal_entry_id"],
+    ChatLog: ["user_id"],
+    WellnessInsight: ["user_id"],
+}
+
+# camelCase copies written alongside the snake_case fields
+CAMEL_CASE_FIELDS = {
+    MoodEntry: ["id", "userId", "moodLevel", "createdAt", "updatedAt"],
+    JournalEntry: ["id", "userId", "createdAt", "updatedAt", "isPrivate", "aiInsights"],
+}
+
+
+def _as_object_id(value):
+    if isinstance(value, str) and ObjectId.is_valid(value):
+        return ObjectId(value)
+    return value
+
+
+def _legacy_query(id_fields: List[str], camel_fields: List[str]) -> Dict:
+    clauses = [{"_id": {"$type": "string"}}]
+    clauses += [{field: {"$type": "string"}} for field in id_fields]
+    clauses += [{field: {"$exists": True}} for field in camel_fields]
+    return {"$or": clauses}
+
+
+def _compact(doc: Dict, id_fields: List[str], camel_fields: List[str]) -> Dict:
+    compacted = {k: v for k, v in doc.items() if k not in camel_fields}
+    for field in ["_id"] + id_fields:
+        if field in compacted:
+            compacted[field] = _as_object_id(compacted[field])
+    return compacted
+
+
+def _replace_string_ids(collection, docs: List[Dict]) -> int:
+    """Re-insert documents under ObjectId keys; _id itself cannot be updated in place."""
+    if not docs:
+        return 0
+    try:
+        collection.insert_many([new for _, new in docs], ordered=False)
+    except BulkWriteError as e:
+        # A previous interrupted run may already have inserted some copies
+        errors = [err for err in e.details.get("writeErrors", []) if err.get("code") != DUPLICATE_KEY_ERROR]
+        if errors:
+            raise
+    collection.delete_many({"_id": {"$in": [old_id for old_id, _ in docs]}})
+    return len(docs)
+
+
+def compact_collection(model, batch_size: int = 500) -> Dict:
+    """Compact one collection. Returns counts of rewritten and re-keyed documents."""
+    collection = model.collection
+    id_fields = ID_FIELDS.get(model, [])
+    camel_fields = CAMEL_CASE_FIELDS.get(model, [])
+
+    updated = 0
+    rekeyed = 0
+    ops = []
+    rekey = []
+
+    def flush():
+        nonlocal ops, rekey, updated, rekeyed
+        if ops:
+            updated += collection.bulk_write(ops, ordered=False).modified_count
+            ops = []
+        rekeyed += _replace_string_ids(collection, rekey)
+        rekey = []
+
+    cursor = collection.find(_legacy_query(id_fields, camel_fields), batch_size=batch_size)
+    for doc in cursor:
+        compacted = _compact(doc, id_fields, camel_fields)
+        if compacted["_id"] != doc["_id"]:
+            rekey.append((doc["_id"], compacted))
+        else:
+            update = {"$set": {field: compacted[field] for field in id_fields if field in compacted}}
+            unset = {field: "" for field in camel_fields if field in doc}
+            if unset:
+                update["$unset"] = unset
+            if not update["$set"]:
+                del update["$set"]
+            ops.append(UpdateOne({"_id": doc["_id"]}, update))
+
+        if len(ops) + len(rekey) >= batch_size:
+            flush()
+            logger.info("Compacted %s: %d updated, %d re-keyed so far", collection.name, updated, rekeyed)
+
+    flush()
+    return {"updated": updated, "rekeyed": rekeyed}
+
+
+def compact_all(batch_size: int = 500) -> Dict:
+    """Run the compaction over every model collection."""
+    return {
+        model.collection.name: compact_collection(model, batch_size=batch_size)
+        for model in ID_FIELDS
+    }
+
+
+def verify() -> Dict:
+    """Report how many documents per collection still have a legacy shape."""
+    return {
+        model.collection.name: model.collection.count_documents(
+            _legacy_query(ID_FIELDS.get(model, []), CAMEL_CASE_FIELDS.get(model, []))
+        )
+        for model in ID_FIELDS
+    }
@@ -0,0 +1,175 @@
+"""
+Entitlement Service
+Decides whether a user currently has premium access.
+
+The effective plan is computed from the subscriptions collection (an active
+subscription whose renewal_date has not passed) with one indexed query and
+cached per user in process. A cached entry never outlives the subscription's
+renewal_date, so expiry is exact without a per-request check against the
+database. Lapsed subscriptions are downgraded in bulk by sweep_lapsed()
+(`flask expire-subscriptions`, run on a schedule), which also keeps the
+denormalised subscription fields on the user document in step.
+"""
+
+import logging
+import threading
+from datetime import datetime, timedelta
+from functools import wraps
+from typing import NamedTuple, Optional
+from bson import ObjectId
+from flask import jsonify
+from pymongo import DESCENDING
+from backend.services.mongo import get_mongo_service
+
+logger = logging.getLogger(__name__)
+
+FREE_PLAN = "free"
+# A cancelled subscription keeps its access until renewal_date
+ENTITLED_STATUSES = ["active", "cancelled"]
+
+
+class Entitlement(NamedTuple):
+    plan: str
+    premium: bool
+    expires_at: Optional[datetime] = None
+
+
+FREE = Entitlement(FREE_PLAN, False)
+
+
+class EntitlementService:
+
+    def __init__(self, ttl_seconds=300, negative_ttl_seconds=30, max_entries=10000):
+        self.ttl_seconds = ttl_seconds
+        # Free results are re-checked sooner so a new payment shows up quickly
+        # on workers that did not process the webhook.
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_entries = max_entries
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def configure(self, config):
+        self.ttl_seconds = config["ENTITLEMENT_CACHE_TTL_S"]
+        self.negative_ttl_seconds = config["ENTITLEMENT_NEGATIVE_TTL_S"]
+        self.max_entries = config["ENTITLEMENT_CACHE_SIZE"]
+        self.clear()
+
+    def compute(self, user) -> Entitlement:
+        """Effective plan from the subscription documents (one indexed query)."""
+        now = datetime.utcnow()
+        subscription = get_mongo_service().subscriptions.find_one(
+            {"user_id": str(user._id), "status": {"$in": ENTITLED_STATUSES}, "renewal_date": {"$gt": now}},
+            projection={"_id": 0, "plan_name": 1, "renewal_date": 1},
+            sort=[("renewal_date", DESCENDING)],
+        )
+        if subscription:
+            return Entitlement(subscription["plan_name"], True, subscription["renewal_date"])
+        # Accounts granted premium by hand have the flag but no subscription history
+        if user.is_premium and user.subscription_status is None:
+            return Entitlement("premium", True)
+        return FREE
+
+    def get(self, user) -> Entitlement:
+        key = str(user._id)
+        now = datetime.utcnow()
+        cached = self._cache.get(key)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+
+        entitlement = self.compute(user)
+        ttl = self.ttl_seconds if entitlement.premium else self.negative_ttl_seconds
+        cache_until = now + timedelta(seconds=ttl)
+        if entitlement.expires_at is not None:
+            cache_until = min(cache_until, entitlement.expires_at)
+        with self._lock:
+            if len(self._cache) >= self.max_entries and key not in self._cache:
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[key] = (entitlement, cache_until)
+        return entitlement
+
+    def is_premium(self, user) -> bool:
+        return self.get(user).premium
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._cache.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+# Singleton instance
+entitlements = EntitlementService()
+
+
+def requires_premium(f):
+    """
+    Restrict a route to premium users. Goes below @token_required and uses
+    the current_user it passes in; the access-token claim or a cached
+    lookup costs no queries.
+    """
+    @wraps(f)
+    def decorated(current_user, *args, **kwargs):
+        # Access tokens carry the flag and never outlive the premium period
+        claims = getattr(current_user, "claims", None)
+        premium = claims["premium"] if claims and "premium" in claims else entitlements.is_premium(current_user)
+        if not premium:
+            return jsonify({'message': 'Premium subscription required'}), 403
+        return f(current_user, *args, **kwargs)
+
+    return decorated
+
+
+def sweep_lapsed(now=None, batch_size=500):
+    """
+    Expire active or cancelled subscriptions whose renewal_date has passed
+    and downgrade their users, unless they still hold another entitled
+    subscription.
+    Returns counts of expired subscriptions and downgraded users.
+    """
+    now = now or datetime.utcnow()
+    mongo_service = get_mongo_service()
+    subscriptions, users = mongo_service.subscriptions, mongo_service.users
+    lapsed_filter = {"status": {"$in": ENTITLED_STATUSES}, "renewal_date": {"$lte": now}}
+
+    lapsed_user_ids = set()
+    expired = 0
+    while True:
+        batch = list(subscriptions.find(lapsed_filter, {"_id": 1, "user_id": 1}).limit(batch_size))
+        if not batch:
+            break
+        result = subscriptions.update_many(
+            {"_id": {"$in": [doc["_id"] for doc in batch]}, **lapsed_filter},
+            {"$set": {"status": "expired", "expired_at": now}},
+        )
+        expired += result.modified_count
+        lapsed_user_ids.update(doc["user_id"] for doc in batch)
+
+    # Users whose own renewal_date lapsed (covers subscriptions expired earlier)
+    lapsed_user_ids.update(
+        str(doc["_id"]) for doc in users.find(
+            {"subscription_status": {"$in": ENTITLED_STATUSES}, "renewal_date": {"$lte": now}}, {"_id": 1}
+        )
+    )
+    if lapsed_user_ids:
+        still_active = set(subscriptions.distinct("user_id", {
+            "user_id": {"$in": list(lapsed_user_ids)}, "status": {"$in": ENTITLED_STATUSES}, "renewal_date": {"$gt": now}
+        }))
+        lapsed_user_ids -= still_active
+
+    downgraded = 0
+    user_ids = sorted(lapsed_user_ids)
+    for start in range(0, len(user_ids), batch_size):
+        chunk = user_ids[start:start + batch_size]
+        oids = [ObjectId(uid) for uid in chunk if ObjectId.is_valid(uid)]
+        result = users.update_many(
+            {"_id": {"$in": oids}, "subscription_status": {"$in": ENTITLED_STATUSES}},
+            {"$set": {"subscription_status": "expired", "is_premium": False}},
+        )
+        downgraded += result.modified_count
+        for uid in chunk:
+            entitlements.invalidate(uid)
+
+    logger.info("Subscription sweep: %s expired, %s users downgraded", expired, downgraded)
+    return {"expired_subscriptions": expired, "downgraded_users": downgraded}
@@ -0,0 +1,101 @@
+"""
+Data Export Service
+Streams a user's data out of MongoDB as JSON or NDJSON without holding the
+export in memory: documents are read from batched cursors, encoded one at a
+time and yielded in fixed-size chunks, optionally gzip-compressed on the fly.
+"""
+
+import logging
+import zlib
+from datetime import datetime
+from typing import Callable, Iterable, Iterator
+from backend.models import (
+    UserSettings, MoodEntry, JournalEntry,
+    SentimentHistory, ChatLog, WellnessInsight
+)
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+BATCH_SIZE = 200
+
+# (export key, model, cursor sort field)
+EXPORT_COLLECTIONS = [
+    ("moodEntries", MoodEntry, "created_at"),
+    ("journalEntries", JournalEntry, "created_at"),
+    ("chatLogs", ChatLog, "created_at"),
+    ("sentimentHistory", SentimentHistory, "created_at"),
+    ("wellnessInsights", WellnessInsight, "created_at"),
+]
+
+
+def _iter_documents(model, user_id, sort_field: str, batch_size: int) -> Iterator[dict]:
+    cursor = model.collection.find({"user_id": user_id}, batch_size=batch_size).sort(sort_field, 1)
+    for doc in cursor:
+        yield model.from_dict(doc).to_api()
+
+
+def iter_json(user, encode: Callable[[object], bytes], batch_size: int = BATCH_SIZE) -> Iterator[bytes]:
+    """Yield a single JSON object: {"profile": ..., "settings": ..., "<collection>": [...], "exportedAt": ...}"""
+    settings_data = UserSettings.find_by_user(str(user._id))
+    settings = UserSettings.from_dict(settings_data).to_dict_formatted() if settings_data else None
+
+    yield b'{"profile":' + encode(user.to_api())
+    yield b',"settings":' + encode(settings)
+
+    for key, model, sort_field in EXPORT_COLLECTIONS:
+        yield b',"' + key.encode() + b'":['
+        first = True
+        for item in _iter_documents(model, user._id, sort_field, batch_size):
+            yield encode(item) if first else b"," + encode(item)
+            first = False
+        yield b"]"
+
+    yield b',"exportedAt":' + encode(datetime.utcnow()) + b"}"
+
+
+def iter_ndjson(user, encode: Callable[[object], bytes], batch_size: int = BATCH_SIZE) -> Iterator[bytes]:
+    """Yield one {"type": ..., "data": ...} record per line."""
+    settings_data = UserSettings.find_by_user(str(user._id))
+    settings = UserSettings.from_dict(settings_data).to_dict_formatted() if settings_data else None
+
+    yield encode({"type": "profile", "data": user.to_api()}) + b"\n"
+    yield encode({"type": "settings", "data": settings}) + b"\n"
+
+    for key, model, sort_field in EXPORT_COLLECTIONS:
+        for item in _iter_documents(model, user._id, sort_field, batch_size):
+            yield encode({"type": key, "data": item}) + b"\n"
+
+    yield encode({"type": "exportedAt", "data": datetime.utcnow()}) + b"\n"
+
+
+def chunked(parts: Iterable[bytes], size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Coalesce many small writes into chunks of roughly `size` bytes."""
+    buffer = bytearray()
+    for part in parts:
+        buffer += part
+        if len(buffer) >= size:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def gzipped(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Gzip-compress a byte stream incrementally."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def stream_user_export(user, encode: Callable[[object], bytes], fmt: str = "json",
+                       compress: bool = False, batch_size: int = BATCH_SIZE) -> Iterator[bytes]:
+    """Build the full export stream for a user."""
+    parts = iter_ndjson(user, encode, batch_size) if fmt == "ndjson" else iter_json(user, encode, batch_size)
+    stream = chunked(parts)
+    if compress:
+        stream = gzipped(stream)
+    return stream
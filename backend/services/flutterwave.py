@@ -1,30 +1,78 @@
 import httpx
 import hashlib
 import hmac
-import json
+import os
+import random
+import time
+import asyncio
 from typing import Optional, Dict, Any
+from flask import current_app
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Worth retrying: the request never reached Flutterwave or it asked us to back off.
+# create_payment_link is safe to retry because Flutterwave dedupes on tx_ref.
+RETRY_STATUSES = {429, 502, 503, 504}
+
+
 class FlutterwaveService:
+    """
+    Flutterwave API client.
+
+    Holds one pooled httpx.Client for the process (keep-alive, TLS session
+    reuse, explicit timeouts) and an httpx.AsyncClient created on first async
+    use. Retries transient failures with jittered exponential backoff.
+    """
     BASE_URL = "https://api.flutterwave.com/v3"
 
-    def __init__(self, secret_key: str, signature_key: Optional[str] = None):
+    def __init__(self, secret_key: str, signature_key: Optional[str] = None,
+                 base_url: Optional[str] = None, timeout: float = 10.0,
+                 connect_timeout: float = 3.0, max_retries: int = 2,
+                 pool_size: int = 20, backoff: float = 0.25):
         self.secret_key = secret_key
         self.signature_key = signature_key
+        self.base_url = (base_url or self.BASE_URL).rstrip("/")
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._timeout = httpx.Timeout(timeout, connect=connect_timeout, pool=connect_timeout)
+        self._limits = httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=30.0,
+        )
+        self._client = httpx.Client(
+            base_url=self.base_url,
+            headers=self._headers(),
+            timeout=self._timeout,
+            limits=self._limits,
+        )
+        self._async_client = None
 
-    async def create_payment_link(
-        self,
-        amount: int,
-        currency: str,
-        tx_ref: str,
-        email: str,
-        name: str,
-        redirect_url: str
-    ) -> Optional[str]:
-        """Creates a payment link using Flutterwave API."""
-        payload = {
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.secret_key}",
+            "Content-Type": "application/json"
+        }
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        # Created lazily: connections bind to the event loop that first uses them
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self._headers(),
+                timeout=self._timeout,
+                limits=self._limits,
+            )
+        return self._async_client
+
+    def _delay(self, attempt: int) -> float:
+        return self.backoff * (2 ** attempt) * (0.5 + random.random() / 2)
+
+    @staticmethod
+    def _payment_payload(amount, currency, tx_ref, email, name, redirect_url) -> Dict[str, Any]:
+        return {
             "tx_ref": tx_ref,
             "amount": amount,
             "currency": currency,
@@ -39,27 +87,78 @@ class FlutterwaveService:
             }
         }
 
-        headers = {
-            "Authorization": f"Bearer {self.secret_key}",
-            "Content-Type": "application/json"
-        }
+    @staticmethod
+    def _payment_link(response: httpx.Response) -> Optional[str]:
+        response.raise_for_status()
+        return response.json().get("data", {}).get("link")
+
+    def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self._client.request(method, path, **kwargs)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout, httpx.RemoteProtocolError) as e:
+                if attempt == self.max_retries:
+                    raise
+                logger.warning("Flutterwave %s %s failed (%s), retrying", method, path, e)
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    return response
+                logger.warning("Flutterwave %s %s returned %s, retrying", method, path, response.status_code)
+            time.sleep(self._delay(attempt))
 
-        async with httpx.AsyncClient() as client:
+    async def _arequest(self, method: str, path: str, **kwargs) -> httpx.Response:
+        for attempt in range(self.max_retries + 1):
             try:
-                response = await client.post(
-                    f"{self.BASE_URL}/payments",
-                    json=payload,
-                    headers=headers
-                )
-                response.raise_for_status()
-                data = response.json()
-                return data.get("data", {}).get("link")
-            except httpx.HTTPStatusError as e:
-                logger.error(f"Flutterwave API error: {e.response.status_code} - {e.response.text}")
-                return None
-            except Exception as e:
-                logger.error(f"Failed to create payment link: {e}")
-                return None
+                response = await self.async_client.request(method, path, **kwargs)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout, httpx.RemoteProtocolError) as e:
+                if attempt == self.max_retries:
+                    raise
+                logger.warning("Flutterwave %s %s failed (%s), retrying", method, path, e)
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    return response
+                logger.warning("Flutterwave %s %s returned %s, retrying", method, path, response.status_code)
+            await asyncio.sleep(self._delay(attempt))
+
+    def create_payment_link(
+        self,
+        amount: int,
+        currency: str,
+        tx_ref: str,
+        email: str,
+        name: str,
+        redirect_url: str
+    ) -> Optional[str]:
+        """Creates a payment link using Flutterwave API."""
+        payload = self._payment_payload(amount, currency, tx_ref, email, name, redirect_url)
+        try:
+            return self._payment_link(self._request("POST", "/payments", json=payload))
+        except httpx.HTTPStatusError as e:
+            logger.error("Flutterwave API error: %s - %s", e.response.status_code, e.response.text)
+            return None
+        except Exception as e:
+            logger.error("Failed to create payment link: %s", e)
+            return None
+
+    async def acreate_payment_link(
+        self,
+        amount: int,
+        currency: str,
+        tx_ref: str,
+        email: str,
+        name: str,
+        redirect_url: str
+    ) -> Optional[str]:
+        """Async variant of create_payment_link for callers already on an event loop."""
+        payload = self._payment_payload(amount, currency, tx_ref, email, name, redirect_url)
+        try:
+            return self._payment_link(await self._arequest("POST", "/payments", json=payload))
+        except httpx.HTTPStatusError as e:
+            logger.error("Flutterwave API error: %s - %s", e.response.status_code, e.response.text)
+            return None
+        except Exception as e:
+            logger.error("Failed to create payment link: %s", e)
+            return None
 
     def validate_webhook_signature(self, request_headers: Dict[str, Any], raw_body: bytes) -> bool:
         """Validates the webhook signature using Flutterwave's signature key."""
@@ -79,3 +178,41 @@ class FlutterwaveService:
         ).hexdigest()
 
         return hmac.compare_digest(signature, expected_signature)
+
+    def close(self):
+        self._client.close()
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+
+# Singleton instance
+_flutterwave_service = None
+
+def get_flutterwave_service() -> FlutterwaveService:
+    """Get or create the shared Flutterwave client"""
+    global _flutterwave_service
+    if _flutterwave_service is None:
+        config = current_app.config
+        _flutterwave_service = FlutterwaveService(
+            config['FLW_SECRET_KEY'],
+            config.get('FLW_SIGNATURE_KEY'),
+            base_url=config.get('FLW_BASE_URL'),
+            timeout=config['FLW_TIMEOUT_S'],
+            connect_timeout=config['FLW_CONNECT_TIMEOUT_S'],
+            max_retries=config['FLW_MAX_RETRIES'],
+            pool_size=config['FLW_POOL_SIZE'],
+        )
+    return _flutterwave_service
+
+
+def _reset_after_fork():
+    # Pooled sockets must not be shared with the parent; build a new client on next use
+    global _flutterwave_service
+    _flutterwave_service = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -8,6 +8,7 @@ import logging
 import random
 from typing import Dict, List
 from datetime import datetime, timedelta
+from backend.models.serialization import parse_datetime
 
 logger = logging.getLogger(__name__)
 
@@ -128,6 +129,24 @@ class InsightsGenerator:
         positive_count = sum(1 for s in sentiment_history if s.get('sentiment_label') == 'positive')
         total_count = len(sentiment_history)
         
+        return self.analyze_mood_pattern_counts(negative_count, positive_count, total_count)
+    
+    def analyze_mood_pattern_counts(self, negative_count: int, positive_count: int,
+                                    total_count: int) -> Dict:
+        """
+        Generate a mood pattern insight from pre-aggregated sentiment counts.
+        
+        Args:
+            negative_count: Number of negative entries
+            positive_count: Number of positive entries
+            total_count: Total number of entries
+            
+        Returns:
+            Dict with pattern analysis and insight
+        """
+        if total_count < 2:
+            return None
+        
         # Determine trend
         if negative_count > total_count * 0.6:
             trend = 'declining'
@@ -309,14 +328,9 @@ class InsightsGenerator:
         
         for insight in existing_insights:
             if insight.get('insight_type') == insight_type:
-                created_str = insight.get('created_at')
-                if created_str:
-                    try:
-                        created_at = datetime.fromisoformat(created_str.replace('Z', '+00:00'))
-                        if created_at > cutoff_time:
-                            return False
-                    except:
-                        pass
+                created_at = parse_datetime(insight.get('created_at'))
+                if created_at and created_at > cutoff_time:
+                    return False
         
         return True
 
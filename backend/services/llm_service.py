@@ -1,7 +1,12 @@
 #!/usr/bin/env python3
 import os
-import torch
-from transformers import BlenderbotTokenizer, BlenderbotForConditionalGeneration
+import logging
+from backend.instrumentation import timed_block
+
+logger = logging.getLogger(__name__)
+
+# torch/transformers are imported only when the local backend is selected,
+# so Groq-only deployments never pay for them.
 
 # Optional Groq integration
 try:
@@ -18,10 +23,9 @@ class LLMService:
         self.client = None
         self.model = None
         self.tokenizer = None
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.device = "cpu"
 
-        # === Short-term memory for Sereni ===
-        self.chat_history = []
+        # Conversation context is passed in per request (see context_service)
         self.last_intent = None
 
         # === Sereni system personality prompt ===
@@ -34,6 +38,15 @@ class LLMService:
             "Use soft, human-like tone and short, mindful sentences."
         )
 
+        # Used by the background conversation summariser (see summary_service)
+        self.SUMMARY_SYSTEM_PROMPT = (
+            "You maintain a running summary of a conversation between a user and Sereni, "
+            "a mental wellness companion. Combine the existing summary with the new turns "
+            "into one updated summary. Keep what the user shared about their feelings, "
+            "circumstances, goals and anything Sereni suggested or promised. "
+            "Write plain third-person prose, no lists, as briefly as possible."
+        )
+
         # Always prepare a local fallback
         self.model_path = model_path or os.path.expanduser(
             "~/.cache/huggingface/hub/models--facebook--blenderbot-400M-distill"
@@ -44,9 +57,9 @@ class LLMService:
             try:
                 self.client = Groq(api_key=self.groq_key)
                 self.use_groq = True
-                print("⚡ Using Groq Cloud LLM backend")
+                logger.info("Using Groq Cloud LLM backend")
             except Exception as e:
-                print(f"⚠️ Failed to init Groq client: {e} — falling back to local")
+                logger.warning("Failed to init Groq client: %s — falling back to local", e)
 
         # === Local model fallback ===
         if not self.use_groq:
@@ -63,36 +76,47 @@ class LLMService:
     def _load_local_model(self):
         """Load Blenderbot model as local fallback."""
         try:
-            print(f"🧠 Loading local Blenderbot model from: {self.model_path}")
+            import torch
+            from transformers import BlenderbotTokenizer, BlenderbotForConditionalGeneration
+
+            self.device = "cuda" if torch.cuda.is_available() else "cpu"
+            logger.info("Loading local Blenderbot model from: %s", self.model_path)
             self.tokenizer = BlenderbotTokenizer.from_pretrained(self.model_path)
             self.model = BlenderbotForConditionalGeneration.from_pretrained(self.model_path)
             self.model.to(self.device)
-            print(f"✅ Local model ready on {self.device.upper()}")
+            logger.info("Local model ready on %s", self.device.upper())
         except Exception as e:
-            print(f"❌ Failed to load local Blenderbot: {e}")
+            logger.error("Failed to load local Blenderbot: %s", e)
             self.model, self.tokenizer = None, None
 
     # =====================================================
     # === RESPONSE GENERATION WITH MEMORY & INTENT ===
     # =====================================================
-    def generate_response(self, messages, purpose="chat"):
+    @staticmethod
+    def _record_usage(usage, prompt_tokens, completion_tokens):
+        if usage is not None:
+            usage.update(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=prompt_tokens + completion_tokens,
+            )
+
+    def generate_response(self, messages, purpose="chat", usage=None):
         """
         Generates a response using Groq Cloud or local Blenderbot fallback.
-        Adds memory context, intent detection, and greeting handling.
-        messages: [{"role": "user", "content": "text"}]
+        Adds intent detection and greeting handling.
+        messages: [{"role": "user", "content": "text"}], oldest first; everything
+        before the last message is the conversation context for this request.
+        usage: optional dict, filled with the model's prompt/completion/total
+        token counts (left empty for canned replies).
         """
         # Safety checks
-        if not hasattr(self, "chat_history"):
-            self.chat_history = []
         if not hasattr(self, "last_intent"):
             self.last_intent = None
         if not messages or "content" not in messages[-1]:
             return "[Invalid input — expected a list of chat messages.]"
 
         user_message = messages[-1]["content"].strip()
-        self.chat_history.append(user_message)
-        # Keep last 10 messages
-        self.chat_history = self.chat_history[-10:]
 
         user_lower = user_message.lower()
 
@@ -134,36 +158,41 @@ class LLMService:
 
         # Default fallback
         self.last_intent = "chat"
-        context_prompt = "\n".join(self.chat_history[-6:])
-        user_input = f"Conversation so far:\n{context_prompt}\n\nUser: {user_message}\nSereni:"
+        # Context comes from the caller (per conversation), never from shared state
+        context = [m for m in messages[:-1] if m.get("content")]
 
         # ===== Try Groq Cloud =====
         if self.use_groq and self.client:
             try:
-                completion = self.client.chat.completions.create(
-                    model="llama-3.1-8b-instant",
-                    messages=[
-                        {"role": "system", "content": self.SERENI_SYSTEM_PROMPT},
-                        {"role": "user", "content": user_input}
-                    ],
-                    temperature=self.TEMPERATURE,
-                    max_tokens=512,
-                    top_p=self.TOP_P,
-                    stream=False,
-                )
+                with timed_block("llm"):
+                    completion = self.client.chat.completions.create(
+                        model="llama-3.1-8b-instant",
+                        messages=[
+                            {"role": "system", "content": self.SERENI_SYSTEM_PROMPT},
+                            *context,
+                            {"role": "user", "content": user_message}
+                        ],
+                        temperature=self.TEMPERATURE,
+                        max_tokens=512,
+                        top_p=self.TOP_P,
+                        stream=False,
+                    )
+                if completion.usage is not None:
+                    self._record_usage(usage, completion.usage.prompt_tokens, completion.usage.completion_tokens)
                 response = completion.choices[0].message.content.strip()
                 if response:
-                    self.chat_history.append(response)
                     return response
                 return "[Empty response from Groq model.]"
             except Exception as e:
-                print(f"⚠️ Groq API error: {e} — switching to local model")
+                logger.warning("Groq API error: %s — switching to local model", e)
 
         # ===== Local Blenderbot fallback =====
         if self.model and self.tokenizer:
             try:
+                import torch
+
                 inputs = self.tokenizer(user_message, return_tensors="pt").to(self.device)
-                with torch.no_grad():
+                with torch.no_grad(), timed_block("llm"):
                     outputs = self.model.generate(
                         **inputs,
                         max_new_tokens=self.MAX_NEW_TOKENS,
@@ -173,14 +202,44 @@ class LLMService:
                         pad_token_id=self.tokenizer.eos_token_id,
                         eos_token_id=self.tokenizer.eos_token_id,
                     )
+                self._record_usage(usage, int(inputs["input_ids"].shape[-1]), int(outputs.shape[-1]))
                 response = self.tokenizer.decode(outputs[0], skip_special_tokens=True).strip()
-                self.chat_history.append(response)
                 return response
             except Exception as e:
                 return f"[Local model generation error: {e}]"
 
         return "[No LLM backend available — verify Groq API key or local model path.]"
 
+    def summarize(self, summary, messages, max_tokens=300, usage=None):
+        """
+        Fold `messages` (chat messages, oldest first) into the running
+        `summary` and return the new summary, or None if it could not be
+        produced. Needs Groq: the local Blenderbot model cannot summarise.
+        """
+        if not (self.use_groq and self.client):
+            return None
+        transcript = "\n".join(
+            f"{'User' if m['role'] == 'user' else 'Sereni'}: {m['content']}" for m in messages
+        )
+        prompt = f"Existing summary:\n{summary or '(none)'}\n\nNew turns:\n{transcript}"
+        try:
+            completion = self.client.chat.completions.create(
+                model="llama-3.1-8b-instant",
+                messages=[
+                    {"role": "system", "content": self.SUMMARY_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt},
+                ],
+                temperature=0.2,
+                max_tokens=max_tokens,
+                stream=False,
+            )
+        except Exception as e:
+            logger.warning("Groq summary error: %s", e)
+            return None
+        if completion.usage is not None:
+            self._record_usage(usage, completion.usage.prompt_tokens, completion.usage.completion_tokens)
+        return (completion.choices[0].message.content or "").strip() or None
+
 
 # === GLOBAL SINGLETON ACCESS ===
 _llm_service = None
@@ -0,0 +1,171 @@
+"""
+Login Service
+Keeps password hashing from monopolising request threads.
+
+bcrypt checks run on a small per-process thread pool (the bcrypt extension
+releases the GIL while hashing, so threads run in parallel) behind a cap on
+in-flight work: when the pool and its short queue are full, new logins are
+turned away with 503 instead of piling up. Token buckets per client IP and
+per account reject bursts before any hashing or database work. Hashes made
+with a different cost than BCRYPT_LOG_ROUNDS are re-hashed in the
+background after a successful login. Password changes go through the same
+limits and pool.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from flask import current_app
+from backend import bcrypt
+
+logger = logging.getLogger(__name__)
+
+
+class HasherBusy(Exception):
+    """Too many password checks in flight; the caller should back off."""
+
+
+class TokenBucketLimiter:
+    """
+    Token bucket per key: `burst` attempts at once, refilled at `per_minute`.
+    Idle buckets are dropped once the table grows past `max_keys`.
+    """
+
+    def __init__(self, per_minute, burst, max_keys=100000):
+        self.rate = per_minute / 60.0
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key):
+        """Take a token for `key`. Returns 0 if allowed, else seconds until the next token."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                allowed = True
+            else:
+                self._buckets[key] = (tokens, now)
+                allowed = False
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+        return 0 if allowed else (1 - tokens) / self.rate
+
+    def _prune(self, now):
+        full_after = self.burst / self.rate
+        self._buckets = {k: v for k, v in self._buckets.items() if now - v[1] < full_after}
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class PasswordHasher:
+
+    def __init__(self, workers=2, max_pending=16, timeout=5.0):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def configure(self, config):
+        self.workers = config["LOGIN_HASH_WORKERS"]
+        self.max_pending = config["LOGIN_MAX_PENDING"]
+        self.timeout = config["LOGIN_HASH_TIMEOUT_S"]
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+
+    def _pool(self):
+        # Pool threads do not survive fork; each worker builds its own
+        if self._executor is None or self._pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="bcrypt")
+                    self._pid = os.getpid()
+        return self._executor
+
+    def _submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy()
+        try:
+            future = self._pool().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # Released when the work actually finishes, even if the caller gave up
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def check(self, pw_hash, password) -> bool:
+        """Verify `password` on the pool. Raises HasherBusy when saturated or too slow."""
+        if not pw_hash:
+            return False
+        future = self._submit(bcrypt.check_password_hash, pw_hash, password)
+        try:
+            return future.result(self.timeout)
+        except FutureTimeout:
+            raise HasherBusy()
+
+    def hash(self, password) -> str:
+        """Hash a new password on the pool. Raises HasherBusy when saturated or too slow."""
+        future = self._submit(bcrypt.generate_password_hash, password)
+        try:
+            return future.result(self.timeout).decode("utf-8")
+        except FutureTimeout:
+            raise HasherBusy()
+
+    @staticmethod
+    def needs_rehash(pw_hash) -> bool:
+        try:
+            return int(pw_hash.split("$")[2]) != current_app.config["BCRYPT_LOG_ROUNDS"]
+        except (AttributeError, IndexError, ValueError):
+            return False
+
+    def rehash_later(self, collection, user_id, old_hash, password):
+        """Store a hash at the configured cost, unless the password changed meanwhile."""
+        def rehash():
+            new_hash = bcrypt.generate_password_hash(password).decode("utf-8")
+            collection.update_one({"_id": user_id, "password_hash": old_hash}, {"$set": {"password_hash": new_hash}})
+
+        try:
+            self._submit(rehash).add_done_callback(_log_failure)
+        except HasherBusy:
+            pass  # Try again on a later login
+
+
+def _log_failure(future):
+    if future.exception() is not None:
+        logger.error("Password rehash failed: %s", future.exception())
+
+
+# Singleton instances
+hasher = PasswordHasher()
+ip_limiter = TokenBucketLimiter(per_minute=20, burst=20)
+account_limiter = TokenBucketLimiter(per_minute=5, burst=5)
+
+
+def configure(config):
+    global ip_limiter, account_limiter
+    hasher.configure(config)
+    ip_limiter = TokenBucketLimiter(config["LOGIN_IP_PER_MINUTE"], config["LOGIN_IP_BURST"])
+    account_limiter = TokenBucketLimiter(config["LOGIN_ACCOUNT_PER_MINUTE"], config["LOGIN_ACCOUNT_BURST"])
+
+
+def client_ip(request, proxy_hops=0):
+    """Client address, taken `proxy_hops` entries from the end of X-Forwarded-For."""
+    route = request.access_route
+    if proxy_hops and len(route) >= proxy_hops:
+        return route[-proxy_hops]
+    return request.remote_addr
+
+
+def check_rate_limits(ip, email):
+    """Seconds to wait before retrying, or 0 when both buckets allow the attempt."""
+    return ip_limiter.acquire(ip) or account_limiter.acquire(email.strip().lower())
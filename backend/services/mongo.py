@@ -1,18 +1,64 @@
-from pymongo import MongoClient
+import calendar
 from pymongo.database import Database
 from pymongo.collection import Collection
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
+from flask import current_app
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
 import logging
+from backend import database
 
 logger = logging.getLogger(__name__)
 
+# Fields the billing page shows; keeps email and internal fields off the wire
+SUBSCRIPTION_PROJECTION = {
+    "_id": 1, "payment_ref": 1, "plan_name": 1, "plan_amount": 1, "status": 1,
+    "created_at": 1, "renewal_date": 1, "activated_at": 1, "cancelled_at": 1,
+}
+
+
+def encode_cursor(doc: Dict[str, Any]) -> str:
+    """Opaque keyset cursor for the (created_at, _id) position of `doc`."""
+    # Stored datetimes are naive UTC; datetime.timestamp() would treat them as local time
+    created_at = doc["created_at"]
+    millis = calendar.timegm(created_at.utctimetuple()) * 1000 + created_at.microsecond // 1000
+    return f"{millis}.{doc['_id']}"
+
+
+def decode_cursor(cursor: str):
+    """Inverse of encode_cursor; raises ValueError on a malformed cursor."""
+    millis, _, oid = cursor.partition(".")
+    if not ObjectId.is_valid(oid):
+        raise ValueError("invalid cursor")
+    return datetime.utcfromtimestamp(int(millis) / 1000), ObjectId(oid)
+
 class MongoService:
-    def __init__(self, mongo_uri: str, db_name: str):
-        self.client: MongoClient = MongoClient(mongo_uri)
-        self.db: Database = self.client[db_name]
-        self.subscriptions: Collection = self.db.subscriptions
-        self.users: Collection = self.db.users
+    """Subscription persistence on top of the shared client in backend.database."""
+
+    def __init__(self, db_name: Optional[str] = None):
+        self.db_name = db_name
+
+    @property
+    def db(self) -> Database:
+        # Resolved per access so a forked worker picks up its own client
+        return database.get_db(self.db_name)
+
+    @property
+    def subscriptions(self) -> Collection:
+        return self.db.subscriptions
+
+    @property
+    def users(self) -> Collection:
+        return self.db.users
+
+    def ensure_indexes(self):
+        self.subscriptions.create_index([("payment_ref", ASCENDING)], unique=True)
+        # Payment history, newest first
+        self.subscriptions.create_index([("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)])
+        # Entitlement lookup per user, and the lapsed-subscription sweep
+        self.subscriptions.create_index([("user_id", ASCENDING), ("status", ASCENDING), ("renewal_date", ASCENDING)])
+        self.subscriptions.create_index([("status", ASCENDING), ("renewal_date", ASCENDING)])
 
     def create_subscription(self, doc: Dict[str, Any]) -> bool:
         """Inserts a new subscription document into the subscriptions collection."""
@@ -20,7 +66,7 @@ class MongoService:
             result = self.subscriptions.insert_one(doc)
             return result.acknowledged
         except Exception as e:
-            logger.error(f"Failed to create subscription: {e}")
+            logger.error("Failed to create subscription: %s", e)
             return False
 
     def get_subscription_by_payment_ref(self, ref: str) -> Optional[Dict[str, Any]]:
@@ -28,7 +74,7 @@ class MongoService:
         try:
             return self.subscriptions.find_one({"payment_ref": ref})
         except Exception as e:
-            logger.error(f"Failed to get subscription by payment ref: {e}")
+            logger.error("Failed to get subscription by payment ref: %s", e)
             return None
 
     def activate_subscription(self, subscription_id: str, renewal_date: Optional[datetime] = None) -> bool:
@@ -46,18 +92,77 @@ class MongoService:
             )
             return result.modified_count > 0
         except Exception as e:
-            logger.error(f"Failed to activate subscription: {e}")
+            logger.error("Failed to activate subscription: %s", e)
             return False
 
+    def activate_subscription_by_ref(self, ref: str, renewal_date: datetime) -> Optional[Dict[str, Any]]:
+        """
+        Atomically activate the subscription for a payment reference if it is
+        still pending. Returns the updated document, or None when there is
+        nothing to do (unknown ref, or already active, cancelled or expired).
+        """
+        return self.subscriptions.find_one_and_update(
+            {"payment_ref": ref, "status": "pending"},
+            {"$set": {"status": "active", "renewal_date": renewal_date, "activated_at": datetime.utcnow()}},
+            return_document=ReturnDocument.AFTER
+        )
+
+    def get_payment_history(self, user_id: str, limit: int = 20, cursor: Optional[str] = None):
+        """
+        One page of a user's subscriptions, newest first, using keyset
+        pagination on (created_at, _id). Returns (documents, next_cursor);
+        next_cursor is None on the last page.
+        """
+        query = {"user_id": user_id}
+        if cursor:
+            created_at, oid = decode_cursor(cursor)
+            query["$or"] = [
+                {"created_at": {"$lt": created_at}},
+                {"created_at": created_at, "_id": {"$lt": oid}},
+            ]
+        docs = list(
+            self.subscriptions.find(query, SUBSCRIPTION_PROJECTION)
+            .sort([("created_at", DESCENDING), ("_id", DESCENDING)])
+            .limit(limit + 1)
+        )
+        next_cursor = encode_cursor(docs[limit - 1]) if len(docs) > limit else None
+        return docs[:limit], next_cursor
+
+    def cancel_subscription(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Atomically cancel the user's current active subscription. Access runs
+        until its renewal_date. Returns the cancelled subscription, or None if
+        there was nothing active to cancel.
+        """
+        return self.subscriptions.find_one_and_update(
+            {"user_id": user_id, "status": "active"},
+            {"$set": {"status": "cancelled", "cancelled_at": datetime.utcnow()}},
+            projection=SUBSCRIPTION_PROJECTION,
+            sort=[("renewal_date", DESCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
     def update_user_subscription(self, user_id: str, data: Dict[str, Any]) -> bool:
-        """Updates user subscription status with upsert."""
-        try:
-            result = self.users.update_one(
-                {"_id": user_id},
-                {"$set": data},
-                upsert=True
-            )
-            return result.acknowledged
-        except Exception as e:
-            logger.error(f"Failed to update user subscription: {e}")
-            return False
+        """
+        Updates user subscription status. Returns False only if there is no
+        such user; database errors propagate so callers (the webhook inbox
+        in particular) can retry.
+        """
+        # Users are keyed by ObjectId; subscriptions store the id as a string
+        user_oid = ObjectId(user_id) if isinstance(user_id, str) and ObjectId.is_valid(user_id) else user_id
+        result = self.users.update_one(
+            {"_id": user_oid},
+            {"$set": data}
+        )
+        return result.matched_count > 0
+
+
+# Singleton instance
+_mongo_service = None
+
+def get_mongo_service() -> MongoService:
+    """Get or create the shared subscription service"""
+    global _mongo_service
+    if _mongo_service is None:
+        _mongo_service = MongoService(current_app.config['MONGODB_DB_NAME'])
+    return _mongo_service
@@ -5,10 +5,9 @@ Model: cardiffnlp/twitter-roberta-base-sentiment-latest (free, no API key needed
 """
 
 import logging
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
 from typing import Dict, List, Tuple
 import re
+from backend.instrumentation import timed
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +21,7 @@ class SentimentAnalyzer:
         self.model_name = "cardiffnlp/twitter-roberta-base-sentiment-latest"
         self.tokenizer = None
         self.model = None
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.device = None  # chosen when the model is loaded
         
         # Crisis keywords for detection
         self.crisis_keywords = [
@@ -37,22 +36,28 @@ class SentimentAnalyzer:
             'sad', 'lonely', 'isolated', 'worthless', 'helpless', 'desperate'
         ]
         
-        logger.info(f"SentimentAnalyzer initialized. Using device: {self.device}")
+        logger.info("SentimentAnalyzer initialized")
     
     def load_model(self):
         """Lazy load the model to save memory"""
         if self.model is None:
             try:
-                logger.info(f"Loading sentiment model: {self.model_name}")
+                # Imported here so the app can start without loading torch
+                import torch
+                from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+                self.device = "cuda" if torch.cuda.is_available() else "cpu"
+                logger.info("Loading sentiment model: %s on %s", self.model_name, self.device)
                 self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
                 self.model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
                 self.model.to(self.device)
                 self.model.eval()
                 logger.info("Sentiment model loaded successfully")
             except Exception as e:
-                logger.error(f"Error loading sentiment model: {e}")
+                logger.error("Error loading sentiment model: %s", e)
                 raise
     
+    @timed("sentiment")
     def analyze_sentiment(self, text: str) -> Dict:
         """
         Analyze sentiment of text.
@@ -76,6 +81,8 @@ class SentimentAnalyzer:
         self.load_model()
         
         try:
+            import torch
+
             # Tokenize and get predictions
             inputs = self.tokenizer(text, return_tensors="pt", truncation=True, max_length=512)
             inputs = {k: v.to(self.device) for k, v in inputs.items()}
@@ -106,12 +113,12 @@ class SentimentAnalyzer:
                 'crisis_keywords': crisis_keywords_found
             }
             
-            logger.debug(f"Sentiment analysis result: {sentiment_label} (confidence: {scores_dict[sentiment_label]:.2f})")
+            logger.debug("Sentiment analysis result: %s (confidence: %.2f)", sentiment_label, scores_dict[sentiment_label])
             
             return result
             
         except Exception as e:
-            logger.error(f"Error during sentiment analysis: {e}")
+            logger.error("Error during sentiment analysis: %s", e)
             # Return neutral sentiment on error
             return {
                 'sentiment_label': 'neutral',
@@ -150,7 +157,7 @@ class SentimentAnalyzer:
         crisis_flag = len(found_keywords) > 0
         
         if crisis_flag:
-            logger.warning(f"Crisis keywords detected: {found_keywords}")
+            logger.warning("Crisis keywords detected: %s", found_keywords)
         
         return crisis_flag, found_keywords
     
@@ -186,35 +193,58 @@ class SentimentAnalyzer:
             else:
                 current_streak = 0
         
+        # Total negative sentiment score
+        negative_score_sum = sum(
+            s.get('sentiment_scores', {}).get('negative', 0) 
+            for s in sentiments
+        )
+        
+        return self.summarize_trend(
+            len(sentiments),
+            negative_count,
+            positive_count,
+            consecutive_negative,
+            negative_score_sum
+        )
+    
+    def summarize_trend(self, total: int, negative_count: int, positive_count: int,
+                        consecutive_negative: int, negative_score_sum: float) -> Dict:
+        """
+        Build a trend analysis from pre-aggregated counts.
+        Shared by analyze_sentiment_trend and the per-day sentiment rollups.
+        
+        Returns:
+            Dict with trend analysis
+        """
+        if not total:
+            return {
+                'trend': 'neutral',
+                'average_score': 0.0,
+                'consecutive_negative': 0,
+                'risk_level': 'low'
+            }
+        
         # Determine trend
-        if negative_count > len(sentiments) * 0.6:
+        if negative_count > total * 0.6:
             trend = 'declining'
-        elif positive_count > len(sentiments) * 0.6:
+        elif positive_count > total * 0.6:
             trend = 'improving'
         else:
             trend = 'stable'
         
         # Calculate risk level
         risk_level = 'low'
-        if consecutive_negative >= 5 or negative_count > len(sentiments) * 0.8:
+        if consecutive_negative >= 5 or negative_count > total * 0.8:
             risk_level = 'high'
-        elif consecutive_negative >= 3 or negative_count > len(sentiments) * 0.6:
+        elif consecutive_negative >= 3 or negative_count > total * 0.6:
             risk_level = 'medium'
         
-        # Average negative sentiment score
-        avg_negative_score = 0.0
-        if sentiments:
-            avg_negative_score = sum(
-                s.get('sentiment_scores', {}).get('negative', 0) 
-                for s in sentiments
-            ) / len(sentiments)
-        
         return {
             'trend': trend,
-            'average_negative_score': avg_negative_score,
+            'average_negative_score': negative_score_sum / total,
             'consecutive_negative': consecutive_negative,
             'risk_level': risk_level,
-            'total_entries': len(sentiments),
+            'total_entries': total,
             'negative_count': negative_count,
             'positive_count': positive_count
         }
@@ -0,0 +1,136 @@
+"""
+Summary Service
+Rolling summaries of long conversations.
+
+Once the turns a prompt would have to carry verbatim outgrow
+CHAT_SUMMARY_TRIGGER_TOKENS, context_service schedules the conversation
+here. A background thread per worker folds the oldest unsummarised turns
+(all but the newest CHAT_SUMMARY_KEEP_TURNS) into Conversation.summary with
+one LLM call and stores the result on the last turn it covers
+(ChatLog.context_summary). Prompts are then built from the summary plus the
+turns after it. The write is conditional on summarized_count, so workers
+racing on one conversation cannot overwrite each other's progress.
+"""
+
+import logging
+import os
+import threading
+from collections import deque
+from backend.models import ChatLog, Conversation
+from backend.services.context_service import turn_messages
+from backend.services.llm_service import get_llm_service
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationSummarizer:
+
+    def __init__(self, keep_turns=4, batch_turns=20, max_summary_tokens=300, trigger_tokens=1000):
+        self.keep_turns = keep_turns
+        self.batch_turns = batch_turns
+        self.max_summary_tokens = max_summary_tokens
+        self.trigger_tokens = trigger_tokens
+        self.enabled = True
+        self._pending = deque()
+        self._queued = set()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def configure(self, config):
+        self.keep_turns = config["CHAT_SUMMARY_KEEP_TURNS"]
+        self.batch_turns = config["CHAT_SUMMARY_BATCH_TURNS"]
+        self.max_summary_tokens = config["CHAT_SUMMARY_MAX_TOKENS"]
+        self.trigger_tokens = config["CHAT_SUMMARY_TRIGGER_TOKENS"]
+        self.enabled = config["CHAT_SUMMARY_ENABLED"]
+
+    def summarize(self, conversation_id, llm_service=None) -> bool:
+        """
+        Fold up to batch_turns unsummarised turns into the conversation's
+        summary. Returns True if the summary advanced.
+        """
+        state = Conversation.get_state(conversation_id)
+        if state is None:
+            return False
+        done = state.get("summarized_count") or 0
+        pending = state["message_count"] - done - self.keep_turns
+        if pending <= 0:
+            return False
+        turns = ChatLog.find_turns_after(conversation_id, state.get("summary_through"),
+                                         state.get("summary_through_id"), min(pending, self.batch_turns))
+        if not turns:
+            return False
+
+        llm_service = llm_service or get_llm_service()
+        messages = [m for turn in turns for m in turn_messages(turn) if m["content"]]
+        usage = {}
+        summary = llm_service.summarize(state.get("summary"), messages, self.max_summary_tokens, usage)
+        if not summary:
+            return False
+
+        last = turns[-1]
+        if not Conversation.set_summary(conversation_id, summary, done + len(turns),
+                                        last["created_at"], last["_id"], expected_count=done):
+            return False
+        ChatLog.set_context_summary(last["_id"], summary)
+        logger.debug("Summarised %s turns of %s (%s tokens)", len(turns), conversation_id,
+                     usage.get("total_tokens", 0))
+        return True
+
+    def schedule(self, conversation_id):
+        """Queue a conversation for summarising (once, however often it is asked)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if conversation_id in self._queued:
+                return
+            self._queued.add(conversation_id)
+            self._pending.append(conversation_id)
+        self.ensure_started()
+        self._wake.set()
+
+    def ensure_started(self, app=None):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            if app is None:
+                from flask import current_app
+                app = current_app._get_current_object()
+            self._stop.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, args=(app,), name="conversation-summarizer",
+                                            daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _next(self):
+        with self._lock:
+            if not self._pending:
+                return None
+            conversation_id = self._pending.popleft()
+            self._queued.discard(conversation_id)
+            return conversation_id
+
+    def _run(self, app):
+        with app.app_context():
+            while not self._stop.is_set():
+                conversation_id = self._next()
+                if conversation_id is None:
+                    self._wake.wait()
+                    self._wake.clear()
+                    continue
+                try:
+                    # A long backlog is folded in batch_turns at a time
+                    while not self._stop.is_set() and self.summarize(conversation_id):
+                        pass
+                except Exception as e:
+                    logger.error("Summarising conversation %s failed: %s", conversation_id, e)
+
+
+# Singleton instance
+summarizer = ConversationSummarizer()
@@ -0,0 +1,177 @@
+"""
+Token Service
+Short-lived access tokens and rotating refresh tokens.
+
+Access tokens (ACCESS_TOKEN_TTL_S, 15 minutes by default) carry the claims
+most routes need: user id, email and the premium flag. token_required can
+build current_user from them without reading the users collection.
+Refresh tokens (REFRESH_TOKEN_TTL_DAYS) are only accepted by
+/api/auth/refresh, which re-reads the user, so database work moves from
+every request to one read per refresh. Each refresh claims the token it
+used by inserting its jti into revoked_tokens (unique), so a refresh token
+works exactly once across all workers.
+
+Revocations are stored in revoked_tokens and mirrored per worker in a
+RevocationList. Checking it costs a dict lookup; the mirror pulls new rows
+at most every TOKEN_REVOCATION_SYNC_S seconds, re-reading a SYNC_OVERLAP_S
+margin so rows stamped by a host with a slower clock are not missed.
+"""
+
+import calendar
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+import jwt
+from flask import current_app
+from pymongo.errors import DuplicateKeyError
+from backend.models import RevokedToken
+from backend.services.entitlement_service import entitlements
+
+logger = logging.getLogger(__name__)
+
+ALGORITHM = "HS256"
+ACCESS = "access"
+REFRESH = "refresh"
+SYNC_OVERLAP_S = 120
+
+
+def _epoch(dt):
+    # Stored datetimes are naive UTC; datetime.timestamp() would treat them as local time
+    return calendar.timegm(dt.utctimetuple())
+
+
+class RevocationList:
+
+    def __init__(self, sync_seconds=30):
+        self.sync_seconds = sync_seconds
+        self._jtis = {}            # jti -> expiry (epoch seconds)
+        self._users = {}           # user_id -> tokens issued before this epoch second are revoked
+        self._synced_at = 0.0
+        self._cursor = None
+        self._lock = threading.Lock()
+
+    def _apply(self, row):
+        expires = _epoch(row["expires_at"])
+        if "jti" in row:
+            self._jtis[row["jti"]] = expires
+        else:
+            cutoff = _epoch(row["revoked_before"])
+            self._users[row["user_id"]] = max(self._users.get(row["user_id"], 0), cutoff)
+
+    def sync(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._synced_at < self.sync_seconds:
+            return
+        with self._lock:
+            if not force and now - self._synced_at < self.sync_seconds:
+                return
+            self._synced_at = now
+            try:
+                # Applying a row twice is harmless, so re-read an overlap for clock skew
+                since = self._cursor - timedelta(seconds=SYNC_OVERLAP_S) if self._cursor else None
+                for row in RevokedToken.created_since(since):
+                    self._apply(row)
+                    self._cursor = max(self._cursor or row["created_at"], row["created_at"])
+            except Exception as e:
+                logger.error("Revocation list sync failed: %s", e)
+            wall = time.time()
+            self._jtis = {jti: exp for jti, exp in self._jtis.items() if exp > wall}
+
+    def is_revoked(self, claims) -> bool:
+        self.sync()
+        if claims.get("jti") in self._jtis:
+            return True
+        return claims.get("iat", 0) < self._users.get(claims.get("user_id"), 0)
+
+    def revoke(self, claims) -> bool:
+        """
+        Revoke one token everywhere (visible to other workers after their
+        next sync). Returns False if it was already revoked, which makes this
+        an atomic claim: of two concurrent calls for one token, one wins.
+        """
+        expires_at = datetime.utcfromtimestamp(claims["exp"])
+        try:
+            RevokedToken.revoke_token(claims["jti"], claims["user_id"], expires_at)
+            claimed = True
+        except DuplicateKeyError:
+            claimed = False
+        with self._lock:
+            self._jtis[claims["jti"]] = claims["exp"]
+        return claimed
+
+    def revoke_user(self, user_id, refresh_ttl_days):
+        """Revoke every token issued to the user so far."""
+        now = datetime.utcnow()
+        RevokedToken.revoke_user(user_id, now + timedelta(days=refresh_ttl_days), now)
+        with self._lock:
+            self._users[str(user_id)] = _epoch(now)
+
+    def clear(self):
+        with self._lock:
+            self._jtis.clear()
+            self._users.clear()
+            self._synced_at = 0.0
+            self._cursor = None
+
+
+# Singleton instance
+revocations = RevocationList()
+
+
+def configure(config):
+    revocations.sync_seconds = config["TOKEN_REVOCATION_SYNC_S"]
+
+
+def _encode(claims):
+    return jwt.encode(claims, current_app.config["SECRET_KEY"], algorithm=ALGORITHM)
+
+
+def issue_tokens(user):
+    """
+    Mint an access/refresh pair for `user` (a full User). The access token
+    never outlives the premium period it asserts.
+    """
+    config = current_app.config
+    now = datetime.utcnow()
+    entitlement = entitlements.get(user)
+    access_exp = now + timedelta(seconds=config["ACCESS_TOKEN_TTL_S"])
+    if entitlement.expires_at is not None:
+        access_exp = max(now + timedelta(seconds=1), min(access_exp, entitlement.expires_at))
+
+    base = {"user_id": str(user._id), "iat": now}
+    access = _encode({
+        **base,
+        "type": ACCESS,
+        "jti": uuid.uuid4().hex,
+        "exp": access_exp,
+        "email": user.email,
+        "premium": entitlement.premium,
+    })
+    refresh = _encode({
+        **base,
+        "type": REFRESH,
+        "jti": uuid.uuid4().hex,
+        "exp": now + timedelta(days=config["REFRESH_TOKEN_TTL_DAYS"]),
+    })
+    return {
+        "token": access,
+        "refresh_token": refresh,
+        "expires_in": int((access_exp - now).total_seconds()),
+    }
+
+
+def decode(token, expected_type=None):
+    """
+    Verify a token and return its claims. Raises jwt.InvalidTokenError (or
+    jwt.ExpiredSignatureError) for bad, expired, revoked or wrong-type tokens.
+    Tokens without a type are the old 24-hour login tokens and count as access;
+    having no jti or iat, they are revoked by any per-user revocation.
+    """
+    claims = jwt.decode(token, current_app.config["SECRET_KEY"], algorithms=[ALGORITHM])
+    if expected_type and claims.get("type", ACCESS) != expected_type:
+        raise jwt.InvalidTokenError(f"expected a {expected_type} token")
+    if revocations.is_revoked(claims):
+        raise jwt.InvalidTokenError("token revoked")
+    return claims
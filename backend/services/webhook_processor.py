@@ -0,0 +1,169 @@
+"""
+Webhook Processor
+Applies payment webhooks stored in the webhook inbox (models.WebhookEvent).
+
+The webhook route only verifies the signature and inserts the raw event; a
+background thread per worker claims due events with an atomic
+find_one_and_update lease, applies them with conditional updates and
+reschedules failures with exponential backoff up to a bounded number of
+attempts. Several workers can poll the same inbox safely.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from backend.models import WebhookEvent
+from backend.services.mongo import get_mongo_service
+from backend.services.entitlement_service import entitlements
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIPTION_DAYS = 30
+
+
+def event_id_for(payload, raw_body: bytes) -> str:
+    """
+    Stable idempotency key for a Flutterwave delivery: the event type plus
+    the transaction id, falling back to a hash of the raw body.
+    """
+    data = payload.get("data") or {}
+    if data.get("id") is not None:
+        return f"flutterwave:{payload.get('event')}:{data['id']}"
+    return "flutterwave:sha256:" + hashlib.sha256(raw_body).hexdigest()
+
+
+class SubscriptionNotFound(Exception):
+    """The payment arrived before (or without) its pending subscription."""
+
+
+def apply_event(event, mongo_service):
+    """
+    Apply one inbox event. Returns a short result string for the inbox
+    record; raises to request a retry. Safe to run more than once.
+    """
+    payload = event["payload"]
+    data = payload.get("data") or {}
+    tx_ref = event.get("tx_ref")
+
+    if not tx_ref:
+        return "ignored:no_tx_ref"
+    if payload.get("event") != "charge.completed" or data.get("status") != "successful":
+        return f"ignored:{payload.get('event')}:{data.get('status')}"
+
+    renewal_date = datetime.utcnow() + timedelta(days=SUBSCRIPTION_DAYS)
+    subscription = mongo_service.activate_subscription_by_ref(tx_ref, renewal_date)
+    result = "activated"
+    if subscription is None:
+        # Not there yet, already active (a previous attempt got this far), or
+        # cancelled/expired, in which case a replayed payment must not revive it
+        subscription = mongo_service.get_subscription_by_payment_ref(tx_ref)
+        if subscription is None:
+            raise SubscriptionNotFound(f"No subscription for tx_ref {tx_ref}")
+        if subscription.get("status") != "active":
+            return f"already_processed:{subscription.get('status')}"
+        result = "already_active"
+
+    # Idempotent $set, so re-running after a partial failure is harmless
+    updated = mongo_service.update_user_subscription(subscription["user_id"], {
+        "subscription_status": "active",
+        "plan_id": subscription["plan_name"],
+        "renewal_date": subscription.get("renewal_date", renewal_date),
+        "is_premium": True,
+    })
+    entitlements.invalidate(subscription["user_id"])
+    if not updated:
+        logger.warning("User %s not found for tx_ref %s", subscription["user_id"], tx_ref)
+        result += ":user_not_found"
+    else:
+        logger.info("Subscription %s for user %s (tx_ref %s)", result, subscription["user_id"], tx_ref)
+    return result
+
+
+class WebhookProcessor:
+
+    def __init__(self, poll_interval=5.0, max_attempts=5, retry_base_seconds=30, lease_seconds=60):
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.lease_seconds = lease_seconds
+        self.enabled = True
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def configure(self, config):
+        self.poll_interval = config["WEBHOOK_POLL_INTERVAL_S"]
+        self.max_attempts = config["WEBHOOK_MAX_ATTEMPTS"]
+        self.retry_base_seconds = config["WEBHOOK_RETRY_BASE_S"]
+        self.enabled = config["WEBHOOK_PROCESSOR_ENABLED"]
+
+    def process_one(self, mongo_service=None) -> bool:
+        """Claim and apply a single due event; returns False if none was due."""
+        event = WebhookEvent.claim_next(self.lease_seconds)
+        if event is None:
+            return False
+        mongo_service = mongo_service or get_mongo_service()
+        try:
+            result = apply_event(event, mongo_service)
+        except Exception as e:
+            give_up = event["attempts"] >= self.max_attempts
+            delay = self.retry_base_seconds * 2 ** (event["attempts"] - 1)
+            WebhookEvent.retry_later(event["_id"], str(e), delay, give_up=give_up)
+            if give_up:
+                logger.error("Webhook %s failed after %s attempts: %s", event["event_id"], event["attempts"], e)
+            else:
+                logger.warning("Webhook %s attempt %s failed, retrying in %ss: %s",
+                               event["event_id"], event["attempts"], delay, e)
+            return True
+        status = "ignored" if result.startswith("ignored") else "done"
+        WebhookEvent.complete(event["_id"], status, result)
+        return True
+
+    def drain(self, mongo_service=None, limit=None) -> int:
+        """Process due events until none are left (or `limit` is reached)."""
+        processed = 0
+        while (limit is None or processed < limit) and self.process_one(mongo_service):
+            processed += 1
+        return processed
+
+    def notify(self):
+        """Wake the background thread (starting it if needed) to process new events."""
+        self.ensure_started()
+        self._wake.set()
+
+    def ensure_started(self, app=None):
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            if app is None:
+                from flask import current_app
+                app = current_app._get_current_object()
+            self._stop.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, args=(app,), name="webhook-processor", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self, app):
+        with app.app_context():
+            mongo_service = get_mongo_service()
+            while not self._stop.is_set():
+                try:
+                    self.drain(mongo_service)
+                except Exception as e:
+                    logger.error("Webhook processor error: %s", e)
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+
+# Singleton instance
+processor = WebhookProcessor()
@@ -0,0 +1,255 @@
+"""
+Write Buffer
+Write-behind batching for chat turns.
+
+send_message used to wait for the chat log insert and the conversation
+index update before it could respond. A turn's writes (the chat log, its
+conversation update, the message's sentiment row and the sentiment rollups)
+are now queued here. A background thread per worker writes them with one
+ordered bulk_write per collection, WRITE_BUFFER_FLUSH_MS after the first
+write is queued, or as soon as WRITE_BUFFER_MAX_OPS are waiting.
+
+Turns that are queued but not yet written are listed per conversation
+(pending_turns), so the context service can still see them.
+
+On shutdown, gunicorn's worker_exit hook (or atexit outside gunicorn)
+flushes whatever is still queued. A graceful restart therefore loses
+nothing, while a killed worker loses at most one flush interval of writes.
+After a connection error, inserts are queued again, and a retried insert
+that already landed is dropped as a duplicate. Counter updates are never
+replayed. The conversation entry or sentiment rollups they maintain are
+rebuilt from the inserted rows instead. Once WRITE_BUFFER_MAX_PENDING
+operations are waiting, callers write their own operations synchronously
+rather than queueing more.
+"""
+
+import atexit
+import logging
+import os
+import threading
+from pymongo import InsertOne
+from pymongo.errors import BulkWriteError, PyMongoError
+from backend.models import Conversation, SentimentRollup
+
+logger = logging.getLogger(__name__)
+
+RETRY_DELAY_S = 1.0
+DUPLICATE_KEY = 11000
+
+
+class WriteBuffer:
+
+    def __init__(self, flush_ms=20, max_ops=500, max_pending=10000):
+        self.flush_interval = flush_ms / 1000
+        self.max_ops = max_ops
+        self.max_pending = max_pending
+        self.enabled = True
+        self._ops = []             # (collection, operation, turn key, repair), in submission order
+        self._turns = {}           # conversation_id -> {chat_id: turn} queued but not yet written
+        self._repairs = set()      # (function, argument) to run instead of replaying failed updates
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._queued = threading.Event()
+        self._full = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._atexit = False
+
+    def configure(self, config):
+        self.flush_interval = config["WRITE_BUFFER_FLUSH_MS"] / 1000
+        self.max_ops = config["WRITE_BUFFER_MAX_OPS"]
+        self.max_pending = config["WRITE_BUFFER_MAX_PENDING"]
+        self.enabled = config["WRITE_BUFFER_ENABLED"]
+
+    def submit(self, operations, turn_key=None, repair=None):
+        """
+        Queue (collection, operation) pairs. `repair` is a (function, argument)
+        pair that recomputes what the non-insert operations maintain; it runs
+        instead of replaying them if their outcome is unknown. Disabled, or
+        with too much already waiting, the operations are written before
+        returning.
+        """
+        entries = [(collection, operation, turn_key, repair) for collection, operation in operations]
+        with self._lock:
+            waiting = len(self._ops) + len(entries)
+            inline = not self.enabled or waiting >= self.max_pending
+            if not inline:
+                self._ops.extend(entries)
+        if inline:
+            # Only this caller's operations; the queue is left to the flusher
+            with self._flush_lock:
+                self._write_entries(entries, requeue=False)
+            return
+        self.ensure_started()
+        self._queued.set()
+        if waiting >= self.max_ops:
+            self._full.set()
+
+    def submit_turn(self, chat_log, sentiment=None):
+        """Queue a chat turn: its log, conversation update and (optionally) sentiment row."""
+        key = (chat_log.conversation_id, chat_log._id)
+        with self._lock:
+            self._turns.setdefault(chat_log.conversation_id, {})[chat_log._id] = {
+                "_id": chat_log._id,
+                "role": chat_log.role,
+                "message": chat_log.message,
+                "ai_response": chat_log.ai_response,
+            }
+        operations = [(chat_log.write_operations(), (Conversation.rebuild, chat_log.user_id))]
+        if sentiment is not None:
+            operations.append((sentiment.write_operations(), (SentimentRollup.rebuild_for_user, sentiment.user_id)))
+        try:
+            for turn_operations, repair in operations:
+                self.submit(turn_operations, turn_key=key, repair=repair)
+        except Exception:
+            self._release([key])
+            raise
+
+    def pending_turns(self, conversation_id):
+        """Turns of the conversation still waiting to be written, oldest first."""
+        with self._lock:
+            return list(self._turns.get(conversation_id, {}).values())
+
+    def _write(self, collection, operations):
+        # Ordered, so rollup updates for the same day apply in sequence. A
+        # rejected operation (say, a duplicate key) is dropped and the rest
+        # are written.
+        while operations:
+            try:
+                collection.bulk_write(operations, ordered=True)
+                return
+            except BulkWriteError as e:
+                if not e.details.get("writeErrors"):
+                    # Only the write concern failed; the writes themselves were applied
+                    logger.error("Buffered write to %s: %s", collection.name, e.details.get("writeConcernErrors"))
+                    return
+                error = e.details["writeErrors"][0]
+                if error.get("code") == DUPLICATE_KEY:
+                    # Usually a retried insert that had landed before the error
+                    logger.warning("Skipped buffered write to %s: %s", collection.name, error.get("errmsg"))
+                else:
+                    logger.error("Dropped buffered write to %s: %s", collection.name, error.get("errmsg"))
+                operations = operations[error["index"] + 1:]
+
+    def _write_entries(self, entries, requeue=True):
+        """
+        Write entries with one bulk_write per collection. On an error with
+        an unknown outcome (network error, stepdown) part of a group may
+        already be applied: inserts are safe to retry, since a replayed
+        insert is rejected as a duplicate and dropped, so they are queued
+        again (or, with requeue=False, left to the caller). Counter updates
+        are not replayed; their repair rebuilds what they maintain from the
+        inserted rows once a write succeeds again.
+        """
+        groups = {}
+        for entry in entries:
+            groups.setdefault(entry[0].full_name, []).append(entry)
+        failed = []
+        for group in groups.values():
+            collection = group[0][0]
+            try:
+                self._write(collection, [operation for _, operation, _, _ in group])
+            except PyMongoError as e:
+                logger.error("Buffered write to %s failed: %s", collection.name, e)
+                failed.extend(group)
+
+        retry = [entry for entry in failed if isinstance(entry[1], InsertOne)] if requeue else []
+        # Without a retry, the failed inserts are gone and updates that did
+        # land count rows that do not exist, so everything is repaired
+        unsettled = [entry for entry in failed if not isinstance(entry[1], InsertOne)] if requeue else \
+            (entries if failed else [])
+        with self._lock:
+            self._repairs.update(entry[3] for entry in unsettled if entry[3] is not None)
+            self._ops[:0] = retry
+        retry_keys = {entry[2] for entry in retry}
+        self._release(entry[2] for entry in entries if entry[2] not in retry_keys)
+        if failed:
+            raise PyMongoError(f"{len(failed)} buffered writes failed")
+        if requeue:
+            # Every insert retried by an earlier flush has now landed
+            self._run_repairs()
+
+    def _release(self, keys):
+        with self._lock:
+            for key in keys:
+                if key is None:
+                    continue
+                turns = self._turns.get(key[0])
+                if turns is not None:
+                    turns.pop(key[1], None)
+                    if not turns:
+                        del self._turns[key[0]]
+
+    def _run_repairs(self):
+        with self._lock:
+            if not self._repairs:
+                return
+            repairs, self._repairs = self._repairs, set()
+        for repair in repairs:
+            function, argument = repair
+            try:
+                function(argument)
+                logger.warning("Rebuilt %s for %s after a failed buffered write", function.__qualname__, argument)
+            except Exception as e:
+                logger.error("Repair %s(%s) failed, will retry: %s", function.__qualname__, argument, e)
+                with self._lock:
+                    self._repairs.add(repair)
+
+    def flush(self) -> int:
+        """Write everything queued so far; returns the number of operations written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._ops = self._ops, []
+            if batch:
+                self._write_entries(batch)
+            return len(batch)
+
+    def ensure_started(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._stop.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="write-buffer", daemon=True)
+            self._thread.start()
+            if not self._atexit:
+                atexit.register(self.close)
+                self._atexit = True
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._queued.wait()
+            self._queued.clear()
+            # Gather a batch for flush_interval, unless max_ops fill it first
+            self._full.wait(self.flush_interval)
+            self._full.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error("Write buffer flush failed: %s", e)
+                self._stop.wait(RETRY_DELAY_S)
+            with self._lock:
+                if self._ops:
+                    self._queued.set()
+
+    def close(self, attempts=3):
+        """Stop the background thread and write whatever is still queued."""
+        self._stop.set()
+        self._queued.set()
+        self._full.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout=5)
+        for attempt in range(attempts):
+            try:
+                self.flush()
+                return
+            except Exception as e:
+                logger.error("Write buffer flush at exit failed (attempt %s): %s", attempt + 1, e)
+        with self._lock:
+            if self._ops:
+                logger.critical("Lost %s buffered writes at exit", len(self._ops))
+
+
+# Singleton instance
+write_buffer = WriteBuffer()